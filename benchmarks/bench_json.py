@@ -0,0 +1,100 @@
+"""
+Рендеринг и парсинг JSON: стандартные JSONRenderer/JSONParser DRF против
+ORJSONRenderer/ORJSONParser на типичных ответах news/list/ и mediafiles/list/.
+
+    python -m benchmarks.bench_json
+"""
+import io
+
+from benchmarks.utils import measure, print_table, setup_django
+
+VIDEO_URL = (
+    "https://r2.example.com/bucket/media/video/3f2c9a1e-6b7d-4c1a-9e2f-0a1b2c3d4e5f_clip.mp4"
+    "?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Credential=key%2F20250328%2Fauto%2Fs3%2Faws4_request"
+    "&X-Amz-Date=20250328T120000Z&X-Amz-Expires=3600&X-Amz-SignedHeaders=host&X-Amz-Signature=" + "0" * 64
+)
+
+
+def news_payload(count):
+    blocks = [
+        {"type": "paragraph", "text": "Сотрудники полиции выявили нарушение правил дорожного движения. " * 6}
+        for _ in range(8)
+    ]
+    return {
+        "results": [
+            {
+                "id": i,
+                "title": f"Новость номер {i}: итоги недели",
+                "text": {"blocks": blocks, "version": "2.28.2", "time": 1711627200000 + i},
+                "created_at": "2025-03-28T17:00:00.123456+05:00",
+                "media": [{"id": i * 10 + j, "video_file": VIDEO_URL} for j in range(2)],
+            }
+            for i in range(count)
+        ],
+        "next": "eyJ2IjoiMjAyNS0wMy0yOFQxMjowMDowMCIsImkiOjEsImQiOiJuIn0",
+        "prev": None,
+    }
+
+
+def media_payload(count):
+    return {
+        "results": [
+            {
+                "id": i,
+                "user": 42,
+                "city": "Алматы",
+                "street": f"пр. Абая, {i}",
+                "description": "Автомобиль припаркован на тротуаре у пешеходного перехода.",
+                "was_at_date": "2025-03-28",
+                "was_at_time": "12:30:00",
+                "uploaded_at": "2025-03-28T17:00:00.123456+05:00",
+                "videos": [{"id": i * 10 + j, "video_file": VIDEO_URL} for j in range(2)],
+                "status": "Waiting",
+            }
+            for i in range(count)
+        ],
+        "next": None,
+        "prev": None,
+    }
+
+
+def main():
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from mobile_rest.parsers import ORJSONParser
+    from mobile_rest.renderers import ORJSONRenderer
+
+    rows = []
+    for name, payload in (
+        ("news x20", news_payload(20)),
+        ("news x200", news_payload(200)),
+        ("mediafiles x100", media_payload(100)),
+        ("mediafiles x1000", media_payload(1000)),
+    ):
+        body = JSONRenderer().render(payload)
+        assert ORJSONRenderer().render(payload) == body
+
+        drf_render, _ = measure(lambda: JSONRenderer().render(payload), 20)
+        orjson_render, _ = measure(lambda: ORJSONRenderer().render(payload), 20)
+        drf_parse, _ = measure(lambda: JSONParser().parse(io.BytesIO(body)), 20)
+        orjson_parse, _ = measure(lambda: ORJSONParser().parse(io.BytesIO(body)), 20)
+        rows.append((
+            name,
+            f"{len(body) / 1024:.0f}",
+            f"{drf_render * 1000:.2f}",
+            f"{orjson_render * 1000:.2f}",
+            f"{drf_render / orjson_render:.1f}x",
+            f"{drf_parse * 1000:.2f}",
+            f"{orjson_parse * 1000:.2f}",
+            f"{drf_parse / orjson_parse:.1f}x",
+        ))
+    print_table(
+        ("payload", "KiB", "render ms", "orjson ms", "speedup", "parse ms", "orjson ms", "speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Сравнение ModelSerializer и быстрого .values()-пути для списков заявок и новостей
+на 100, 1 000 и 10 000 строк (по 2 видео на заявку и новость).
+
+    python -m benchmarks.bench_list_serializers
+"""
+from benchmarks.utils import measure, print_table, setup_django, test_database
+
+SIZES = (100, 1_000, 10_000)
+FILES_PER_ROW = 2
+
+
+def populate(count):
+    from django.contrib.auth import get_user_model
+    from mobile_rest.models import MediaFile, MediaFileNews, MediaFiles, News
+
+    user = get_user_model().objects.create_user(phone_number="70000000000", password="bench")
+    reports = MediaFiles.objects.bulk_create(
+        MediaFiles(
+            user=user,
+            city="Алматы",
+            street=f"ул. Абая, {i}",
+            description="Нарушение правил парковки " * 4,
+            was_at_date="2025-01-03",
+            was_at_time="12:00:00",
+            status="Waiting",
+        )
+        for i in range(count)
+    )
+    MediaFile.objects.bulk_create(
+        MediaFile(media=report, video_file=f"video/{report.id}_{j}.mp4")
+        for report in reports
+        for j in range(FILES_PER_ROW)
+    )
+    news = News.objects.bulk_create(
+        News(title=f"Новость {i}", text={"blocks": [{"type": "p", "text": "Текст новости " * 20}]})
+        for i in range(count)
+    )
+    MediaFileNews.objects.bulk_create(
+        MediaFileNews(news=item, video_file=f"video/news_{item.id}_{j}.mp4")
+        for item in news
+        for j in range(FILES_PER_ROW)
+    )
+
+
+def main():
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from mobile_rest.fast_serializer import FastMediaFilesSerializer, FastNewsSerializer
+    from mobile_rest.models import MediaFiles, News
+    from mobile_rest.serializer import MediaFilesSerializer, NewsSerializer
+
+    renderer = JSONRenderer()
+
+    def media_model_path(n):
+        qs = MediaFiles.objects.with_videos().order_by("-uploaded_at", "-id")[:n]
+        return renderer.render(MediaFilesSerializer(qs, many=True).data)
+
+    def media_fast_path(n):
+        qs = MediaFiles.objects.order_by("-uploaded_at", "-id").values_list(
+            *FastMediaFilesSerializer.values_fields, named=True
+        )[:n]
+        return renderer.render(FastMediaFilesSerializer(list(qs)).data)
+
+    def news_model_path(n):
+        qs = News.objects.with_media()[:n]
+        return renderer.render(NewsSerializer(qs, many=True).data)
+
+    def news_fast_path(n):
+        qs = News.objects.values_list(*FastNewsSerializer.values_fields, named=True)[:n]
+        return renderer.render(FastNewsSerializer(list(qs)).data)
+
+    with test_database():
+        populate(max(SIZES))
+        rows = []
+        for name, model_path, fast_path in (
+            ("mediafiles", media_model_path, media_fast_path),
+            ("news", news_model_path, news_fast_path),
+        ):
+            for n in SIZES:
+                repeat = 5 if n < 10_000 else 3
+                model_best, _ = measure(lambda: model_path(n), repeat)
+                fast_best, _ = measure(lambda: fast_path(n), repeat)
+                rows.append((
+                    name,
+                    n,
+                    f"{model_best * 1000:.1f}",
+                    f"{fast_best * 1000:.1f}",
+                    f"{model_best / fast_best:.2f}x",
+                ))
+        print_table(("endpoint", "rows", "serializer ms", "fast ms", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Генерация presigned PUT URL (как в GeneratePresignedUrlView): новый
+boto3.client на каждый запрос против общего клиента helpers.cloudflare.clients,
+а также MediaFileStorage.url() — он теперь тоже использует общий клиент.
+Сеть не нужна: подпись вычисляется локально.
+
+    python -m benchmarks.bench_presign
+"""
+import uuid
+
+from benchmarks.utils import measure, print_table, setup_django
+
+CALLS = 200
+
+
+def main():
+    setup_django()
+    import boto3
+    from decouple import config
+
+    from django.core.files.storage import default_storage
+
+    from helpers.cloudflare import clients, settings
+
+    def params():
+        return {
+            "Bucket": settings.bucket_name,
+            "Key": f"media/video/{uuid.uuid4()}_clip.mp4",
+            "ContentType": "video/mp4",
+        }
+
+    def per_request_client():
+        for _ in range(CALLS):
+            s3_client = boto3.client(
+                "s3",
+                aws_access_key_id=config("CLOUDFLARE_R2_ACCESS_KEY"),
+                aws_secret_access_key=config("CLOUDFLARE_R2_SECRET_KEY"),
+                endpoint_url=config("CLOUDFLARE_R2_BUCKET_ENDPOINT"),
+                region_name="auto",
+            )
+            s3_client.generate_presigned_url("put_object", Params=params(), ExpiresIn=3600)
+
+    def shared_client():
+        for _ in range(CALLS):
+            clients.get_client().generate_presigned_url("put_object", Params=params(), ExpiresIn=3600)
+
+    def storage_url():
+        for _ in range(CALLS):
+            default_storage.url(f"video/{uuid.uuid4()}_clip.mp4")
+
+    shared_client()  # прогрев: первый вызов строит общий клиент
+    rows = []
+    baseline = None
+    for name, func in (
+        ("boto3.client per request", per_request_client),
+        ("shared client", shared_client),
+        ("MediaFileStorage.url", storage_url),
+    ):
+        best, median = measure(func, 3)
+        baseline = baseline or best
+        rows.append((name, f"{best / CALLS * 1000:.3f}", f"{median / CALLS * 1000:.3f}", f"{baseline / best:.1f}x"))
+    print_table(("variant", "best ms/url", "median ms/url", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
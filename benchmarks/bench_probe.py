@@ -0,0 +1,54 @@
+"""
+Чтение метаданных видео mp4probe.probe() на синтетических файлах
+(fake_mp4): сколько Range запросов и байт нужно на один файл по сравнению
+с его полным скачиванием, и время разбора. Чтение идёт из памяти,
+поэтому время — только CPU; в R2 каждый запрос добавляет один RTT.
+
+    python -m benchmarks.bench_probe
+"""
+from benchmarks.utils import measure, print_table, setup_django
+
+CALLS = 200
+MIB = 1024 * 1024
+
+SAMPLES = (
+    ("10 MiB, moov в начале", {"mdat_size": 10 * MIB}),
+    ("10 MiB, moov в конце", {"mdat_size": 10 * MIB, "moov_at_end": True}),
+    ("200 MiB, moov в конце", {"mdat_size": 200 * MIB, "moov_at_end": True}),
+    ("200 MiB MOV, 64-бит mdat", {"mdat_size": 200 * MIB, "moov_at_end": True, "brand": b"qt  ",
+                                  "version": 1, "large_mdat": True}),
+)
+
+
+def main():
+    setup_django()
+    from mobile_rest import fake_mp4, mp4probe
+
+    rows = []
+    for name, kwargs in SAMPLES:
+        data = fake_mp4.make_mp4(duration=95.5, width=1920, height=1080, **kwargs)
+
+        def read(offset, length):
+            return data[offset:offset + length]
+
+        _, reader = mp4probe.probe(read, len(data))
+
+        def run():
+            for _ in range(CALLS):
+                mp4probe.probe(read, len(data))
+
+        best, median = measure(run, 3)
+        rows.append((
+            name,
+            f"{len(data) / MIB:.1f}",
+            reader.requests,
+            reader.bytes_read,
+            f"{reader.bytes_read / len(data) * 100:.3f}%",
+            f"{best / CALLS * 1000:.3f}",
+            f"{median / CALLS * 1000:.3f}",
+        ))
+    print_table(("file", "size MiB", "requests", "bytes read", "read", "best ms", "median ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Стоимость URL видео в списках заявок и новостей (MediaFilesSerializer,
+NewsSerializer и быстрый .values()-путь) при разных способах построения URL:
+    botocore — S3Storage.url() через generate_presigned_url;
+    signed   — PresignedUrlSigner с кэшем окна;
+    public   — CDN-домен (CLOUDFLARE_R2_PUBLIC_DOMAIN), конкатенация строк.
+
+Время построения URL берётся из cProfile: суммарное время вызовов кода
+хранилища (helpers/cloudflare, storages, botocore) из остального кода,
+делённое на число файлов в ответе; там же считаются вызовы botocore.
+
+    python -m benchmarks.bench_public_urls
+"""
+import cProfile
+import pstats
+
+from benchmarks.bench_list_serializers import FILES_PER_ROW, populate
+from benchmarks.utils import measure, print_table, setup_django, test_database
+
+ROWS = 1_000
+STORAGE_CODE = ("helpers/cloudflare", "storages/backends", "botocore")
+
+
+def _in_storage(func):
+    return any(part in func[0] for part in STORAGE_CODE)
+
+
+def profile(func):
+    """
+    (время в коде хранилища, число вызовов функций botocore) за один вызов func.
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    stats = pstats.Stats(profiler).stats
+    storage_time = 0.0
+    botocore_calls = 0
+    for function, (_, calls, _, _, callers) in stats.items():
+        if "botocore" in function[0]:
+            botocore_calls += calls
+        if not _in_storage(function):
+            continue
+        # Только входы в код хранилища извне, чтобы не считать вложенные вызовы дважды
+        storage_time += sum(caller_stats[3] for caller, caller_stats in callers.items() if not _in_storage(caller))
+    return storage_time, botocore_calls
+
+
+def main():
+    setup_django()
+    from unittest.mock import patch
+
+    from django.core.files.storage import storages
+    from rest_framework.renderers import JSONRenderer
+
+    from mobile_rest.fast_serializer import FastMediaFilesSerializer, FastNewsSerializer
+    from mobile_rest.models import MediaFiles, News
+    from mobile_rest.serializer import MediaFilesSerializer, NewsSerializer
+
+    renderer = JSONRenderer()
+    storage = storages["default"]
+    variants = (
+        ("botocore", {"public_url_prefix": None, "signer": None}),
+        ("signed", {"public_url_prefix": None}),
+        ("public", {"public_url_prefix": "https://media.example.com/media/"}),
+    )
+    endpoints = (
+        ("mediafiles model", lambda: renderer.render(
+            MediaFilesSerializer(MediaFiles.objects.with_videos()[:ROWS], many=True).data)),
+        ("mediafiles fast", lambda: renderer.render(FastMediaFilesSerializer(
+            list(MediaFiles.objects.values(*FastMediaFilesSerializer.values_fields)[:ROWS])).data)),
+        ("news model", lambda: renderer.render(NewsSerializer(News.objects.with_media()[:ROWS], many=True).data)),
+        ("news fast", lambda: renderer.render(FastNewsSerializer(
+            list(News.objects.values(*FastNewsSerializer.values_fields)[:ROWS])).data)),
+    )
+    files = ROWS * FILES_PER_ROW
+
+    with test_database():
+        populate(ROWS)
+        rows = []
+        for endpoint, func in endpoints:
+            for variant, attributes in variants:
+                with patch.multiple(storage, **attributes):
+                    func()  # прогрев: клиент boto3, кэш подписей
+                    best, _ = measure(func, 3)
+                    url_time, botocore_calls = profile(func)
+                rows.append((
+                    endpoint, variant, f"{best * 1000:.1f}",
+                    f"{url_time / files * 1e6:.2f}", botocore_calls,
+                ))
+    print(f"{ROWS} rows x {FILES_PER_ROW} files")
+    print_table(("endpoint", "urls", "total ms", "url us/file (cProfile)", "botocore calls"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+URL файлов для списка из NAMES объектов ProtectedMediaStorage (private ACL):
+S3Storage.url() через botocore, CloudflareStorage.url() (PresignedUrlSigner,
+холодный и прогретый кэш окна), пакетный urls() — и для сравнения
+неподписанный URL публичного файла (S3Storage с custom_domain).
+
+    python -m benchmarks.bench_signed_urls
+"""
+from benchmarks.utils import measure, print_table, setup_django
+
+NAMES = 1000
+
+
+def main():
+    setup_django()
+    from django.conf import settings
+    from storages.backends.s3 import S3Storage
+
+    from helpers.cloudflare.storages import ProtectedMediaStorage
+
+    options = settings.STORAGES["default"]["OPTIONS"]
+    names = [f"video/{i}_clip.mp4" for i in range(NAMES)]
+    storage = ProtectedMediaStorage(**options)
+    public = S3Storage(**{**options, "custom_domain": "cdn.example.com"})
+
+    def botocore_url():
+        for name in names:
+            S3Storage.url(storage, name)
+
+    def signer_cold():
+        storage.signer._cache_window = None
+        for name in names:
+            storage.url(name)
+
+    def signer_cached():
+        for name in names:
+            storage.url(name)
+
+    def signer_batch_cold():
+        storage.signer._cache_window = None
+        storage.urls(names)
+
+    def public_url():
+        for name in names:
+            public.url(name)
+
+    botocore_url()  # прогрев общего клиента
+    rows = []
+    baseline = None
+    for name, func in (
+        ("botocore generate_presigned_url", botocore_url),
+        ("signer, cold window", signer_cold),
+        ("signer, cached window", signer_cached),
+        ("urls() batch, cold window", signer_batch_cold),
+        ("public URL (custom_domain)", public_url),
+    ):
+        best, median = measure(func, 5)
+        baseline = baseline or best
+        rows.append((name, f"{best / NAMES * 1e6:.2f}", f"{median / NAMES * 1e6:.2f}", f"{baseline / best:.1f}x"))
+    print_table(("variant", "best us/url", "median us/url", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Отправка SMS через локальный FakeMobizonServer: requests.get на каждый вызов
+(новое соединение) против общего MobizonClient с keep-alive пулом, а также
+время отказа при недоступном провайдере с разомкнутым предохранителем.
+
+    python -m benchmarks.bench_sms
+"""
+import requests
+
+from benchmarks.utils import measure, print_table, setup_django
+
+CALLS = 200
+
+
+def main():
+    setup_django()
+    from mobile_rest.fake_mobizon import FakeMobizonServer
+    from mobile_rest.sms_service import CircuitBreaker, CircuitOpenError, MobizonClient, MobizonError
+
+    params = {"recipient": "77001234567", "text": "Проверочный код: 123456", "apiKey": "bench"}
+    rows = []
+    with FakeMobizonServer() as server:
+        for latency in (0.0, 0.005):
+            server.latency = latency
+
+            def plain():
+                for _ in range(CALLS):
+                    requests.get(server.url, params=params, timeout=5).json()
+
+            client = MobizonClient(server.url, "bench")
+
+            def pooled():
+                for _ in range(CALLS):
+                    client.send_sms(params["recipient"], params["text"])
+
+            server.connections = 0
+            plain_best, _ = measure(plain, 3)
+            plain_connections = server.connections // 3
+            server.connections = 0
+            pooled_best, _ = measure(pooled, 3)
+            pooled_connections = server.connections
+            client.close()
+            rows.append((
+                f"{latency * 1000:.0f} ms",
+                f"{plain_best / CALLS * 1000:.2f}",
+                plain_connections,
+                f"{pooled_best / CALLS * 1000:.2f}",
+                pooled_connections,
+                f"{plain_best / pooled_best:.1f}x",
+            ))
+        print_table(
+            ("latency", "requests.get ms", "conns", "client ms", "conns", "speedup"),
+            rows,
+        )
+
+        # Провайдер отвечает 503: первые вызовы тратят повторы, затем предохранитель
+        # размыкается и вызовы завершаются сразу
+        server.latency = 0.0
+        client = MobizonClient(server.url, "bench", retries=2, backoff=0.01, breaker=CircuitBreaker(threshold=3))
+
+        def failing():
+            server.fail_next[:] = [503] * 1000
+            try:
+                client.send_sms(params["recipient"], params["text"])
+            except CircuitOpenError:
+                return "open"
+            except MobizonError:
+                return "error"
+
+        print()
+        failure_rows = []
+        for call in range(5):
+            outcome = []
+            best, _ = measure(lambda: outcome.append(failing()), 1)
+            failure_rows.append((call + 1, outcome[0], f"{best * 1000:.2f}"))
+        client.close()
+        print_table(("call", "outcome", "ms"), failure_rows)
+
+
+if __name__ == "__main__":
+    main()
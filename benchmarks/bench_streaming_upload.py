@@ -0,0 +1,159 @@
+"""
+Загрузка видео новости через PostNewsView (multipart/form-data): как раньше —
+MultiPartParser складывает файлы во временные файлы, затем S3Storage загружает
+их в бакет, — и со StreamingUploadHandler, который отправляет части в R2 по
+мере получения. Для каждого варианта — время запроса и пиковый RSS процесса.
+
+Тело запроса генерируется на лету (в память целиком не попадает), R2
+заменён локальным FakeR2Server в отдельном процессе, который отбрасывает
+данные. Каждый вариант выполняется в своём процессе, чтобы пиковый RSS
+не смешивался.
+
+    python -m benchmarks.bench_streaming_upload [--files 10] [--size-mib 200]
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+from benchmarks.utils import print_table, setup_django
+
+MIB = 1024 * 1024
+BOUNDARY = "benchboundary"
+
+
+class MultipartBody:
+    """
+    Поток тела multipart/form-data с files файлами по size байт (нули).
+    """
+
+    def __init__(self, files, size):
+        head = (
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"title\"\r\n\r\nBench\r\n"
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"text\"\r\n\r\nBench\r\n"
+        ).encode()
+        self.segments = [(head, 1)]
+        for i in range(files):
+            file_head = (
+                f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"media\"; filename=\"clip{i}.mp4\"\r\n"
+                "Content-Type: video/mp4\r\n\r\n"
+            ).encode()
+            self.segments += [(file_head, 1), (bytes(MIB), size // MIB), (bytes(size % MIB), 1), (b"\r\n", 1)]
+        self.segments.append((f"--{BOUNDARY}--\r\n".encode(), 1))
+        self.length = sum(len(data) * count for data, count in self.segments)
+        self._chunks = (data for data, count in self.segments for _ in range(count))
+        self._chunk = b""
+        self._pos = 0
+
+    def _current(self):
+        # Текущий кусок без копирования; b"" — тело закончилось
+        while self._pos == len(self._chunk):
+            self._chunk, self._pos = next(self._chunks, None), 0
+            if self._chunk is None:
+                self._chunk = b""
+                break
+        return self._chunk
+
+    def read(self, size=-1):
+        parts = []
+        while size:
+            chunk = self._current()
+            if not chunk:
+                break
+            end = len(chunk) if size < 0 else min(len(chunk), self._pos + size)
+            parts.append(chunk[self._pos:end])
+            size -= end - self._pos if size > 0 else 0
+            self._pos = end
+        return b"".join(parts)
+
+    def readline(self, size=-1):
+        chunk = self._current()
+        end = chunk.find(b"\n", self._pos) + 1 or len(chunk)
+        return self.read(end - self._pos if size < 0 else min(end - self._pos, size))
+
+
+def _serve(queue):
+    from mobile_rest.fake_r2 import FakeR2Server
+
+    server = FakeR2Server()
+    queue.put(server.url)
+    server.serve_forever()
+
+
+def _run(variant, url, files, size, queue):
+    setup_django()
+    from django.conf import settings
+
+    # R2 заменяется FakeR2Server до первого обращения к хранилищу
+    settings.STORAGES["default"]["OPTIONS"] = {**settings.STORAGES["default"]["OPTIONS"], "endpoint_url": url}
+
+    from django.core.handlers.wsgi import WSGIRequest
+    from rest_framework.test import force_authenticate
+    from rest_framework.views import APIView
+
+    from benchmarks.utils import test_database
+    from mobile_rest.models import CustomUser, MediaFileNews
+    from mobile_rest.views import PostNewsView
+
+    class BufferedPostNewsView(PostNewsView):
+        # Прежний путь: без StreamingUploadHandler
+        def initial(self, request, *args, **kwargs):
+            APIView.initial(self, request, *args, **kwargs)
+
+    view_class = PostNewsView if variant == "streaming" else BufferedPostNewsView
+    with test_database():
+        user = CustomUser.objects.create_user(phone_number="70000000000", password="pass")
+        body = MultipartBody(files, size)
+        request = WSGIRequest({
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/api/v1/news/upload/",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": body,
+            "CONTENT_TYPE": f"multipart/form-data; boundary={BOUNDARY}",
+            "CONTENT_LENGTH": str(body.length),
+        })
+        force_authenticate(request, user=user)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        response = view_class.as_view()(request)
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 201, response.data
+        assert MediaFileNews.objects.count() == files
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, rss_before // 1024, rss_peak // 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--size-mib", type=int, default=200)
+    args = parser.parse_args()
+    size = args.size_mib * MIB
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    server = context.Process(target=_serve, args=(queue,), daemon=True)
+    server.start()
+    url = queue.get()
+
+    rows = []
+    try:
+        for variant, name in (("buffered", "temp file + S3Storage"), ("streaming", "StreamingUploadHandler")):
+            process = context.Process(target=_run, args=(variant, url, args.files, size, queue))
+            process.start()
+            process.join()
+            if process.exitcode:
+                raise SystemExit(f"{variant}: exit code {process.exitcode}")
+            elapsed, rss_before, rss_peak = queue.get()
+            total = args.files * size / MIB
+            rows.append((name, f"{elapsed:.2f}", f"{total / elapsed:.0f}", rss_before, rss_peak, rss_peak - rss_before))
+    finally:
+        server.terminate()
+    print(f"{args.files} x {args.size_mib} MiB")
+    print_table(("variant", "wall s", "MiB/s", "RSS before MiB", "peak RSS MiB", "growth MiB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Общие помощники для бенчмарков.
+
+Запуск: python -m benchmarks.<имя модуля> из корня проекта.
+Настройки берутся из DJANGO_SETTINGS_MODULE (по умолчанию mobile_prj.settings).
+Данные создаются в отдельной тестовой БД, которая создаётся и удаляется
+так же, как при manage.py test, поэтому рабочая БД не затрагивается.
+"""
+import contextlib
+import os
+import statistics
+import time
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mobile_prj.settings")
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5):
+    """
+    Выполняет func repeat раз; возвращает (лучшее, медиана) в секундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    line = "  ".join(f"{{:>{width}}}" for width in widths)
+    print(line.format(*headers))
+    for row in rows:
+        print(line.format(*row))
@@ -4,5 +4,17 @@ set -e
 echo "Collecting static files"
 python manage.py collectstatic --noinput
 
+# Повторная отправка push-уведомлений из outbox (см. mobile_rest/outbox.py);
+# NOTIFICATION_WORKER=0 — если воркер запущен отдельным сервисом
+if [ "${NOTIFICATION_WORKER:-1}" != "0" ]; then
+    echo "Starting notification worker"
+    (
+        while true; do
+            python manage.py dispatch_notifications || echo "Notification worker exited, restarting"
+            sleep 5
+        done
+    ) &
+fi
+
 echo "Starting"
 exec gunicorn -k gevent -w 4 -t 900 --bind 0.0.0.0:8000 mobile_prj.wsgi:application --log-level=debug
@@ -1,3 +1,3 @@
-from . import settings
+from . import clients, settings, signing, uploadhandler
 
-__all__ = ["settings"]
+__all__ = ["clients", "settings", "signing", "uploadhandler"]
@@ -0,0 +1,101 @@
+"""
+Общие для процесса клиенты boto3 для Cloudflare R2.
+
+Создание клиента boto3 занимает миллисекунды CPU (загрузка моделей сервиса,
+регистрация обработчиков), поэтому клиент строится один раз при первом
+обращении и переиспользуется всеми потоками/гринлетами процесса: клиенты
+boto3 потокобезопасны, а их пул соединений держит keep-alive соединения к R2.
+
+S3 resource потокобезопасным не является, поэтому у каждого потока (гринлета)
+он свой, как в django-storages, — но лёгкий: создаётся из общего класса
+resource поверх общего клиента, без загрузки моделей и нового пула соединений.
+
+Используется представлениями (presigned URL) и CloudflareStorage.
+"""
+import threading
+
+import boto3
+from botocore import UNSIGNED
+from botocore.config import Config
+
+from . import settings
+
+_lock = threading.Lock()
+# Образцы resource по параметрам подключения: источник общего клиента и класса
+# resource; сами наружу не отдаются
+_templates = {}
+_local = threading.local()
+
+def client_config(signed=True):
+    """
+    Настройки botocore: пул соединений на процесс (под gevent одновременно
+    работает много гринлетов), TCP keep-alive, ограниченные таймауты
+    и стандартный режим повторов.
+    """
+    return Config(
+        signature_version="s3v4" if signed else UNSIGNED,
+        max_pool_connections=settings.max_pool_connections,
+        connect_timeout=settings.connect_timeout,
+        read_timeout=settings.read_timeout,
+        tcp_keepalive=True,
+        retries={"max_attempts": 3, "mode": "standard"},
+    )
+
+
+def _key(endpoint_url, access_key, secret_key, signed):
+    return (
+        endpoint_url or settings.endpoint_url,
+        access_key or settings.access_key,
+        secret_key or settings.secret_key,
+        signed,
+    )
+
+
+def _template(key):
+    template = _templates.get(key)
+    if template is None:
+        with _lock:
+            template = _templates.get(key)
+            if template is None:
+                endpoint_url, access_key, secret_key, signed = key
+                session = boto3.session.Session(
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                )
+                template = session.resource(
+                    "s3",
+                    endpoint_url=endpoint_url,
+                    region_name="auto",
+                    config=client_config(signed),
+                )
+                _templates[key] = template
+    return template
+
+
+def get_resource(endpoint_url=None, access_key=None, secret_key=None, signed=True):
+    """
+    S3 resource для R2 текущего потока; без аргументов — с учётными данными из настроек.
+    Клиент (resource.meta.client) у всех потоков общий.
+    """
+    key = _key(endpoint_url, access_key, secret_key, signed)
+    template = _template(key)
+    resources = getattr(_local, "resources", None)
+    if resources is None:
+        resources = _local.resources = {}
+    cached = resources.get(key)
+    # После reset() у ключа новый образец — resource потока тоже пересоздаётся
+    if cached is None or cached[0] is not template:
+        cached = resources[key] = (template, type(template)(client=template.meta.client))
+    return cached[1]
+
+
+def get_client(endpoint_url=None, access_key=None, secret_key=None, signed=True):
+    return _template(_key(endpoint_url, access_key, secret_key, signed)).meta.client
+
+
+def reset():
+    """
+    Сбрасывает созданные клиенты (например, после fork или в тестах).
+    """
+    with _lock:
+        _templates.clear()
@@ -18,6 +18,14 @@ endpoint_url = config("CLOUDFLARE_R2_BUCKET_ENDPOINT")
 access_key = config("CLOUDFLARE_R2_ACCESS_KEY")
 secret_key = config("CLOUDFLARE_R2_SECRET_KEY")
 
+# Пул соединений и таймауты общих клиентов (см. clients.py)
+max_pool_connections = int(config("CLOUDFLARE_R2_MAX_POOL_CONNECTIONS", default=50))
+connect_timeout = float(config("CLOUDFLARE_R2_CONNECT_TIMEOUT", default=5))
+read_timeout = float(config("CLOUDFLARE_R2_READ_TIMEOUT", default=60))
+# Домен CDN, подключённый к бакету (например, media.example.com): публичные
+# хранилища строят URL файлов конкатенацией строк, без подписи (см. storages.py)
+public_domain = config("CLOUDFLARE_R2_PUBLIC_DOMAIN", default=None) or None
+
 if all([bucket_name, endpoint_url, access_key, secret_key]):
     CLOUDFLARE_R2_CONFIG_OPTIONS = {
         "bucket_name": config("CLOUDFLARE_R2_BUCKET"),
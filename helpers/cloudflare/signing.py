@@ -0,0 +1,108 @@
+"""
+Быстрая подпись presigned GET URL для файлов в R2 (SigV4, query string).
+
+botocore.generate_presigned_url на каждый вызов строит запрос, прогоняет
+обработчики событий и заново выводит ключ подписи — это десятки микросекунд
+на каждую строку каждого ответа со списком файлов. PresignedUrlSigner
+подписывает те же URL, что и botocore (path-style, UNSIGNED-PAYLOAD,
+SignedHeaders=host), но:
+    ключ подписи выводится из секрета один раз в сутки (он зависит только
+        от даты, региона и сервиса);
+    время подписи округляется вниз до начала окна длиной window секунд,
+        а срок действия увеличивается на window — поэтому в пределах окна
+        URL одного объекта не меняется и кэшируется (и браузером/CDN тоже);
+    urls() подписывает список ключей, вычисляя общие части один раз.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+SERVICE = "s3"
+# Кэш URL одного окна; при переполнении очищается целиком
+MAX_CACHED_URLS = 10000
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+class PresignedUrlSigner:
+    def __init__(self, endpoint_url, bucket_name, access_key, secret_key, region="auto", expires=3600, window=300):
+        parts = urlsplit(endpoint_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc
+        self.path_prefix = f"{parts.path.rstrip('/')}/{quote(bucket_name, safe='')}/"
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.expires = expires
+        self.window = window
+        self._lock = threading.Lock()
+        self._signing_key = (None, None)
+        self._cache_window = None
+        self._cache = {}
+
+    def _key_for(self, date):
+        cached_date, key = self._signing_key
+        if cached_date != date:
+            key = _hmac(("AWS4" + self.secret_key).encode(), date)
+            for part in (self.region, SERVICE, "aws4_request"):
+                key = _hmac(key, part)
+            self._signing_key = (date, key)
+        return key
+
+    def _window_start(self, now):
+        return int(now // self.window * self.window)
+
+    def _prepare(self, window_start):
+        """
+        Общие для всех ключей окна части: ключ подписи, строка запроса без подписи,
+        начало строки для подписи.
+        """
+        timestamp = time.gmtime(window_start)
+        date = time.strftime("%Y%m%d", timestamp)
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", timestamp)
+        scope = f"{date}/{self.region}/{SERVICE}/aws4_request"
+        query = (
+            f"X-Amz-Algorithm={ALGORITHM}"
+            f"&X-Amz-Credential={quote(f'{self.access_key}/{scope}', safe='')}"
+            f"&X-Amz-Date={amz_date}"
+            f"&X-Amz-Expires={self.expires + self.window}"
+            f"&X-Amz-SignedHeaders=host"
+        )
+        string_to_sign_prefix = f"{ALGORITHM}\n{amz_date}\n{scope}\n"
+        return self._key_for(date), query, string_to_sign_prefix
+
+    def _sign(self, key, prepared):
+        signing_key, query, string_to_sign_prefix = prepared
+        path = self.path_prefix + quote(key, safe="/~")
+        canonical_request = f"GET\n{path}\n{query}\nhost:{self.host}\n\nhost\nUNSIGNED-PAYLOAD"
+        string_to_sign = string_to_sign_prefix + hashlib.sha256(canonical_request.encode()).hexdigest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return f"{self.base_url}{path}?{query}&X-Amz-Signature={signature}"
+
+    def urls(self, keys, now=None):
+        """
+        Presigned GET URL для ключей объектов (с учётом location); порядок сохраняется.
+        """
+        window_start = self._window_start(time.time() if now is None else now)
+        with self._lock:
+            if self._cache_window != window_start or len(self._cache) > MAX_CACHED_URLS:
+                self._cache_window, self._cache = window_start, {}
+            cache = self._cache
+            prepared = None
+            result = []
+            for key in keys:
+                url = cache.get(key)
+                if url is None:
+                    if prepared is None:
+                        prepared = self._prepare(window_start)
+                    url = cache[key] = self._sign(key, prepared)
+                result.append(url)
+            return result
+
+    def url(self, key, now=None):
+        return self.urls([key], now)[0]
@@ -1,13 +1,122 @@
+from botocore.exceptions import ClientError
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
 from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
 
 import helpers.storages.mixins as mixins
+from helpers.cloudflare import clients, settings as r2_settings
+from helpers.cloudflare.signing import PresignedUrlSigner
+from helpers.cloudflare.uploadhandler import StreamedUploadedFile
 
 
 class CloudflareStorage(S3Storage):
-    pass
+    """
+    S3Storage, использующий общие для процесса клиенты R2 вместо создания
+    своего boto3 resource в каждом потоке (под gevent — в каждом гринлете).
+
+    Presigned URL в url()/urls() подписываются PresignedUrlSigner: в пределах
+    окна url_window секунд URL объекта один и тот же и берётся из кэша.
+    Публичные хранилища (default_acl public-read) с заданным public_domain
+    (CLOUDFLARE_R2_PUBLIC_DOMAIN) отдают URL через CDN без подписи и botocore.
+
+    exists()/size()/get_modified_time() хранилищ ниже кэшируются
+    MetadataCacheMixin'ом по метаданным из head() — одного HEAD на объект.
+    """
+
+    url_window = 300
+
+    def get_default_settings(self):
+        _settings = super().get_default_settings()
+        _settings["public_domain"] = r2_settings.public_domain
+        return _settings
+
+    @property
+    def connection(self):
+        return clients.get_resource(self.endpoint_url, self.access_key, self.secret_key)
+
+    @property
+    def unsigned_connection(self):
+        return clients.get_resource(self.endpoint_url, self.access_key, self.secret_key, signed=False)
+
+    @cached_property
+    def signer(self):
+        # Прочие варианты (свой домен, virtual-host адресация, без подписи) — как в S3Storage
+        if (
+            not self.querystring_auth
+            or self.custom_domain
+            or self.addressing_style == "virtual"
+            or self.signature_version not in (None, "s3v4")
+            or not all([self.endpoint_url, self.access_key, self.secret_key])
+        ):
+            return None
+        return PresignedUrlSigner(
+            self.endpoint_url, self.bucket_name, self.access_key, self.secret_key,
+            expires=self.querystring_expire, window=self.url_window,
+        )
+
+    @cached_property
+    def public_url_prefix(self):
+        # Приватные объекты по публичному домену недоступны — для них только подпись
+        if not self.public_domain or self.default_acl != "public-read":
+            return None
+        prefix = f"{self.url_protocol}//{self.public_domain}/"
+        location = filepath_to_uri(self.location.strip("/"))
+        return f"{prefix}{location}/" if location else prefix
+
+    @property
+    def signs_urls(self):
+        """
+        True, если url() отдаёт подписанные URL с ограниченным сроком действия.
+        """
+        return self.public_url_prefix is None and bool(self.querystring_auth)
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if self.public_url_prefix and not parameters and http_method in (None, "GET"):
+            return self.public_url_prefix + filepath_to_uri(name)
+        if self.signer is None or parameters or expire is not None or http_method not in (None, "GET"):
+            return super().url(name, parameters, expire, http_method)
+        return self.signer.url(self._normalize_name(clean_name(name)))
+
+    def urls(self, names):
+        """
+        url() для списка имён: list-сериализаторы подписывают все файлы ответа одним вызовом.
+        """
+        if self.public_url_prefix:
+            prefix = self.public_url_prefix
+            return [prefix + filepath_to_uri(name) for name in names]
+        if self.signer is None:
+            return [self.url(name) for name in names]
+        return self.signer.urls([self._normalize_name(clean_name(name)) for name in names])
+
+    def head(self, name):
+        """
+        Метаданные объекта {"size", "etag", "content_type", "uploaded_at"} одним HEAD;
+        None, если объекта нет.
+        """
+        try:
+            response = self.connection.meta.client.head_object(
+                Bucket=self.bucket_name, Key=self._normalize_name(clean_name(name))
+            )
+        except ClientError as err:
+            if err.response["ResponseMetadata"]["HTTPStatusCode"] == 404:
+                return None
+            raise
+        return {
+            "size": response["ContentLength"],
+            "etag": response.get("ETag", "").strip('"'),
+            "content_type": response.get("ContentType", ""),
+            "uploaded_at": response.get("LastModified"),
+        }
+
+    def _save(self, name, content):
+        # Файл уже загружен в этот бакет StreamingUploadHandler'ом — повторно не загружаем
+        if isinstance(content, StreamedUploadedFile) and content.storage is self:
+            return content.key
+        return super()._save(name, content)
 
 
-class StaticFileStorage(mixins.DefaultACLMixin, CloudflareStorage):
+class StaticFileStorage(mixins.MetadataCacheMixin, mixins.DefaultACLMixin, CloudflareStorage):
     """
     For staticfiles
     """
@@ -16,7 +125,7 @@ class StaticFileStorage(mixins.DefaultACLMixin, CloudflareStorage):
     default_acl = "public-read"
 
 
-class MediaFileStorage(mixins.DefaultACLMixin, CloudflareStorage):
+class MediaFileStorage(mixins.MetadataCacheMixin, mixins.DefaultACLMixin, CloudflareStorage):
     """
     For general uploads
     """
@@ -25,7 +134,7 @@ class MediaFileStorage(mixins.DefaultACLMixin, CloudflareStorage):
     default_acl = "public-read"
 
 
-class ProtectedMediaStorage(mixins.DefaultACLMixin, CloudflareStorage):
+class ProtectedMediaStorage(mixins.MetadataCacheMixin, mixins.DefaultACLMixin, CloudflareStorage):
     """
     For user private uploads
     """
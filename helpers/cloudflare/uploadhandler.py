@@ -0,0 +1,170 @@
+"""
+Потоковая загрузка файлов из multipart/form-data запроса прямо в R2.
+
+Обычно Django складывает загружаемый файл в память или во временный файл
+на диске, а хранилище потом перечитывает его и загружает в бакет, пока
+воркер ждёт. StreamingUploadHandler вместо этого открывает S3 multipart
+upload в момент начала файла и отправляет его частями по PART_SIZE байт по
+мере получения: на диск ничего не пишется, в памяти держится не больше двух
+частей (заполняемая и загружаемая в фоне).
+
+Результат — StreamedUploadedFile, уже лежащий в бакете; CloudflareStorage.save()
+для такого файла не загружает его повторно, а возвращает его ключ.
+
+Загрузка завершается ещё при разборе запроса, поэтому если представление
+затем отвечает ошибкой, загруженные файлы удаляются (discard_completed).
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from storages.utils import clean_name
+
+logger = logging.getLogger(__name__)
+
+# Все части, кроме последней, должны быть не меньше 5 МиБ
+PART_SIZE = 8 * 1024 * 1024
+
+
+class StreamedUploadedFile(UploadedFile):
+    """
+    Файл, уже загруженный в бакет storage под ключом key (относительно location).
+    Содержимое не читается: у файла есть только имя, размер и тип.
+    """
+
+    def __init__(self, storage, key, name, size, content_type, charset=None, content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.storage = storage
+        self.key = key
+
+    def open(self, mode=None):
+        raise ValueError("Содержимое файла находится в хранилище")
+
+    def chunks(self, chunk_size=None):
+        raise ValueError("Содержимое файла находится в хранилище")
+
+    def close(self):
+        pass
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    upload_to = "video/"
+    part_size = PART_SIZE
+
+    def __init__(self, request=None, storage=None):
+        super().__init__(request)
+        self.storage = storage or storages["default"]
+        self.upload_id = None
+        # Ключи файлов, загрузка которых уже завершена
+        self.completed_keys = []
+
+    @property
+    def active(self):
+        # Прочие хранилища (например, локальные) — обычными обработчиками Django
+        from .storages import CloudflareStorage
+
+        return isinstance(self.storage, CloudflareStorage)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if not self.active:
+            return
+        self.key = f"{self.upload_to}{uuid.uuid4()}_{self.storage.get_valid_name(file_name)}"
+        self.object_key = self.storage._normalize_name(clean_name(self.key))
+        params = self.storage._get_write_parameters(self.object_key)
+        if content_type:
+            params["ContentType"] = content_type
+        self.client = self.storage.connection.meta.client
+        response = self.client.create_multipart_upload(
+            Bucket=self.storage.bucket_name, Key=self.object_key, **params
+        )
+        self.upload_id = response["UploadId"]
+        self.buffer = bytearray()
+        self.parts = []
+        self.pending = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Остальные обработчики (память, временный файл) этот файл не получают
+        raise StopFutureHandlers()
+
+    def _upload_part(self, upload_id, part_number, body):
+        response = self.client.upload_part(
+            Bucket=self.storage.bucket_name,
+            Key=self.object_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _flush(self):
+        # Пока загружается одна часть, следующая заполняется; третьей в памяти не бывает
+        self._wait()
+        body, self.buffer = bytes(self.buffer), bytearray()
+        self.pending = self.executor.submit(self._upload_part, self.upload_id, len(self.parts) + 1, body)
+
+    def _wait(self):
+        if self.pending is not None:
+            self.parts.append(self.pending.result())
+            self.pending = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_id is None:
+            return raw_data
+        self.buffer += raw_data
+        if len(self.buffer) >= self.part_size:
+            self._flush()
+        return None
+
+    def file_complete(self, file_size):
+        if self.upload_id is None:
+            return None
+        try:
+            # Последняя часть (или единственная, в том числе пустая)
+            if self.buffer or not self.parts:
+                self._flush()
+            self._wait()
+            self.client.complete_multipart_upload(
+                Bucket=self.storage.bucket_name,
+                Key=self.object_key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        except Exception:
+            self.upload_interrupted()
+            raise
+        finally:
+            self.executor.shutdown(wait=False)
+        self.upload_id = None
+        self.completed_keys.append(self.key)
+        return StreamedUploadedFile(
+            self.storage, self.key, self.file_name, file_size,
+            self.content_type, self.charset, self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        if self.upload_id is None:
+            return
+        upload_id, self.upload_id = self.upload_id, None
+        self.buffer = bytearray()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.storage.bucket_name, Key=self.object_key, UploadId=upload_id
+            )
+        except Exception as e:
+            # Незавершённые загрузки дочищает правило жизненного цикла бакета
+            logger.warning(f"Error aborting multipart upload {upload_id}: {e}")
+
+    def discard_completed(self):
+        """
+        Удаляет из бакета уже загруженные файлы запроса (ответ — ошибка, файлы никому не нужны).
+        """
+        keys, self.completed_keys = self.completed_keys, []
+        for key in keys:
+            try:
+                self.storage.delete(key)
+            except Exception as e:
+                logger.warning(f"Error deleting uploaded file {key}: {e}")
@@ -1,5 +1,6 @@
-from .mixins import DefaultACLMixin
+from .mixins import DefaultACLMixin, MetadataCacheMixin
 
 __all__ = [
     "DefaultACLMixin",
+    "MetadataCacheMixin",
 ]
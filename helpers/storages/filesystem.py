@@ -0,0 +1,165 @@
+"""
+Хранилища на локальном диске — двойники хранилищ R2 из helpers.cloudflare.storages
+для запуска приложения, тестов и бенчмарков без сети.
+
+Файлы лежат в LOCAL_STORAGE_ROOT так же, как объекты в бакете:
+"<prefix>/<имя>" (media/..., static/..., protected/...), и отдаются
+представлением helpers.storages.views.serve по LOCAL_STORAGE_URL.
+Поведение повторяет R2:
+    default_acl (DefaultACLMixin) — public-read файлы доступны по прямому URL,
+        остальные — только по подписанному;
+    подписанные URL на GET и PUT (аналог presigned URL) с ограниченным сроком
+        действия; в пределах окна url_window URL не меняется;
+    чтение диапазонов (Range) и HEAD-метаданные, как у объектов R2.
+
+Выбираются настройкой STORAGE_BACKEND = "local" (см. mobile_prj/settings.py).
+"""
+import mimetypes
+import os
+import stat
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.functional import cached_property
+
+import helpers.storages.mixins as mixins
+
+SIGNING_SALT = "helpers.storages.filesystem"
+
+
+def sign(method, key, expires):
+    return salted_hmac(SIGNING_SALT, f"{method}\n{key}\n{expires}", algorithm="sha256").hexdigest()
+
+
+def verify(method, key, expires, signature, now=None):
+    """
+    True, если подпись URL верна и срок его действия не истёк.
+    """
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < (time.time() if now is None else now):
+        return False
+    return constant_time_compare(sign(method, key, expires), signature or "")
+
+
+class LocalStorage(FileSystemStorage):
+    prefix = ""
+    default_acl = None
+    # Как у CloudflareStorage: срок действия подписанных URL и окно, в котором они не меняются
+    querystring_expire = 3600
+    url_window = 300
+
+    def __init__(self, root=None, root_url=None, **kwargs):
+        self.root = str(root or settings.LOCAL_STORAGE_ROOT)
+        self.root_url = root_url or settings.LOCAL_STORAGE_URL
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(
+            location=os.path.join(self.root, self.prefix),
+            base_url=f"{self.root_url}{self.prefix}/",
+            **kwargs,
+        )
+        self.default_acl = self.get_default_settings()["default_acl"]
+
+    def get_default_settings(self):
+        # Точка расширения для DefaultACLMixin, как у S3Storage
+        return {}
+
+    def key(self, name):
+        """
+        Ключ объекта относительно LOCAL_STORAGE_ROOT (как ключ в бакете).
+        """
+        return f"{self.prefix}/{name}"
+
+    @cached_property
+    def is_public(self):
+        return self.default_acl in ("public-read", "public-read-write")
+
+    @property
+    def signs_urls(self):
+        # Как у CloudflareStorage: url() непубличных хранилищ подписан
+        return not self.is_public
+
+    def signed_url(self, name, method="GET", now=None):
+        now = time.time() if now is None else now
+        window_start = int(now // self.url_window * self.url_window)
+        expires = window_start + self.querystring_expire + self.url_window
+        query = urlencode({"expires": expires, "signature": sign(method, self.key(name), expires)})
+        return f"{super().url(name)}?{query}"
+
+    def url(self, name):
+        if self.is_public:
+            return super().url(name)
+        return self.signed_url(name)
+
+    def urls(self, names):
+        return [self.url(name) for name in names]
+
+    def presigned_put_url(self, name):
+        return self.signed_url(name, "PUT")
+
+    def head(self, name):
+        """
+        Метаданные файла {"size", "etag", "content_type", "uploaded_at"} или None.
+        """
+        try:
+            info = os.stat(self.path(name))
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(info.st_mode):
+            return None
+        return {
+            "size": info.st_size,
+            "etag": f"{info.st_size:x}-{info.st_mtime_ns:x}",
+            "content_type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "uploaded_at": datetime.fromtimestamp(info.st_mtime, timezone.utc),
+        }
+
+    def read_range(self, name, offset, length):
+        with open(self.path(name), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+
+class StaticFileStorage(mixins.DefaultACLMixin, LocalStorage):
+    """
+    For staticfiles
+    """
+
+    prefix = "static"
+    default_acl = "public-read"
+
+
+class MediaFileStorage(mixins.DefaultACLMixin, LocalStorage):
+    """
+    For general uploads
+    """
+
+    prefix = "media"
+    default_acl = "public-read"
+
+
+class ProtectedMediaStorage(mixins.DefaultACLMixin, LocalStorage):
+    """
+    For user private uploads
+    """
+
+    prefix = "protected"
+    default_acl = "private"
+
+
+def storage_for_key(key):
+    """
+    (хранилище, имя файла) для ключа вида "<prefix>/<имя>" или (None, None).
+    Ищется только среди локальных хранилищ, настроенных в STORAGES.
+    """
+    for alias in settings.STORAGES:
+        storage = storages[alias]
+        if isinstance(storage, LocalStorage) and key.startswith(f"{storage.prefix}/"):
+            return storage, key[len(storage.prefix) + 1:]
+    return None, None
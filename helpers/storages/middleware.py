@@ -0,0 +1,30 @@
+import logging
+
+from .mixins import request_stats
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Storage-Metadata-Cache"
+
+
+class MetadataCacheStatsMiddleware:
+    """
+    Считает обращения к метаданным хранилищ (MetadataCacheMixin) за запрос:
+    hits — сэкономленные запросы к бакету, misses — сделанные. Если обращения
+    были, счётчики отдаются в заголовке X-Storage-Metadata-Cache и пишутся в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {"hits": 0, "misses": 0}
+        token = request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        if stats["hits"] or stats["misses"]:
+            response[HEADER] = f"hits={stats['hits']}, misses={stats['misses']}"
+            logger.debug(f"{request.method} {request.path}: storage metadata {response[HEADER]}")
+        return response
@@ -1,3 +1,12 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.timezone import make_naive
+
+
 class DefaultACLMixin:
     """
     Adds the ability to change default ACL for objects
@@ -38,3 +47,124 @@ class DefaultACLMixin:
                 acl_options = "\n\t".join(self.CANNED_ACL_OPTIONS)
                 raise Exception(f"{exception_message}\n{acl_options}")
         return _acl
+
+
+# Counters of the current request (see helpers.storages.middleware); None outside requests
+request_stats = contextvars.ContextVar("storage_metadata_request_stats", default=None)
+
+
+class MetadataCacheMixin:
+    """
+    Caches object metadata for exists(), size() and get_modified_time()
+    so repeated calls for the same name don't each make a round trip
+    to the bucket.
+
+    The storage must implement head(name) returning
+    {"size", "etag", "content_type", "uploaded_at"} or None if the object
+    does not exist: one HEAD fills every cached field.
+
+    The cache is a bounded LRU (metadata_cache_size names) with a TTL
+    (metadata_cache_ttl seconds), updated by save() and delete().
+    Missing objects are not cached: files uploaded by clients directly
+    through presigned URLs must become visible immediately.
+
+    Counters: metadata_stats for the storage instance, and per request
+    via request_stats: "hits" are round trips saved, "misses" are made.
+    """
+
+    metadata_cache_size = 1024
+    metadata_cache_ttl = 60
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metadata_lock = threading.Lock()
+        self._metadata_cache = OrderedDict()
+        self.metadata_stats = {"hits": 0, "misses": 0}
+
+    def get_default_settings(self):
+        _settings = super().get_default_settings()
+        _settings["metadata_cache_size"] = self.metadata_cache_size
+        _settings["metadata_cache_ttl"] = self.metadata_cache_ttl
+        return _settings
+
+    def _count(self, outcome):
+        with self._metadata_lock:
+            self.metadata_stats[outcome] += 1
+        stats = request_stats.get()
+        if stats is not None:
+            stats[outcome] += 1
+
+    def _remember(self, name, fields):
+        with self._metadata_lock:
+            cache = self._metadata_cache
+            cache.pop(name, None)
+            cache[name] = (time.monotonic() + self.metadata_cache_ttl, fields)
+            while len(cache) > self.metadata_cache_size:
+                cache.popitem(last=False)
+
+    def _forget(self, name):
+        with self._metadata_lock:
+            self._metadata_cache.pop(name, None)
+
+    def _cached(self, name, field):
+        with self._metadata_lock:
+            entry = self._metadata_cache.get(name)
+            if entry is None:
+                return None
+            expires, fields = entry
+            if expires <= time.monotonic():
+                del self._metadata_cache[name]
+                return None
+            if field is not None and field not in fields:
+                return None
+            self._metadata_cache.move_to_end(name)
+            return fields
+
+    def get_metadata(self, name, field=None):
+        """
+        Object metadata (see head()) from the cache or with a single request;
+        None if the object does not exist. field must be present in a cached
+        entry (after save() only the size is known).
+        """
+        fields = self._cached(name, field)
+        if fields is not None:
+            self._count("hits")
+            return fields
+        self._count("misses")
+        fields = self.head(name)
+        if fields is not None:
+            self._remember(name, fields)
+        return fields
+
+    def exists(self, name):
+        # S3Storage with file_overwrite never checks (nor hits the bucket) on save()
+        if getattr(self, "file_overwrite", False):
+            return super().exists(name)
+        return self.get_metadata(name) is not None
+
+    def size(self, name):
+        fields = self.get_metadata(name, "size")
+        if fields is None:
+            raise FileNotFoundError(f"File does not exist: {name}")
+        return fields["size"]
+
+    def get_modified_time(self, name):
+        fields = self.get_metadata(name, "uploaded_at")
+        if fields is None:
+            raise FileNotFoundError(f"File does not exist: {name}")
+        modified = fields["uploaded_at"]
+        return modified if settings.USE_TZ else make_naive(modified)
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        # Other fields (ETag, modified time) are only known to the bucket: loaded on demand
+        self._forget(name)
+        try:
+            self._remember(name, {"size": content.size})
+        except AttributeError:
+            pass
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self._forget(name)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import serve
+
+# Подключаются в mobile_prj/urls.py только при STORAGE_BACKEND = "local"
+urlpatterns = [
+    path("<path:key>", serve, name="local-storage"),
+]
@@ -0,0 +1,107 @@
+"""
+Отдача и приём файлов локальных хранилищ (helpers.storages.filesystem) —
+то, что для R2 делает сам бакет:
+    GET/HEAD — файл целиком или диапазон (Range, ответ 206); файлы
+        непубличных хранилищ — только по подписанному URL;
+    PUT — запись файла по подписанному URL (аналог presigned PUT).
+"""
+import re
+
+from django.core.files import File
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.views.decorators.csrf import csrf_exempt
+
+from .filesystem import storage_for_key, verify
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def _is_signed(request, method, key):
+    return verify(method, key, request.GET.get("expires"), request.GET.get("signature"))
+
+
+def _parse_range(header, size):
+    """
+    (начало, конец включительно) для заголовка Range с одним диапазоном;
+    None — заголовок не поддерживается (отдаётся весь файл),
+    ValueError — диапазон вне файла.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        # bytes=-N — последние N байт
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _read_chunks(f, length):
+    with f:
+        while length > 0:
+            chunk = f.read(min(length, CHUNK_SIZE))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _get(request, storage, name):
+    info = storage.head(name)
+    if info is None:
+        raise Http404
+    headers = {"ETag": f'"{info["etag"]}"', "Accept-Ranges": "bytes"}
+    size = info["size"]
+    try:
+        byte_range = _parse_range(request.headers.get("Range", ""), size)
+    except ValueError:
+        return HttpResponse(status=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if request.method == "HEAD":
+        return HttpResponse(content_type=info["content_type"], headers={**headers, "Content-Length": size})
+    if byte_range is None:
+        return FileResponse(storage.open(name, "rb"), content_type=info["content_type"], headers=headers)
+
+    start, end = byte_range
+    f = storage.open(name, "rb")
+    f.seek(start)
+    response = StreamingHttpResponse(
+        _read_chunks(f, end - start + 1), status=206, content_type=info["content_type"], headers=headers
+    )
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = end - start + 1
+    return response
+
+
+def _put(request, storage, name):
+    # Тело запроса пишется на диск потоком, без чтения в память
+    name = storage.save(name, File(request, name=name))
+    return HttpResponse(headers={"ETag": f'"{storage.head(name)["etag"]}"'})
+
+
+@csrf_exempt
+def serve(request, key):
+    storage, name = storage_for_key(key)
+    if storage is None or not name:
+        raise Http404
+    if request.method in ("GET", "HEAD"):
+        if not storage.is_public and not _is_signed(request, "GET", key):
+            return HttpResponseForbidden()
+        return _get(request, storage, name)
+    if request.method == "PUT":
+        if not _is_signed(request, "PUT", key):
+            return HttpResponseForbidden()
+        return _put(request, storage, name)
+    return HttpResponseNotAllowed(["GET", "HEAD", "PUT"])
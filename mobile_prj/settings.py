@@ -37,6 +37,13 @@ FCM_DJANGO_SETTINGS = {
     "DELETE_INACTIVE_DEVICES": True,  # Удалять неактивные устройства
 }
 
+# Модуль с API firebase_admin.messaging; "mobile_rest.fake_messaging" — локальная заглушка без сети
+FCM_MESSAGING_BACKEND = config("FCM_MESSAGING_BACKEND", default="firebase_admin.messaging")
+# Когда отправлять уведомления из outbox после коммита: "thread", "sync" или "worker"
+# (только manage.py dispatch_notifications)
+NOTIFICATION_DISPATCH_MODE = config("NOTIFICATION_DISPATCH_MODE", default="thread")
+NOTIFICATION_MAX_ATTEMPTS = 8
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_METHODS = [
     "DELETE",
@@ -51,6 +58,28 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    # orjson, если установлен; иначе классы сами переходят на json из стандартной библиотеки
+    "DEFAULT_RENDERER_CLASSES": (
+        "mobile_rest.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "mobile_rest.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Число доверенных прокси перед приложением (nginx, ingress, балансировщик):
+    # IP клиента для троттлинга берётся из X-Forwarded-For на столько адресов
+    # с конца. 0 — только REMOTE_ADDR: без прокси заголовок задаёт сам клиент,
+    # и лимит по IP обходился бы его подменой. За прокси NUM_PROXIES обязательно
+    # задать (обычно 1), иначе REMOTE_ADDR — адрес прокси, все клиенты попадают
+    # в одно ведро sms_ip и один клиент исчерпывает лимит для всех.
+    "NUM_PROXIES": config("NUM_PROXIES", default=0, cast=int),
+    # Token bucket для эндпоинтов, отправляющих SMS (см. mobile_rest/throttling.py)
+    "DEFAULT_THROTTLE_RATES": {
+        "sms_phone": config("SMS_THROTTLE_PHONE_RATE", default="5/hour"),
+        "sms_ip": config("SMS_THROTTLE_IP_RATE", default="60/hour"),
+    },
 }
 
 SIMPLE_JWT = {
@@ -73,6 +102,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Счётчики кэша метаданных хранилищ за запрос (заголовок X-Storage-Metadata-Cache)
+    "helpers.storages.middleware.MetadataCacheStatsMiddleware",
 ]
 
 ROOT_URLCONF = "mobile_prj.urls"
@@ -106,18 +137,78 @@ DATABASES = {
     }
 }
 
+# Общий кэш: Redis, если задан REDIS_URL (один кэш на все воркеры gunicorn),
+# иначе локальная память процесса
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# Время жизни закэшированных ответов news/detail/ и news/list/ (секунды).
+# Без Redis инвалидация видна только в процессе, изменившем новость,
+# поэтому TTL ограничивает устаревание в остальных воркерах.
+NEWS_CACHE_TIMEOUT = config("NEWS_CACHE_TIMEOUT", default=300 if REDIS_URL else 30, cast=int)
+
+# Хранилище кодов подтверждения из SMS: с Redis — в кэше с TTL,
+# без него — в таблице VerificationCode (локальный кэш у каждого воркера свой)
+VERIFICATION_CODE_STORE = (
+    "mobile_rest.verification.CacheCodeStore" if REDIS_URL else "mobile_rest.verification.DatabaseCodeStore"
+)
+VERIFICATION_CODE_TTL = 300
+# Период фоновой очистки просроченных кодов в каждом процессе (с); 0 — выключена,
+# тогда очистка выполняется только командой manage.py sweep_verification_codes
+VERIFICATION_CODE_SWEEP_INTERVAL = config("VERIFICATION_CODE_SWEEP_INTERVAL", default=0, cast=int)
+
+# Максимальный размер загружаемого видео (байт); проверяется при подтверждении загрузки
+MEDIA_MAX_UPLOAD_SIZE = config("MEDIA_MAX_UPLOAD_SIZE", default=2 * 1024 ** 3, cast=int)
+
+# Когда читать длительность и разрешение загруженного видео: "thread", "sync"
+# или "worker" (только manage.py probe_media_files)
+MEDIA_PROBE_MODE = config("MEDIA_PROBE_MODE", default="thread")
+
 STATIC_URL = "static/"
 
-STORAGES = {
-    "default": {
-        "BACKEND": "helpers.cloudflare.storages.MediaFileStorage",
-        "OPTIONS": helpers.cloudflare.settings.CLOUDFLARE_R2_CONFIG_OPTIONS,
-    },
-    "staticfiles": {
-        "BACKEND": "helpers.cloudflare.storages.StaticFileStorage",
-        "OPTIONS": helpers.cloudflare.settings.CLOUDFLARE_R2_CONFIG_OPTIONS,
-    },
-}
+# Где хранить файлы: "cloudflare" (R2) или "local" — каталог LOCAL_STORAGE_ROOT
+# на диске, файлы отдаются приложением по LOCAL_STORAGE_URL (для разработки и тестов)
+STORAGE_BACKEND = config(
+    "STORAGE_BACKEND",
+    default="cloudflare" if helpers.cloudflare.settings.CLOUDFLARE_R2_CONFIG_OPTIONS else "local",
+)
+LOCAL_STORAGE_ROOT = config("LOCAL_STORAGE_ROOT", default=str(BASE_DIR / "local_storage"))
+LOCAL_STORAGE_URL = config("LOCAL_STORAGE_URL", default="/local-storage/")
+
+if STORAGE_BACKEND == "local":
+    STORAGES = {
+        "default": {
+            "BACKEND": "helpers.storages.filesystem.MediaFileStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "helpers.storages.filesystem.StaticFileStorage",
+        },
+    }
+else:
+    STORAGES = {
+        "default": {
+            "BACKEND": "helpers.cloudflare.storages.MediaFileStorage",
+            "OPTIONS": helpers.cloudflare.settings.CLOUDFLARE_R2_CONFIG_OPTIONS,
+        },
+        "staticfiles": {
+            "BACKEND": "helpers.cloudflare.storages.StaticFileStorage",
+            "OPTIONS": helpers.cloudflare.settings.CLOUDFLARE_R2_CONFIG_OPTIONS,
+        },
+    }
 
 LOGGING = {
     "version": 1,
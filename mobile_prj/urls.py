@@ -14,11 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from urllib.parse import urlsplit
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),
-    path('api/v1/', include('mobile_rest.urls'))
+    path('api/v1/', include('mobile_rest.urls')),
 ]
+
+if settings.STORAGE_BACKEND == 'local':
+    # Файлы локальных хранилищ; с R2 маршрута нет вовсе
+    urlpatterns.append(
+        path(urlsplit(settings.LOCAL_STORAGE_URL).path.lstrip('/'), include('helpers.storages.urls'))
+    )
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import CustomUser, MediaFiles, MediaFile, MediaFileNews, News
+from .models import CustomUser, MediaFiles, MediaFile, MediaFileNews, News, NotificationOutbox
 admin.site.register(CustomUser)
 admin.site.register(MediaFiles)
 admin.site.register(MediaFile)
 admin.site.register(News)
 admin.site.register(MediaFileNews)
+admin.site.register(NotificationOutbox)
@@ -7,3 +7,11 @@ class MobileRestConfig(AppConfig):
 
     def ready(self):
         import mobile_rest.signals
+
+        from django.conf import settings
+
+        interval = getattr(settings, "VERIFICATION_CODE_SWEEP_INTERVAL", 0)
+        if interval:
+            from mobile_rest.verification import start_sweeper
+
+            start_sweeper(interval)
@@ -0,0 +1,70 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для эндпоинтов чтения.
+
+ETag строится из id и updated_at записей, поэтому проверку можно выполнить
+до загрузки медиа и сериализации: клиент с актуальной копией получает 304
+без тела.
+
+Если хранилище подписывает URL файлов, ответ содержит ссылки с ограниченным
+сроком действия. Такие ответы версионируются ещё и периодом url_epoch()
+длиной querystring_expire: URL, подписанный в периоде, действует не меньше
+чем до его конца, а в следующем периоде ETag и Last-Modified меняются —
+клиент получает новое тело вместо 304 с истекающими ссылками.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.files.storage import storages
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """
+    Строгий ETag по значимым для ответа частям (id, updated_at, курсоры и т.п.).
+    """
+    raw = "|".join(part.isoformat() if hasattr(part, "isoformat") else str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def url_epoch(now=None):
+    """
+    Начало текущего периода действия подписанных URL файлов или None,
+    если хранилище их не подписывает (публичный домен и т.п.).
+    """
+    storage = storages["default"]
+    if not getattr(storage, "signs_urls", False):
+        return None
+    period = storage.querystring_expire
+    now = time.time() if now is None else now
+    return datetime.fromtimestamp(now // period * period, timezone.utc)
+
+
+def validators(*parts, last_modified):
+    """
+    (ETag, Last-Modified) ответа по значимым частям и времени изменения данных
+    с учётом url_epoch().
+    """
+    epoch = url_epoch()
+    if epoch is None:
+        return make_etag(*parts), last_modified
+    return make_etag(*parts, epoch), max(last_modified, epoch) if last_modified else epoch
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Возвращает ответ 304, если копия клиента актуальна (If-None-Match / If-Modified-Since), иначе None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,94 @@
+"""
+Локальная заглушка firebase_admin.messaging для работы без сети и учётных данных.
+
+Подключается настройкой FCM_MESSAGING_BACKEND = "mobile_rest.fake_messaging".
+Классы сообщений и ответов — настоящие из firebase_admin, подменяется только
+транспорт: отправленные сообщения складываются в sent (по одному Message на
+токен), размеры запросов — в batches, ошибки по токенам задаются через
+failing_tokens, а ошибка всего запроса — через fail_next.
+"""
+import itertools
+import time
+
+from firebase_admin import exceptions
+from firebase_admin.messaging import (  # noqa: F401
+    AndroidConfig,
+    APNSConfig,
+    BatchResponse,
+    Message,
+    MulticastMessage,
+    Notification,
+    SendResponse,
+    UnregisteredError,
+)
+
+# Отправленные сообщения (по одному на токен) в порядке отправки
+sent = []
+# Число сообщений в каждом запросе к FCM
+batches = []
+# registration_id -> исключение, которое вернётся для этого токена
+failing_tokens = {}
+# Исключения, которые будут выброшены следующими запросами к FCM (None — запрос проходит)
+fail_next = []
+# Искусственная задержка ответа (секунды)
+latency = 0.0
+
+_message_ids = itertools.count(1)
+
+
+def reset():
+    global latency
+    sent.clear()
+    batches.clear()
+    failing_tokens.clear()
+    fail_next.clear()
+    latency = 0.0
+
+
+def unregistered(token):
+    failing_tokens[token] = UnregisteredError("Requested entity was not found.")
+
+
+def invalid(token):
+    failing_tokens[token] = exceptions.InvalidArgumentError("The registration token is not a valid FCM registration token")
+
+
+def _send(message, token):
+    error = failing_tokens.get(token)
+    if error is not None:
+        return SendResponse(None, error)
+    sent.append(message)
+    return SendResponse({"name": f"projects/fake/messages/{next(_message_ids)}"}, None)
+
+
+def _request(size):
+    if latency:
+        time.sleep(latency)
+    if fail_next:
+        error = fail_next.pop(0)
+        if error is not None:
+            raise error
+    batches.append(size)
+
+
+def send_each(messages, dry_run=False, app=None):
+    if len(messages) > 500:
+        raise ValueError("messages must not contain more than 500 elements.")
+    _request(len(messages))
+    return BatchResponse([_send(message, message.token) for message in messages])
+
+
+def send_each_for_multicast(multicast_message, dry_run=False, app=None):
+    _request(len(multicast_message.tokens))
+    responses = []
+    for token in multicast_message.tokens:
+        message = Message(
+            notification=multicast_message.notification,
+            data=multicast_message.data,
+            token=token,
+        )
+        responses.append(_send(message, token))
+    return BatchResponse(responses)
+
+
+send_multicast = send_each_for_multicast
@@ -0,0 +1,86 @@
+"""
+Локальный HTTP-сервер, имитирующий Mobizon API, для тестов и бенчмарков sms_service.
+
+    with FakeMobizonServer() as server:
+        client = MobizonClient(server.url, "key")
+        client.send_sms("77001234567", "Код: 1234")
+        server.requests  # [{"recipient": "77001234567", "text": "Код: 1234", "apiKey": "key"}]
+
+Поведение задаётся атрибутами сервера: latency — задержка ответа (с),
+fail_next — HTTP-статусы, которыми ответят следующие запросы,
+response — JSON-ответ на успешный запрос. connections — число принятых
+TCP-соединений (для проверки keep-alive).
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Заголовки и тело пишутся отдельно: без TCP_NODELAY keep-alive клиент
+        # ждал бы delayed ACK (~40 мс) на каждом запросе
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(dict(parse_qsl(urlsplit(self.path).query)))
+            status = server.fail_next.pop(0) if server.fail_next else 200
+        if server.latency:
+            time.sleep(server.latency)
+
+        if status == 200:
+            body = json.dumps(server.response).encode()
+        else:
+            body = json.dumps({"code": 999, "message": f"HTTP {status}"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeMobizonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.fail_next = []
+        self.latency = 0.0
+        self.connections = 0
+        self.response = {"code": 0, "data": {"campaignId": "1", "messageId": "1", "status": 1}, "message": ""}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/service/message/sendsmsmessage"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
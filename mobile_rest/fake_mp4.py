@@ -0,0 +1,69 @@
+"""
+Синтетические MP4/MOV файлы для тестов и бенчмарков mp4probe.
+
+    data = make_mp4(duration=12.5, width=1920, height=1080, mdat_size=10 * 1024 * 1024, moov_at_end=True)
+    metadata, reader = mp4probe.probe(lambda offset, length: data[offset:offset + length], len(data))
+
+Файл содержит ftyp, mdat заданного размера (нули) и moov с mvhd и двумя
+дорожками — звуковой и видео (tkhd, mdia/mdhd, hdlr, minf/stbl/stsd).
+"""
+import struct
+
+
+def _box(box_type, *payload):
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def _full_box(box_type, version, *payload):
+    return _box(box_type, struct.pack(">I", version << 24), *payload)
+
+
+def _header_times(version, timescale, duration):
+    if version == 1:
+        return struct.pack(">QQIQ", 0, 0, timescale, duration)
+    return struct.pack(">IIII", 0, 0, timescale, duration)
+
+
+def _track(track_id, handler, timescale, duration, width, height, codec, version):
+    if version == 1:
+        tkhd_times = struct.pack(">QQIIQ", 0, 0, track_id, 0, duration)
+    else:
+        tkhd_times = struct.pack(">IIIII", 0, 0, track_id, 0, duration)
+    tkhd = _full_box(
+        b"tkhd", version, tkhd_times,
+        bytes(8), struct.pack(">hhhh", 0, 0, 0, 0), bytes(36),
+        struct.pack(">II", width << 16, height << 16),
+    )
+    mdhd = _full_box(b"mdhd", version, _header_times(version, timescale, duration), bytes(4))
+    hdlr = _full_box(b"hdlr", 0, bytes(4), handler, bytes(12), b"\0")
+    # Sample entry: 6 reserved, data_reference_index, затем поля VisualSampleEntry
+    entry = _box(codec, bytes(6), struct.pack(">H", 1), bytes(16), struct.pack(">HH", width, height), bytes(50))
+    stsd = _full_box(b"stsd", 0, struct.pack(">I", 1), entry)
+    minf = _box(b"minf", _box(b"stbl", stsd))
+    return _box(b"trak", tkhd, _box(b"mdia", mdhd, hdlr, minf))
+
+
+def make_moov(duration=10.0, width=1280, height=720, codec=b"avc1", timescale=1000, version=0):
+    ticks = int(duration * timescale)
+    mvhd = _full_box(b"mvhd", version, _header_times(version, timescale, ticks), bytes(80))
+    return _box(
+        b"moov",
+        mvhd,
+        _track(1, b"soun", timescale, ticks, 0, 0, b"mp4a", version),
+        _track(2, b"vide", timescale, ticks, width, height, codec, version),
+    )
+
+
+def make_mp4(duration=10.0, width=1280, height=720, codec=b"avc1", mdat_size=1024 * 1024,
+             moov_at_end=False, brand=b"isom", version=0, large_mdat=False):
+    ftyp = _box(b"ftyp", brand, struct.pack(">I", 0x200), brand, b"mp41")
+    if large_mdat:
+        # 64-битный размер: так пишут mdat больше 4 ГиБ
+        mdat = struct.pack(">I4sQ", 1, b"mdat", 16 + mdat_size) + bytes(mdat_size)
+    else:
+        mdat = _box(b"mdat", bytes(mdat_size))
+    moov = make_moov(duration, width, height, codec, version=version)
+    if moov_at_end:
+        return ftyp + mdat + moov
+    return ftyp + moov + mdat
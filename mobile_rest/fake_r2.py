@@ -0,0 +1,112 @@
+"""
+Локальный HTTP-сервер с минимальным S3 API (как у R2) для бенчмарков загрузки.
+
+Поддерживаются PutObject и multipart upload (Create/UploadPart/Complete/Abort)
+с path-style адресацией; тела запросов читаются и отбрасываются, сервер
+только считает принятые байты. Так в бенчмарке измеряется клиентская сторона,
+а не хранение данных.
+
+    with FakeR2Server() as server:
+        client = boto3.client("s3", endpoint_url=server.url, ...)
+        client.put_object(Bucket="bucket", Key="a.mp4", Body=b"...")
+        server.bytes_received  # 3
+"""
+import socket
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+COPY_BUFFER = 1024 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _discard_body(self):
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining:
+            chunk = self.rfile.read(min(remaining, COPY_BUFFER))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            with self.server.lock:
+                self.server.bytes_received += len(chunk)
+
+    def _respond(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _target(self):
+        parts = urlsplit(self.path)
+        bucket, _, key = parts.path.lstrip("/").partition("/")
+        return bucket, key, parse_qs(parts.query, keep_blank_values=True)
+
+    def do_PUT(self):
+        self._discard_body()
+        with self.server.lock:
+            self.server.requests += 1
+            etag = f'"{self.server.requests:032x}"'
+        self._respond(200, headers={"ETag": etag})
+
+    def do_POST(self):
+        bucket, key, query = self._target()
+        self._discard_body()
+        if "uploads" in query:
+            body = (
+                "<InitiateMultipartUploadResult>"
+                f"<Bucket>{bucket}</Bucket><Key>{key}</Key><UploadId>{uuid.uuid4().hex}</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            )
+        else:
+            body = (
+                "<CompleteMultipartUploadResult>"
+                f"<Bucket>{bucket}</Bucket><Key>{key}</Key><ETag>\"0\"</ETag>"
+                "</CompleteMultipartUploadResult>"
+            )
+        self._respond(200, body.encode(), {"Content-Type": "application/xml"})
+
+    def do_DELETE(self):
+        self._respond(204)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeR2Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.lock = threading.Lock()
+        self.bytes_received = 0
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,137 @@
+"""
+Быстрая read-only сериализация списков для MediaFilesListView и GetNewsListView.
+
+Вместо экземпляров моделей и полей ModelSerializer строки берутся кортежами
+.values_list(*values_fields, named=True) (namedtuple без __dict__, поля
+распаковываются по позиции), а связанные видео — одним сгруппированным
+запросом через .values_list(). Словари создаются только для итоговых объектов
+JSON. Результат совпадает с MediaFilesSerializer/NewsSerializer байт в байт
+(форматы даты/времени — ISO 8601, как в настройках DRF по умолчанию);
+это проверяется в tests.py.
+"""
+from datetime import datetime
+
+from django.utils import timezone
+
+from .models import MediaFile, MediaFileNews
+
+
+def _datetime(value, tz):
+    # Повторяет DateTimeField.to_representation/enforce_timezone из DRF
+    if not value:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    else:
+        value = timezone.make_aware(value, tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _time(value):
+    return value.isoformat() if value not in (None, '') else None
+
+
+def _group_files(model, fk_name, parent_ids, extra_fields=(), tz=None):
+    """
+    {parent_id: [{"id": ..., "video_file": url, *extra_fields}, ...]} одним запросом.
+    Метаданные файлов (extra_fields) берутся из БД, без обращения к хранилищу.
+    """
+    storage = model._meta.get_field('video_file').storage
+    grouped = {parent_id: [] for parent_id in parent_ids}
+    if not parent_ids:
+        return grouped
+    files = (
+        model.objects
+        .filter(**{f'{fk_name}__in': parent_ids})
+        .order_by('id')
+        .values_list(fk_name, 'id', 'video_file', *extra_fields)
+    )
+    files = list(files)
+    # Хранилища R2 подписывают URL всех файлов ответа одним вызовом
+    names = [name for _, _, name, *_ in files if name]
+    urls = dict(zip(names, storage.urls(names) if hasattr(storage, 'urls') else map(storage.url, names)))
+    for parent_id, file_id, name, *extra in files:
+        item = {
+            'id': file_id,
+            'video_file': urls[name] if name else None,
+        }
+        for field, value in zip(extra_fields, extra):
+            item[field] = _datetime(value, tz) if isinstance(value, datetime) else value
+        grouped[parent_id].append(item)
+    return grouped
+
+
+class FastMediaFilesSerializer:
+    """
+    Аналог MediaFilesSerializer(many=True) для строк из .values_list(*values_fields, named=True).
+    """
+
+    values_fields = (
+        'id', 'user_id', 'city', 'street', 'description',
+        'was_at_date', 'was_at_time', 'uploaded_at', 'status',
+    )
+    # Поля MediaFileSerializer сверх id и video_file
+    video_fields = (
+        'size', 'content_type', 'etag', 'uploaded_at', 'duration', 'width', 'height', 'codec',
+    )
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @property
+    def data(self):
+        tz = timezone.get_current_timezone()
+        videos = _group_files(
+            MediaFile, 'media_id', [row[0] for row in self.rows], self.video_fields, tz
+        )
+        return [
+            {
+                'id': media_id,
+                'user': user_id,
+                'city': city,
+                'street': street,
+                'description': description,
+                'was_at_date': _date(was_at_date),
+                'was_at_time': _time(was_at_time),
+                'uploaded_at': _datetime(uploaded_at, tz),
+                'videos': videos[media_id],
+                'status': media_status,
+            }
+            for (
+                media_id, user_id, city, street, description,
+                was_at_date, was_at_time, uploaded_at, media_status,
+            ) in self.rows
+        ]
+
+
+class FastNewsSerializer:
+    """
+    Аналог NewsSerializer(many=True) для строк из .values_list(*values_fields, named=True).
+    """
+
+    values_fields = ('id', 'title', 'text', 'created_at', 'updated_at')
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @property
+    def data(self):
+        tz = timezone.get_current_timezone()
+        media = _group_files(MediaFileNews, 'news_id', [row[0] for row in self.rows])
+        return [
+            {
+                'id': news_id,
+                'title': title,
+                'text': text,
+                'created_at': _datetime(created_at, tz),
+                'media': media[news_id],
+            }
+            for news_id, title, text, created_at, _updated_at in self.rows
+        ]
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mobile_rest import outbox
+
+
+class Command(BaseCommand):
+    help = "Отправляет push-уведомления из NotificationOutbox пачками, с повторами и backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Сколько уведомлений брать за раз")
+        parser.add_argument("--interval", type=float, default=2.0, help="Пауза между опросами, если очередь пуста (с)")
+        parser.add_argument("--once", action="store_true", help="Обработать всё, что готово к отправке, и выйти")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            stats = outbox.dispatch(batch_size=batch_size)
+            if any(stats.values()):
+                self.stdout.write(
+                    f"sent={stats['sent']} retried={stats['retried']} failed={stats['failed']} "
+                    f"pruned={stats['pruned']}"
+                )
+            if stats["sent"] + stats["retried"] + stats["failed"] < batch_size:
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mobile_rest.mp4probe import probe_media_files
+
+
+class Command(BaseCommand):
+    help = "Читает длительность, разрешение и кодек загруженных видео (Range запросами к R2)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Сколько файлов обрабатывать за проход")
+        parser.add_argument("--interval", type=float, default=0.0, help="Повторять с этим периодом (с); 0 — пока есть файлы")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            stats = probe_media_files(batch_size=batch_size)
+            if any(stats.values()):
+                self.stdout.write(f"probed={stats['probed']} failed={stats['failed']}")
+            if stats["probed"] + stats["failed"] < batch_size:
+                if not options["interval"]:
+                    return
+                time.sleep(options["interval"])
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mobile_rest.verification import sweep_expired
+
+
+class Command(BaseCommand):
+    help = "Удаляет просроченные коды подтверждения пачками"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Сколько строк удалять одним запросом")
+        parser.add_argument("--pause", type=float, default=0.0, help="Пауза между пачками (с)")
+        parser.add_argument("--interval", type=float, default=0.0, help="Повторять очистку с этим периодом (с); 0 — один проход")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = sweep_expired(batch_size=options["batch_size"], pause=options["pause"])
+            self.stdout.write(f"deleted={deleted}")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
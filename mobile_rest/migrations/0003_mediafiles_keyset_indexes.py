@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0002_verificationcode_alter_mediafile_video_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['user', '-uploaded_at', '-id'], name='mediafiles_user_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediafiles',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='mediafiles_uploaded_idx'),
+        ),
+    ]
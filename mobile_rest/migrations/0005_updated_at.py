@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0004_news_ordering_and_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafiles',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
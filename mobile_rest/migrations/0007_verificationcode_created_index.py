@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0006_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='verificationcode',
+            index=models.Index(fields=['created_at'], name='verification_created_idx'),
+        ),
+    ]
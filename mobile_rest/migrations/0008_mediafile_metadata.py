@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0007_verificationcode_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafile',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=128),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='uploaded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0008_mediafile_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediafile',
+            name='codec',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='probed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediafile',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
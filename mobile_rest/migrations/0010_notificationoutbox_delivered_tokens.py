@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mobile_rest', '0009_mediafile_probe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='delivered_tokens',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission, BaseUserManager
-from django.db import models
+from django.db import connections, models, transaction
+from django.dispatch import Signal
 from django.utils.timezone import now
 
+# Смена статуса заявки MediaFiles: отправляется и из save() (см. signals.py),
+# и из MediaFiles.objects.update_status(). Аргументы: instance, old_status.
+status_changed = Signal()
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, phone_number, password = None, **extra_fields):
         if not phone_number:
@@ -58,14 +63,107 @@ class VerificationCode(models.Model):
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
 
-    def is_expired(self):
-        # Код действителен 5 минут
-        return (now() - self.created_at).seconds > 300
+    def is_expired(self, ttl = 300):
+        # Код действителен 5 минут; total_seconds(), а не .seconds — иначе дни не учитываются
+        return (now() - self.created_at).total_seconds() > ttl
+
+    class Meta:
+        indexes = [
+            # Удаление просроченных кодов пачками (verification.sweep_expired)
+            models.Index(fields = ['created_at'], name = 'verification_created_idx'),
+        ]
+
+def videos_prefetch():
+    return models.Prefetch('videos', queryset=MediaFile.objects.order_by('id'))
+
+
+def news_media_prefetch():
+    return models.Prefetch('media', queryset=MediaFileNews.objects.order_by('id'))
+
+
+class MediaFilesQuerySet(models.QuerySet):
+    def with_videos(self):
+        # Один дополнительный запрос на все видео выборки вместо запроса на каждую запись
+        return self.prefetch_related(videos_prefetch())
+
+    def update_status(self, status, **extra):
+        """
+        Массовая смена статуса одним UPDATE с теми же хуками перехода, что и при save():
+        для каждой изменившейся записи отправляется status_changed.
+        extra — дополнительные атрибуты для обработчиков (например, error_code, error_text).
+        Возвращает список изменённых записей.
+        """
+        updated_at = now()
+        with transaction.atomic(using=self.db):
+            changed = list(self.exclude(status=status).select_for_update())
+            if not changed:
+                return []
+            self.model._default_manager.using(self.db).filter(
+                pk__in=[instance.pk for instance in changed]
+            ).update(status=status, updated_at=updated_at)
+
+        for instance in changed:
+            old_status = instance.status
+            instance.status = status
+            instance.updated_at = updated_at
+            for name, value in extra.items():
+                setattr(instance, name, value)
+            instance.snapshot_tracked_fields()
+            status_changed.send(sender=self.model, instance=instance, old_status=old_status)
+        return changed
+
+    def set_status_returning(self, status):
+        """
+        Смена статуса одним UPDATE ... RETURNING без загрузки записей и без status_changed
+        (уведомления вызывающий код ставит в очередь сам, пачкой).
+        Записи, уже находящиеся в статусе status, не изменяются.
+        Возвращает список (id, user_id) изменённых записей.
+        """
+        connection = connections[self.db]
+        queryset = self.exclude(status=status)
+        if connection.vendor not in ("postgresql", "sqlite"):
+            # Бэкенды без UPDATE ... RETURNING: выборка с блокировкой + UPDATE
+            with transaction.atomic(using=self.db):
+                changed = list(queryset.select_for_update().values_list("id", "user_id"))
+                self.model._default_manager.using(self.db).filter(
+                    pk__in=[pk for pk, _ in changed]
+                ).update(status=status, updated_at=now())
+            return changed
+
+        subquery, params = queryset.values("pk").query.sql_with_params()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        # Условие по статусу повторяется во внешнем UPDATE: если строку успела изменить
+        # параллельная транзакция, PostgreSQL перепроверит его на новой версии строки
+        sql = (
+            f"UPDATE {table} SET status = %s, updated_at = %s "
+            f"WHERE id IN ({subquery}) AND status <> %s RETURNING id, user_id"
+        )
+        updated_at = connection.ops.adapt_datetimefield_value(now())
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [status, updated_at, *params, status])
+            return [tuple(row) for row in cursor.fetchall()]
+
+
+class NewsQuerySet(models.QuerySet):
+    def with_media(self):
+        return self.prefetch_related(news_media_prefetch())
+
 
 class MediaFile(models.Model):
     id = models.AutoField(primary_key = True)
     media = models.ForeignKey('MediaFiles', on_delete = models.CASCADE, related_name = 'videos')
     video_file = models.FileField(upload_to='video/', blank=True, default=None, null=True)
+    # Метаданные объекта в хранилище, полученные одним HEAD при подтверждении загрузки
+    size = models.BigIntegerField(null = True, blank = True)
+    etag = models.CharField(max_length = 128, blank = True, default = "")
+    content_type = models.CharField(max_length = 100, blank = True, default = "")
+    uploaded_at = models.DateTimeField(null = True, blank = True)
+    # Из moov контейнера MP4/MOV (см. mp4probe.py); probed_at — время попытки
+    duration = models.FloatField(null = True, blank = True)
+    width = models.PositiveIntegerField(null = True, blank = True)
+    height = models.PositiveIntegerField(null = True, blank = True)
+    codec = models.CharField(max_length = 16, blank = True, default = "")
+    probed_at = models.DateTimeField(null = True, blank = True)
 
 class MediaFiles(models.Model):
     id = models.AutoField(primary_key = True)
@@ -76,8 +174,50 @@ class MediaFiles(models.Model):
     was_at_date = models.DateField()
     was_at_time = models.TimeField()
     uploaded_at = models.DateTimeField(auto_now_add = True)
+    # Меняется при любом сохранении записи и при изменении её видео (см. signals.py)
+    updated_at = models.DateTimeField(auto_now = True)
     status = models.CharField(max_length = 16)
 
+    objects = MediaFilesQuerySet.as_manager()
+
+    # Поля, значения которых на момент загрузки из БД запоминаются в памяти,
+    # чтобы обнаруживать их изменение при save() без повторного SELECT
+    TRACKED_FIELDS = ('status',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaded_values = {}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, using = None, fields = None, **kwargs):
+        super().refresh_from_db(using = using, fields = fields, **kwargs)
+        # Обновляем снимок только для перечитанных полей
+        self.snapshot_tracked_fields(fields)
+
+    def snapshot_tracked_fields(self, fields = None):
+        # Отложенные (deferred) поля не попадают в снимок
+        for name in self.TRACKED_FIELDS:
+            if (fields is None or name in fields) and name in self.__dict__:
+                self._loaded_values[name] = self.__dict__[name]
+
+    def get_loaded_value(self, name, default = None):
+        return self._loaded_values.get(name, default)
+
+    def has_loaded_value(self, name):
+        return name in self._loaded_values
+
+    class Meta:
+        indexes = [
+            # Keyset-пагинация списка заявок (type=user и type=all)
+            models.Index(fields = ['user', '-uploaded_at', '-id'], name = 'mediafiles_user_uploaded_idx'),
+            models.Index(fields = ['-uploaded_at', '-id'], name = 'mediafiles_uploaded_idx'),
+        ]
+
 class MediaFileNews(models.Model):
     id = models.AutoField(primary_key = True)
     news = models.ForeignKey('News', on_delete = models.CASCADE, related_name = 'media')
@@ -87,4 +227,57 @@ class News(models.Model):
     id = models.AutoField(primary_key = True)
     title = models.CharField(max_length=512)
     text = models.JSONField()
-    created_at = models.DateTimeField(auto_now_add = True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add = True)
+    # Меняется при любом сохранении новости и при изменении её медиа (см. signals.py)
+    updated_at = models.DateTimeField(auto_now = True)
+
+    objects = NewsQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields = ['-created_at', '-id'], name = 'news_created_idx'),
+        ]
+
+class NotificationOutbox(models.Model):
+    """
+    Push-уведомление, ожидающее отправки в FCM.
+
+    Запись создаётся в той же транзакции, что и изменение заявки, и отправляется
+    только после коммита (см. outbox.py и команду dispatch_notifications),
+    поэтому откат сохранения не приводит к лишнему уведомлению.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    id = models.BigAutoField(primary_key = True)
+    user = models.ForeignKey(CustomUser, on_delete = models.CASCADE)
+    title = models.CharField(max_length = 255)
+    body = models.TextField()
+    data = models.JSONField(default = dict, blank = True)
+    status = models.CharField(max_length = 16, choices = STATUS_CHOICES, default = PENDING)
+    attempts = models.PositiveIntegerField(default = 0)
+    next_attempt_at = models.DateTimeField(default = now)
+    last_error = models.TextField(blank = True, default = '')
+    # Токены, на которые уведомление уже доставлено: повтор отправляет только остальным
+    delivered_tokens = models.JSONField(default = list, blank = True)
+    created_at = models.DateTimeField(auto_now_add = True)
+    sent_at = models.DateTimeField(blank = True, null = True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields = ['next_attempt_at'],
+                condition = models.Q(status = 'pending'),
+                name = 'outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.title} ({self.status})"
@@ -0,0 +1,268 @@
+"""
+Чтение длительности, разрешения и кодека видео MP4/MOV без скачивания файла.
+
+Файл ISO-BMFF (MP4, QuickTime MOV) — последовательность box'ов верхнего
+уровня: ftyp, mdat (сами кадры), moov (метаданные) и др. Нужное нам лежит
+в moov, который бывает в начале файла (faststart) или в конце, после mdat.
+probe() идёт по заголовкам box'ов верхнего уровня, перескакивая mdat,
+и читает только moov — несколькими HTTP Range запросами:
+    moov в начале — обычно 1 запрос (первые CHUNK_SIZE байт);
+    moov в конце  — обычно 2 запроса (начало файла и хвост с moov).
+
+Метаданные MediaFile заполняются после подтверждения загрузки (schedule_probe)
+в режиме MEDIA_PROBE_MODE или командой manage.py probe_media_files.
+"""
+import logging
+import struct
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.timezone import now
+
+from . import uploads
+from .models import MediaFile, MediaFiles
+
+logger = logging.getLogger(__name__)
+
+# Сколько байт читать за один Range запрос: заголовки box'ов и небольшой moov
+# помещаются в один запрос
+CHUNK_SIZE = 64 * 1024
+# moov больше этого размера не читаем (у обычных роликов он — сотни КиБ)
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+
+class ProbeError(Exception):
+    pass
+
+
+class RangeReader:
+    """
+    Чтение диапазонов файла размера size через read(offset, length) -> bytes
+    с буфером последнего прочитанного куска. Считает запросы и прочитанные байты.
+    """
+
+    def __init__(self, read, size, chunk_size=CHUNK_SIZE):
+        self._read = read
+        self.size = size
+        self.chunk_size = chunk_size
+        self._start = 0
+        self._buffer = b""
+        self.requests = 0
+        self.bytes_read = 0
+
+    def read(self, offset, length):
+        length = min(length, self.size - offset)
+        end = offset + length
+        if self._start <= offset and end <= self._start + len(self._buffer):
+            return self._buffer[offset - self._start:end - self._start]
+        fetch = min(max(length, self.chunk_size), self.size - offset)
+        data = self._read(offset, fetch)
+        if len(data) < length:
+            raise ProbeError(f"Файл короче ожидаемого: {offset + len(data)} < {end}")
+        self.requests += 1
+        self.bytes_read += len(data)
+        self._start, self._buffer = offset, data
+        return data[:length]
+
+
+def _box_header(data, offset, end):
+    """
+    (размер box'а, тип, размер заголовка) для box'а, начинающегося в data[offset:].
+    """
+    if end - offset < 8:
+        raise ProbeError(f"Обрезанный заголовок box'а на смещении {offset}")
+    size, box_type = struct.unpack_from(">I4s", data, offset)
+    header_size = 8
+    if size == 1:
+        if end - offset < 16:
+            raise ProbeError(f"Обрезанный заголовок box'а на смещении {offset}")
+        size = struct.unpack_from(">Q", data, offset + 8)[0]
+        header_size = 16
+    elif size == 0:
+        # box до конца файла (или родительского box'а)
+        size = end - offset
+    if size < header_size:
+        raise ProbeError(f"Некорректный размер box'а {box_type!r}: {size}")
+    return size, box_type, header_size
+
+
+def _children(data, start, end):
+    offset = start
+    while offset + 8 <= end:
+        size, box_type, header_size = _box_header(data, offset, end)
+        if offset + size > end:
+            raise ProbeError(f"Box {box_type!r} выходит за пределы родителя")
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def _child(data, start, end, box_type):
+    for child_type, child_start, child_end in _children(data, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
+
+
+def _timescale_duration(data, start):
+    # mvhd и mdhd: version(1) flags(3), затем даты создания/изменения 4 или 8 байт
+    if data[start] == 1:
+        return struct.unpack_from(">IQ", data, start + 20)
+    return struct.unpack_from(">II", data, start + 12)
+
+
+def _video_track(data, start, end):
+    """
+    (tkhd, mdhd, stsd) первой видеодорожки или None.
+    """
+    for box_type, trak_start, trak_end in _children(data, start, end):
+        if box_type != b"trak":
+            continue
+        mdia = _child(data, trak_start, trak_end, b"mdia")
+        if mdia is None:
+            continue
+        hdlr = _child(data, *mdia, b"hdlr")
+        # hdlr: version/flags(4), pre_defined/component type(4), handler_type(4)
+        if hdlr is None or data[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+        minf = _child(data, *mdia, b"minf")
+        stbl = minf and _child(data, *minf, b"stbl")
+        stsd = stbl and _child(data, *stbl, b"stsd")
+        return _child(data, trak_start, trak_end, b"tkhd"), _child(data, *mdia, b"mdhd"), stsd
+    return None
+
+
+def parse_moov(data):
+    """
+    {"duration", "width", "height", "codec"} из содержимого box'а moov
+    (без заголовка). Отсутствующие значения — None.
+    """
+    try:
+        result = {"duration": None, "width": None, "height": None, "codec": None}
+        end = len(data)
+        mvhd = _child(data, 0, end, b"mvhd")
+        if mvhd:
+            timescale, duration = _timescale_duration(data, mvhd[0])
+            if timescale and duration:
+                result["duration"] = round(duration / timescale, 3)
+
+        track = _video_track(data, 0, end)
+        if track is None:
+            return result
+        tkhd, mdhd, stsd = track
+        if result["duration"] is None and mdhd:
+            # Например, во фрагментированном MP4 длительность в mvhd нулевая
+            timescale, duration = _timescale_duration(data, mdhd[0])
+            if timescale and duration:
+                result["duration"] = round(duration / timescale, 3)
+        if tkhd:
+            # Последние 8 байт tkhd — ширина и высота в формате 16.16
+            width, height = struct.unpack_from(">II", data, tkhd[1] - 8)
+            result["width"], result["height"] = width >> 16 or None, height >> 16 or None
+        if stsd and stsd[1] - stsd[0] >= 16:
+            # stsd: version/flags(4), entry_count(4), первая запись: размер(4), тип(4)
+            entry = stsd[0] + 8
+            result["codec"] = data[entry + 4:entry + 8].decode("latin-1").strip()
+            if result["width"] is None and stsd[1] - entry >= 36:
+                # VisualSampleEntry: ширина и высота по 2 байта после 24 байт полей
+                width, height = struct.unpack_from(">HH", data, entry + 32)
+                result["width"], result["height"] = width or None, height or None
+        return result
+    except struct.error as e:
+        raise ProbeError(f"Обрезанный moov: {e}")
+
+
+def find_moov(reader):
+    """
+    (смещение, размер) содержимого moov; перескакивает box'ы верхнего уровня.
+    """
+    offset = 0
+    while offset + 8 <= reader.size:
+        header = reader.read(offset, 16)
+        size, box_type, header_size = _box_header(header, 0, reader.size - offset)
+        if offset == 0 and box_type not in (b"ftyp", b"wide", b"free", b"skip", b"mdat", b"moov"):
+            raise ProbeError(f"Не ISO-BMFF файл: первый box {box_type!r}")
+        if box_type == b"moov":
+            return offset + header_size, size - header_size
+        offset += size
+    raise ProbeError("moov не найден")
+
+
+def probe(read, size, chunk_size=CHUNK_SIZE):
+    """
+    Метаданные видео по функции read(offset, length) -> bytes для файла размера size.
+    Возвращает (метаданные, RangeReader) — последний для статистики чтения.
+    """
+    reader = RangeReader(read, size, chunk_size)
+    moov_offset, moov_size = find_moov(reader)
+    if moov_size > MAX_MOOV_SIZE:
+        raise ProbeError(f"Слишком большой moov: {moov_size} байт")
+    return parse_moov(reader.read(moov_offset, moov_size)), reader
+
+
+# ----- MediaFile -----
+
+def probe_file(file_key, size=None):
+    """
+    Метаданные объекта file_key в R2, прочитанные Range запросами.
+    """
+    if size is None:
+        info = uploads.head_object(file_key)
+        if info is None:
+            raise ProbeError(f"Файл не найден в хранилище: {file_key}")
+        size = info["size"]
+    metadata, _ = probe(lambda offset, length: uploads.read_range(file_key, offset, length), size)
+    return metadata
+
+
+def probe_media_files(ids=None, batch_size=100):
+    """
+    Заполняет duration/width/height/codec у ещё не проверенных MediaFile
+    (probed_at is null). Неудачные попытки тоже отмечаются в probed_at, чтобы
+    не повторять их бесконечно. Возвращает {"probed": N, "failed": M}.
+    """
+    qs = MediaFile.objects.filter(probed_at__isnull=True, video_file__startswith=uploads.KEY_PREFIX)
+    if ids is not None:
+        qs = qs.filter(id__in=ids)
+    stats = {"probed": 0, "failed": 0}
+    media_ids = set()
+    for media_file in qs.order_by("id")[:batch_size]:
+        fields = {"probed_at": now()}
+        try:
+            fields.update(probe_file(media_file.video_file.name, media_file.size))
+            stats["probed"] += 1
+        except Exception as e:
+            logger.warning(f"Error probing MediaFile {media_file.id}: {e}")
+            stats["failed"] += 1
+        fields["codec"] = fields.get("codec") or ""
+        MediaFile.objects.filter(id=media_file.id).update(**fields)
+        media_ids.add(media_file.media_id)
+    if media_ids:
+        # ETag и Last-Modified заявки строятся по её updated_at — иначе клиенты
+        # со старым ETag продолжат получать 304 без метаданных видео
+        MediaFiles.objects.filter(pk__in=media_ids).update(updated_at=now())
+    return stats
+
+
+def schedule_probe(ids):
+    """
+    Запускает probe_media_files(ids) после коммита текущей транзакции
+    в режиме MEDIA_PROBE_MODE: "thread", "sync" или "worker" (только команда).
+    """
+    mode = getattr(settings, "MEDIA_PROBE_MODE", "thread")
+    if mode == "sync":
+        transaction.on_commit(lambda: probe_media_files(ids=ids, batch_size=len(ids)))
+    elif mode == "thread":
+        transaction.on_commit(
+            lambda: threading.Thread(target=_probe_in_thread, args=(ids,), daemon=True).start()
+        )
+
+
+def _probe_in_thread(ids):
+    try:
+        probe_media_files(ids=ids, batch_size=len(ids))
+    except Exception as e:
+        # Файлы останутся непроверенными и будут обработаны командой
+        logger.exception(f"Error probing media files {ids}: {e}")
+    finally:
+        connections.close_all()
@@ -0,0 +1,146 @@
+"""
+Кэш сериализованных ответов новостей (news/detail/, news/list/).
+
+Детальная новость хранится по ключу с её id, окна ленты — по ключу от
+параметров запроса (limit, cursor, since) и «поколения» ленты. Любое
+изменение новости или её медиа удаляет детальную запись и увеличивает
+поколение, после чего все закэшированные окна ленты перестают использоваться
+и вытесняются по TTL.
+
+Каждая запись — словарь {"data", "etag", "last_modified"}: валидаторы
+хранятся вместе с телом, чтобы ответить 304 без обращения к БД. Запись
+с подписанными URL из прошлого периода url_epoch() не используется.
+
+Счётчики попаданий/промахов хранятся в том же кэше, поэтому при Redis-бэкенде
+они общие для всех воркеров.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .conditional import url_epoch
+
+KEY_PREFIX = "news"
+LIST_GENERATION_KEY = f"{KEY_PREFIX}:list:gen"
+STATS_KINDS = ("detail", "list")
+
+
+def _timeout():
+    return getattr(settings, "NEWS_CACHE_TIMEOUT", 300)
+
+
+def _detail_key(news_id):
+    return f"{KEY_PREFIX}:detail:{news_id}"
+
+
+def _list_key(generation, params):
+    raw = "&".join(f"{name}={params.get(name) or ''}" for name in ("limit", "cursor", "since"))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"{KEY_PREFIX}:list:{generation}:{digest}"
+
+
+def _new_generation():
+    # Если ключ поколения был вытеснен, начинаем с заведомо нового значения,
+    # чтобы не попасть на старые окна ленты с тем же номером
+    return time.time_ns()
+
+
+def _list_generation():
+    generation = cache.get(LIST_GENERATION_KEY)
+    if generation is None:
+        cache.add(LIST_GENERATION_KEY, _new_generation(), timeout=None)
+        generation = cache.get(LIST_GENERATION_KEY)
+    return generation
+
+
+def _count(kind, outcome):
+    key = f"{KEY_PREFIX}:stats:{kind}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счётчика ещё нет (или он был вытеснен)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def _entry(data, etag, last_modified):
+    return {"data": data, "etag": etag, "last_modified": last_modified}
+
+
+def _is_current(entry):
+    # Подписанные URL в теле действуют до конца периода url_epoch(), в котором
+    # выдана запись (её last_modified не раньше начала периода, см. conditional.validators)
+    epoch = url_epoch()
+    return epoch is None or (entry["last_modified"] is not None and entry["last_modified"] >= epoch)
+
+
+def _lookup(kind, key):
+    data = cache.get(key)
+    if data is not None and not _is_current(data):
+        data = None
+    _count(kind, "hits" if data is not None else "misses")
+    return data
+
+
+# ----- детальная новость -----
+
+def get_detail(news_id):
+    return _lookup("detail", _detail_key(news_id))
+
+
+def set_detail(news_id, data, etag, last_modified):
+    entry = _entry(data, etag, last_modified)
+    cache.set(_detail_key(news_id), entry, timeout=_timeout())
+    return entry
+
+
+# ----- окна ленты -----
+
+def list_key(params):
+    """
+    Ключ окна ленты. Вычисляется один раз на запрос и используется и для чтения,
+    и для записи, чтобы данные, прочитанные до инвалидации, не попали
+    в новое поколение.
+    """
+    return _list_key(_list_generation(), params)
+
+
+def get_list(key):
+    return _lookup("list", key)
+
+
+def set_list(key, data, etag, last_modified):
+    entry = _entry(data, etag, last_modified)
+    cache.set(key, entry, timeout=_timeout())
+    return entry
+
+
+# ----- инвалидация -----
+
+def invalidate(news_id):
+    """
+    Удаляет детальную запись новости и сбрасывает все окна ленты.
+    """
+    cache.delete(_detail_key(news_id))
+    try:
+        cache.incr(LIST_GENERATION_KEY)
+    except ValueError:
+        cache.add(LIST_GENERATION_KEY, _new_generation(), timeout=None)
+
+
+def stats():
+    keys = [f"{KEY_PREFIX}:stats:{kind}:{outcome}" for kind in STATS_KINDS for outcome in ("hits", "misses")]
+    values = cache.get_many(keys)
+    result = {}
+    for kind in STATS_KINDS:
+        hits = values.get(f"{KEY_PREFIX}:stats:{kind}:hits", 0)
+        misses = values.get(f"{KEY_PREFIX}:stats:{kind}:misses", 0)
+        total = hits + misses
+        result[kind] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return result
@@ -0,0 +1,325 @@
+"""
+Транзакционная очередь push-уведомлений (outbox).
+
+enqueue() пишет NotificationOutbox в текущей транзакции и после коммита
+передаёт запись диспетчеру (transaction.on_commit). Сама отправка в FCM
+никогда не выполняется внутри транзакции сохранения.
+
+Режим отправки после коммита задаётся настройкой NOTIFICATION_DISPATCH_MODE:
+    "thread" — в фоновом потоке (гринлете под gevent), запрос не ждёт FCM;
+    "sync"   — сразу в текущем потоке (тесты, отладка);
+    "worker" — только командой manage.py dispatch_notifications.
+Команда также дочищает всё, что не удалось отправить сразу: повторы идут
+с экспоненциальной задержкой, после NOTIFICATION_MAX_ATTEMPTS попыток
+запись помечается как failed. В контейнере команда запускается рядом
+с gunicorn из entrypoint.sh (NOTIFICATION_WORKER=0 — запускать её отдельно).
+
+Доставка отслеживается по токенам (delivered_tokens): если не ушла одна пачка
+сообщений или FCM временно отказал по отдельным токенам, повтор отправляется
+только на недоставленные токены, без дублей на остальные устройства.
+
+Токены, на которые FCM ответил UNREGISTERED или INVALID_ARGUMENT, удаляются
+из FCMDevice (или деактивируются, если DELETE_INACTIVE_DEVICES выключен)
+одним запросом на пачку; счётчики удалённых токенов — в stats().
+"""
+import importlib
+import logging
+import random
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils.timezone import now
+from fcm_django.models import FCMDevice
+from firebase_admin import exceptions as firebase_exceptions
+
+from .models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_MESSAGING = "firebase_admin.messaging"
+
+# На это время записи «забираются» диспетчером, чтобы параллельный воркер их не взял
+CLAIM_TIMEOUT = timedelta(minutes=5)
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+# Максимум сообщений в одном запросе к FCM
+FCM_BATCH_SIZE = 500
+# Максимум id заявок в одном уведомлении о массовой смене статуса
+BULK_NOTIFICATION_IDS = 50
+
+STATS_PREFIX = "notifications:stats"
+PRUNE_REASONS = ("unregistered", "invalid")
+
+
+def get_messaging():
+    """
+    Модуль с API firebase_admin.messaging. FCM_MESSAGING_BACKEND позволяет
+    подменить его локальной заглушкой mobile_rest.fake_messaging.
+    """
+    path = getattr(settings, "FCM_MESSAGING_BACKEND", FIREBASE_MESSAGING)
+    if path == FIREBASE_MESSAGING:
+        import mobile_rest.firebase_init  # noqa: F401  (инициализация приложения Firebase)
+    return importlib.import_module(path)
+
+
+def _max_attempts():
+    return getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 8)
+
+
+def retry_delay(attempts):
+    """
+    Экспоненциальная задержка с jitter: 30 с, 60 с, 120 с, ... но не больше часа.
+    """
+    delay = min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+# ----- постановка в очередь -----
+
+def enqueue(user_id, title, body, data=None):
+    entry = NotificationOutbox.objects.create(user_id=user_id, title=title, body=body, data=data or {})
+    transaction.on_commit(lambda: schedule_dispatch([entry.id]))
+    return entry
+
+
+def enqueue_many(notifications):
+    """
+    Постановка в очередь пачки уведомлений одним INSERT.
+    notifications — итерируемое из (user_id, title, body, data).
+    """
+    entries = NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(user_id=user_id, title=title, body=body, data=data or {})
+        for user_id, title, body, data in notifications
+    ])
+    ids = [entry.id for entry in entries]
+    if ids:
+        transaction.on_commit(lambda: schedule_dispatch(ids))
+    return entries
+
+
+def status_notification(media_id, status, error_code="Не указан", error_text="Не указана"):
+    """
+    (title, body, data) уведомления о смене статуса заявки или None,
+    если о таком статусе пользователя не уведомляют.
+    """
+    if status == "Done":
+        title = "Заявка выполнена"
+        body = f"Ваша заявка отработана. ID: {media_id}"
+        data_payload = {"id": str(media_id)}
+    elif status == "Fail":
+        title = "Заявка отклонена"
+        body = f"Ваша заявка отклонена. ID: {media_id}, Код: {error_code}, Ошибка: {error_text}"
+        data_payload = {
+            "id": str(media_id),
+            "error_code": error_code,
+            "error_text": error_text,
+        }
+    else:
+        return None
+    return title, body, data_payload
+
+
+def bulk_status_notification(media_ids, status, error_code="Не указан", error_text="Не указана"):
+    """
+    Одно уведомление пользователю о смене статуса нескольких его заявок:
+    (title, body, data) или None, как у status_notification(). В тексте и data
+    перечисляются не больше BULK_NOTIFICATION_IDS id, чтобы не превысить лимит
+    размера сообщения FCM; полное число заявок — в data["count"].
+    """
+    if len(media_ids) == 1:
+        return status_notification(media_ids[0], status, error_code=error_code, error_text=error_text)
+    shown = ", ".join(str(media_id) for media_id in media_ids[:BULK_NOTIFICATION_IDS])
+    if len(media_ids) > BULK_NOTIFICATION_IDS:
+        shown += f" и ещё {len(media_ids) - BULK_NOTIFICATION_IDS}"
+    if status == "Done":
+        title = "Заявки выполнены"
+        body = f"Ваши заявки отработаны ({len(media_ids)}). ID: {shown}"
+        data_payload = {}
+    elif status == "Fail":
+        title = "Заявки отклонены"
+        body = f"Ваши заявки отклонены ({len(media_ids)}). ID: {shown}, Код: {error_code}, Ошибка: {error_text}"
+        data_payload = {
+            "error_code": error_code,
+            "error_text": error_text,
+        }
+    else:
+        return None
+    data_payload["ids"] = ",".join(str(media_id) for media_id in media_ids[:BULK_NOTIFICATION_IDS])
+    data_payload["count"] = str(len(media_ids))
+    return title, body, data_payload
+
+
+def schedule_dispatch(ids):
+    mode = getattr(settings, "NOTIFICATION_DISPATCH_MODE", "thread")
+    if mode == "sync":
+        dispatch(ids=ids, batch_size=len(ids))
+    elif mode == "thread":
+        threading.Thread(target=_dispatch_in_thread, args=(ids,), daemon=True).start()
+
+
+def _dispatch_in_thread(ids):
+    try:
+        dispatch(ids=ids, batch_size=len(ids))
+    except Exception as e:
+        # Запись останется pending и будет отправлена воркером
+        logger.exception(f"Error dispatching notifications {ids}: {e}")
+    finally:
+        connections.close_all()
+
+
+# ----- отправка -----
+
+def _claim(ids, batch_size):
+    with transaction.atomic():
+        qs = NotificationOutbox.objects.filter(status=NotificationOutbox.PENDING, next_attempt_at__lte=now())
+        if ids is not None:
+            qs = qs.filter(id__in=ids)
+        batch = list(qs.select_for_update(skip_locked=True).order_by("next_attempt_at", "id")[:batch_size])
+        if batch:
+            NotificationOutbox.objects.filter(id__in=[entry.id for entry in batch]).update(
+                next_attempt_at=now() + CLAIM_TIMEOUT
+            )
+    return batch
+
+
+def _tokens_by_user(user_ids):
+    tokens = {}
+    devices = FCMDevice.objects.filter(user_id__in=user_ids, active=True).values_list("user_id", "registration_id")
+    for user_id, registration_id in devices:
+        if registration_id:
+            tokens.setdefault(user_id, []).append(registration_id)
+    return tokens
+
+
+def _messages(messaging, batch, tokens):
+    """
+    Одно сообщение на каждый ещё не получивший уведомление токен каждой записи:
+    [(entry, Message), ...].
+    """
+    messages = []
+    for entry in batch:
+        notification = messaging.Notification(title=entry.title, body=entry.body)
+        delivered = set(entry.delivered_tokens)
+        for token in tokens.get(entry.user_id, ()):
+            if token in delivered:
+                continue
+            messages.append((entry, messaging.Message(notification=notification, data=entry.data, token=token)))
+    return messages
+
+
+# ----- мёртвые токены -----
+
+def _dead_token_reason(messaging, error):
+    """
+    "unregistered"/"invalid", если токен больше не годится для отправки, иначе None
+    (временные ошибки FCM токен не удаляют).
+    """
+    if isinstance(error, messaging.UnregisteredError):
+        return "unregistered"
+    if isinstance(error, firebase_exceptions.InvalidArgumentError):
+        return "invalid"
+    return None
+
+
+def prune_tokens(dead_tokens):
+    """
+    Удаляет (или деактивирует) устройства с мёртвыми токенами одним запросом.
+    dead_tokens — {registration_id: reason}. Возвращает число затронутых устройств.
+    """
+    if not dead_tokens:
+        return 0
+    devices = FCMDevice.objects.filter(registration_id__in=list(dead_tokens))
+    if getattr(settings, "FCM_DJANGO_SETTINGS", {}).get("DELETE_INACTIVE_DEVICES"):
+        pruned, _ = devices.delete()
+    else:
+        pruned = devices.filter(active=True).update(active=False)
+    for reason in PRUNE_REASONS:
+        count = sum(1 for value in dead_tokens.values() if value == reason)
+        if count:
+            _count(f"pruned:{reason}", count)
+    logger.info(f"Pruned {pruned} FCM devices with dead tokens")
+    return pruned
+
+
+def _count(name, delta=1):
+    key = f"{STATS_PREFIX}:{name}"
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Счётчика ещё нет (или он был вытеснен)
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def stats():
+    """
+    Счётчики удалённых мёртвых токенов (общие для всех воркеров при Redis-бэкенде кэша).
+    """
+    values = cache.get_many([f"{STATS_PREFIX}:pruned:{reason}" for reason in PRUNE_REASONS])
+    pruned = {reason: values.get(f"{STATS_PREFIX}:pruned:{reason}", 0) for reason in PRUNE_REASONS}
+    return {"pruned_tokens": dict(pruned, total=sum(pruned.values()))}
+
+
+def dispatch(ids=None, batch_size=100):
+    """
+    Отправляет до batch_size готовых к отправке уведомлений (или только ids).
+    Сообщения всех записей пакета уходят в FCM вызовами send_each по FCM_BATCH_SIZE штук.
+    Возвращает счётчики {"sent", "retried", "failed", "pruned"}.
+    """
+    stats = {"sent": 0, "retried": 0, "failed": 0, "pruned": 0}
+    batch = _claim(ids, batch_size)
+    if not batch:
+        return stats
+
+    messaging = get_messaging()
+    messages = _messages(messaging, batch, _tokens_by_user({entry.user_id for entry in batch}))
+    # entry.id -> текст ошибки, если хотя бы одна пачка с её сообщениями не ушла
+    errors = {}
+    dead_tokens = {}
+    for start in range(0, len(messages), FCM_BATCH_SIZE):
+        chunk = messages[start:start + FCM_BATCH_SIZE]
+        try:
+            response = messaging.send_each([message for _, message in chunk])
+        except Exception as e:
+            for entry, _ in chunk:
+                errors[entry.id] = str(e)
+            logger.warning(f"Error sending {len(chunk)} notifications: {e}")
+        else:
+            logger.info(f"Sent {len(chunk)} notifications: {response.success_count} success, {response.failure_count} failure")
+            for (entry, message), result in zip(chunk, response.responses):
+                if result.success:
+                    entry.delivered_tokens.append(message.token)
+                    continue
+                reason = _dead_token_reason(messaging, result.exception)
+                if reason:
+                    dead_tokens[message.token] = reason
+                else:
+                    # Временная ошибка FCM по токену — повторим только его
+                    errors[entry.id] = str(result.exception)
+    stats["pruned"] = prune_tokens(dead_tokens)
+
+    for entry in batch:
+        entry.attempts += 1
+        error = errors.get(entry.id)
+        if error is not None:
+            entry.last_error = error
+            if entry.attempts >= _max_attempts():
+                entry.status = NotificationOutbox.FAILED
+                stats["failed"] += 1
+                logger.error(f"Error sending user notification {entry.id}, giving up after {entry.attempts} attempts: {error}")
+            else:
+                entry.next_attempt_at = now() + retry_delay(entry.attempts)
+                stats["retried"] += 1
+        else:
+            entry.status = NotificationOutbox.SENT
+            entry.sent_at = now()
+            entry.next_attempt_at = entry.sent_at
+            stats["sent"] += 1
+
+    NotificationOutbox.objects.bulk_update(
+        batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at", "delivered_tokens"]
+    )
+    return stats
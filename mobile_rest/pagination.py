@@ -0,0 +1,114 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) пагинация по паре (<поле даты>, id) в порядке убывания.
+
+    В отличие от OFFSET, каждая страница — это поиск по индексу
+    (<поле даты> DESC, id DESC) от позиции курсора, поэтому глубокие страницы
+    стоят столько же, сколько первая.
+
+    Строки могут быть экземплярами моделей, словарями из .values() или
+    кортежами из .values_list(..., named=True) (в двух последних случаях
+    в выборку должны входить поле даты и id).
+
+    Курсор — непрозрачная строка (base64 от JSON) с позицией крайней записи
+    страницы и направлением: "n" — дальше (более старые записи),
+    "p" — назад (более новые записи).
+    """
+
+    NEXT = "n"
+    PREV = "p"
+
+    def __init__(self, field):
+        self.field = field
+
+    # ----- курсоры -----
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return row[self.field], row["id"]
+        if isinstance(row, tuple):
+            # Строка .values_list(..., named=True)
+            return getattr(row, self.field), row.id
+        return getattr(row, self.field), row.pk
+
+    def encode_cursor(self, row, direction):
+        value, pk = self._position(row)
+        position = {
+            "v": value.isoformat(),
+            "i": pk,
+            "d": direction,
+        }
+        raw = json.dumps(position, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value = parse_datetime(position["v"])
+            pk = int(position["i"])
+            direction = position["d"]
+        except (ValueError, TypeError, KeyError):
+            raise InvalidCursor("Некорректный курсор")
+        if value is None or direction not in (self.NEXT, self.PREV):
+            raise InvalidCursor("Некорректный курсор")
+        return value, pk, direction
+
+    # ----- выборка -----
+
+    def _before(self, value, pk):
+        # (field, id) < (value, pk); условие field <= value позволяет
+        # использовать индекс для поиска начальной позиции
+        return Q(**{f"{self.field}__lte": value}) & (
+            Q(**{f"{self.field}__lt": value}) | Q(pk__lt=pk)
+        )
+
+    def _after(self, value, pk):
+        # (field, id) > (value, pk)
+        return Q(**{f"{self.field}__gte": value}) & (
+            Q(**{f"{self.field}__gt": value}) | Q(pk__gt=pk)
+        )
+
+    def paginate(self, queryset, limit, cursor=None):
+        """
+        Возвращает (rows, next_cursor, prev_cursor).
+        Выполняет ровно один запрос к основной таблице (плюс prefetch, если он задан).
+        """
+        direction = self.NEXT
+        if cursor:
+            value, pk, direction = self.decode_cursor(cursor)
+            if direction == self.NEXT:
+                queryset = queryset.filter(self._before(value, pk))
+            else:
+                queryset = queryset.filter(self._after(value, pk))
+
+        if direction == self.NEXT:
+            queryset = queryset.order_by(f"-{self.field}", "-pk")
+        else:
+            queryset = queryset.order_by(self.field, "pk")
+
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        rows = list(queryset[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if direction == self.PREV:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(cursor)
+
+        next_cursor = self.encode_cursor(rows[-1], self.NEXT) if rows and has_next else None
+        prev_cursor = self.encode_cursor(rows[0], self.PREV) if rows and has_prev else None
+        return rows, next_cursor, prev_cursor
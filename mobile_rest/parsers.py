@@ -0,0 +1,39 @@
+"""
+JSON-парсер на orjson с тем же поведением, что и rest_framework.parsers.JSONParser.
+orjson читает только UTF-8 и не принимает NaN/Infinity, поэтому для других
+кодировок и нестрогого режима используется парсер DRF. Он же разбирает тела
+с целыми из 19 и более цифр: orjson превращает целые шире 64 бит во float
+с потерей точности, а json из стандартной библиотеки сохраняет их как есть.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+# Последовательность цифр, которая может оказаться целым вне диапазона int64/uint64
+# (совпадения внутри строк лишь переводят разбор на парсер DRF)
+LONG_INTEGER = re.compile(rb'\d{19,}')
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_INTEGER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
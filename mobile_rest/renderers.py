@@ -0,0 +1,53 @@
+"""
+JSON-рендерер на orjson.
+
+Вывод — тот же JSON, что у rest_framework.renderers.JSONRenderer: компактный
+UTF-8, даты/время/Decimal/UUID и прочие нестандартные типы кодируются тем же
+rest_framework.utils.encoders.JSONEncoder, \\u2028/\\u2029 экранируются.
+Побайтно он может отличаться только записью чисел с плавающей точкой
+и тем, что NaN/Infinity orjson пишет как null (JSONRenderer выдаёт ошибку):
+    1e16, 1e-7   вместо 1e+16, 1e-07 — то же значение при разборе.
+Данные, которые orjson закодировать не может (целые шире 64 бит из JSONField
+и т.п.), и ответы с отступом (indent, Browsable API) рендерятся стандартным
+рендерером DRF; он же используется, если orjson не установлен.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    # datetime/date/time отдаём в default(), чтобы формат совпадал с DRF
+    # (например, 'Z' вместо '+00:00'); UUID orjson пишет так же, как str(uuid)
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Например, целое шире 64 бит: json из стандартной библиотеки его запишет
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранируем \u2028 и \u2029
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
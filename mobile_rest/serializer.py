@@ -3,6 +3,7 @@ from django.contrib.auth import authenticate
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import MediaFiles, MediaFile, MediaFileNews, News, CustomUser
+from .uploads import MAX_BATCH_FILES, MAX_PARTS, is_valid_file_key
 
 
 class MediaFileNewsSerializer(serializers.ModelSerializer):
@@ -19,14 +20,18 @@ class NewsSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'text', 'created_at', 'media']
 
     def get_media(self, obj):
-        media_files = MediaFileNews.objects.filter(news=obj)
+        # Использует prefetch-кэш, если queryset построен через News.objects.with_media()
+        media_files = obj.media.all()
         return MediaFileNewsSerializer(media_files, many=True).data
 
 
 class MediaFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = MediaFile
-        fields = ['id', 'video_file']
+        fields = [
+            'id', 'video_file', 'size', 'content_type', 'etag', 'uploaded_at',
+            'duration', 'width', 'height', 'codec',
+        ]
 
 
 class MediaFilesSerializer(serializers.ModelSerializer):
@@ -38,10 +43,77 @@ class MediaFilesSerializer(serializers.ModelSerializer):
 
     def get_videos(self, obj):
         # Возвращаем сериализованные видеофайлы, связанные с текущей записью
-        media_files = MediaFile.objects.filter(media=obj)
+        # Использует prefetch-кэш, если queryset построен через MediaFiles.objects.with_videos()
+        media_files = obj.videos.all()
         return MediaFileSerializer(media_files, many=True).data
 
 
+class MediaFilesBulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000)
+    status = serializers.CharField(max_length=16)
+    error_code = serializers.CharField(required=False, allow_blank=True)
+    error_text = serializers.CharField(required=False, allow_blank=True)
+
+
+class PresignFileSerializer(serializers.Serializer):
+    file_name = serializers.CharField(max_length=200)
+    content_type = serializers.CharField(max_length=100, default="video/mp4")
+
+    def validate_file_name(self, value):
+        if "/" in value or "\\" in value:
+            raise serializers.ValidationError("Имя файла не должно содержать путь")
+        return value
+
+
+class BatchPresignSerializer(serializers.Serializer):
+    media_id = serializers.IntegerField(min_value=1)
+    files = PresignFileSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_FILES)
+
+
+class BatchConfirmUploadSerializer(serializers.Serializer):
+    media_id = serializers.IntegerField(min_value=1)
+    file_keys = serializers.ListField(
+        child=serializers.CharField(max_length=255), allow_empty=False, max_length=MAX_BATCH_FILES
+    )
+
+    def validate_file_keys(self, value):
+        for file_key in value:
+            if not is_valid_file_key(file_key):
+                raise serializers.ValidationError(f"Некорректный ключ файла: {file_key}")
+        return value
+
+
+class MultipartCreateSerializer(PresignFileSerializer):
+    media_id = serializers.IntegerField(min_value=1)
+
+
+class MultipartUploadSerializer(serializers.Serializer):
+    file_key = serializers.CharField(max_length=255)
+    upload_id = serializers.CharField(max_length=1024)
+
+    def validate_file_key(self, value):
+        if not is_valid_file_key(value):
+            raise serializers.ValidationError(f"Некорректный ключ файла: {value}")
+        return value
+
+
+class MultipartPartUrlsSerializer(MultipartUploadSerializer):
+    part_numbers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_PARTS), allow_empty=False, max_length=100
+    )
+
+
+class MultipartPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=MAX_PARTS)
+    etag = serializers.CharField(max_length=128)
+
+
+class MultipartCompleteSerializer(MultipartUploadSerializer):
+    media_id = serializers.IntegerField(min_value=1)
+    # Если не переданы, завершаем со всеми загруженными частями
+    parts = MultipartPartSerializer(many=True, required=False, allow_empty=False, max_length=MAX_PARTS)
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
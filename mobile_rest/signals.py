@@ -1,66 +1,77 @@
 import logging
-import mobile_rest.firebase_init
 
-from django.db.models.signals import pre_save, post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import MediaFiles
-from fcm_django.models import FCMDevice
-from firebase_admin import messaging
+from django.utils.timezone import now
+from .models import MediaFiles, MediaFile, News, MediaFileNews, status_changed
+from . import news_cache, outbox
 
 logger = logging.getLogger(__name__)
 
 
 @receiver(pre_save, sender=MediaFiles)
 def mediafiles_pre_save(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._old_status = old_instance.status
-        except sender.DoesNotExist:
-            instance._old_status = None
+    if not instance.pk:
+        instance._old_status = None
+    elif instance.has_loaded_value("status"):
+        # Статус на момент загрузки из БД запомнен в MediaFiles.from_db — без лишнего SELECT
+        instance._old_status = instance.get_loaded_value("status")
+    else:
+        # Экземпляр создан вручную с pk или статус был отложен (.only()/.defer())
+        instance._old_status = sender.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
 
 
 @receiver(post_save, sender=MediaFiles)
 def mediafiles_post_save(sender, instance, created, **kwargs):
     old_status = getattr(instance, "_old_status", None)
+    instance.snapshot_tracked_fields()
     # Если объект только что создан – уведомление не отправляем
     if created:
         return
 
-    # Отправка уведомления, если статус изменился и стал "Done" или "Fail"
-    if old_status != instance.status and instance.status in ("Done", "Fail"):
-        if instance.status == "Done":
-            title = "Заявка выполнена"
-            body = f"Ваша заявка отработана. ID: {instance.id}"
-            data_payload = {"id": str(instance.id)}
-        elif instance.status == "Fail":
-            title = "Заявка отклонена"
-
-            error_code = getattr(instance, "error_code", "Не указан")
-            error_text = getattr(instance, "error_text", "Не указана")
-            body = f"Ваша заявка отклонена. ID: {instance.id}, Код: {error_code}, Ошибка: {error_text}"
-            data_payload = {
-                "id": str(instance.id),
-                "error_code": error_code,
-                "error_text": error_text,
-            }
-        else:
-            return
-
-        user_devices = FCMDevice.objects.filter(user=instance.user)
-        tokens = [device.registration_id for device in user_devices if device.registration_id]
-
-        if tokens:
-            message = messaging.MulticastMessage(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body,
-                ),
-                data=data_payload,
-                tokens=tokens,
-            )
-            try:
-                response = messaging.send_multicast(message)
-                logger.info(f"Sent notification to user {instance.user.id}: {response.success_count} success, {response.failure_count} failure")
-            except Exception as e:
-                logger.exception(f"Error sending user notification: {e}")
+    if old_status != instance.status:
+        status_changed.send(sender=sender, instance=instance, old_status=old_status)
+
+
+@receiver(status_changed, sender=MediaFiles)
+def mediafiles_status_changed(sender, instance, old_status, **kwargs):
+    # Отправка уведомления, если статус стал "Done" или "Fail"
+    notification = outbox.status_notification(
+        instance.id,
+        instance.status,
+        error_code=getattr(instance, "error_code", "Не указан"),
+        error_text=getattr(instance, "error_text", "Не указана"),
+    )
+    if notification is None:
+        return
+
+    # Уведомление уходит в outbox и отправляется в FCM только после коммита
+    title, body, data_payload = notification
+    outbox.enqueue(instance.user_id, title, body, data_payload)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def news_changed(sender, instance, **kwargs):
+    # Сбрасываем кэш только после коммита, иначе параллельный запрос
+    # может успеть закэшировать ещё не изменённые данные
+    news_id = instance.pk
+    transaction.on_commit(lambda: news_cache.invalidate(news_id))
+
+
+@receiver(post_save, sender=MediaFileNews)
+@receiver(post_delete, sender=MediaFileNews)
+def news_media_changed(sender, instance, **kwargs):
+    news_id = instance.news_id
+    # update() не вызывает сигналы News, поэтому кэш сбрасываем явно
+    News.objects.filter(pk=news_id).update(updated_at=now())
+    transaction.on_commit(lambda: news_cache.invalidate(news_id))
+
+
+@receiver(post_save, sender=MediaFile)
+@receiver(post_delete, sender=MediaFile)
+def media_file_changed(sender, instance, **kwargs):
+    # Новое/удалённое видео меняет ответ по заявке, а значит и её ETag.
+    # update() не запускает сигналы MediaFiles (и уведомления о статусе)
+    MediaFiles.objects.filter(pk=instance.media_id).update(updated_at=now())
@@ -1,22 +1,216 @@
+import logging
+import random
+import threading
+import time
 
-import re
 import requests
 from decouple import config
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
 
 MOBIZON_API_KEY = config("MOBIZON_API_KEY")
 MOBIZON_API_URL = config("MOBIZON_API_URL")
+# Таймауты (с): установка соединения / ожидание ответа
+MOBIZON_CONNECT_TIMEOUT = config("MOBIZON_CONNECT_TIMEOUT", default=3.05, cast=float)
+MOBIZON_READ_TIMEOUT = config("MOBIZON_READ_TIMEOUT", default=10.0, cast=float)
+MOBIZON_RETRIES = config("MOBIZON_RETRIES", default=2, cast=int)
+# Сколько ошибок подряд размыкают предохранитель и на сколько секунд
+MOBIZON_BREAKER_THRESHOLD = config("MOBIZON_BREAKER_THRESHOLD", default=5, cast=int)
+MOBIZON_BREAKER_RESET = config("MOBIZON_BREAKER_RESET", default=30.0, cast=float)
+
+# Ответы, после которых запрос можно безопасно повторить: сообщение не было принято
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class MobizonError(Exception):
+    pass
+
+
+class CircuitOpenError(MobizonError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Предохранитель: после threshold ошибок подряд все вызовы сразу отклоняются
+    на reset_timeout секунд, затем пропускается один пробный запрос
+    (half-open). Удачный пробный запрос замыкает цепь, неудачный — снова
+    размыкает её.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError("SMS-сервис временно недоступен")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe_in_flight or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+            self._probe_in_flight = False
+
+
+class MobizonClient:
+    """
+    Клиент Mobizon API: одна keep-alive сессия с пулом соединений на процесс,
+    таймауты на соединение и чтение, ограниченное число повторов с jitter
+    и предохранитель, который при недоступности провайдера сразу возвращает
+    ошибку вместо ожидания таймаута в каждом запросе.
+
+    Повторяются только запросы, которые провайдер заведомо не обработал
+    (ошибка соединения, 429/502/503/504): после таймаута чтения SMS могло
+    уже уйти, и повтор отправил бы код дважды.
+    """
+
+    def __init__(
+        self,
+        api_url,
+        api_key,
+        connect_timeout=3.05,
+        read_timeout=10.0,
+        retries=2,
+        backoff=0.2,
+        pool_size=10,
+        breaker=None,
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _sleep(self, attempt):
+        # Экспоненциальная задержка с полным jitter
+        time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def _request(self, params):
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+            except requests.ConnectionError as e:
+                # В том числе ConnectTimeout; ReadTimeout сюда не попадает и не повторяется
+                if last:
+                    raise MobizonError(f"Mobizon недоступен: {e}") from e
+                logger.warning(f"Mobizon connection error, attempt {attempt + 1}: {e}")
+            except requests.RequestException as e:
+                raise MobizonError(f"Ошибка запроса к Mobizon: {e}") from e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if last:
+                    raise MobizonError(f"Mobizon вернул HTTP {response.status_code}")
+                logger.warning(f"Mobizon HTTP {response.status_code}, attempt {attempt + 1}")
+            self._sleep(attempt)
+
+    def send_sms(self, recipient, text):
+        """
+        Отправляет SMS. Возвращает JSON-ответ Mobizon ({"code": 0, ...} при успехе).
+        MobizonError — провайдер недоступен или ответил ошибкой HTTP,
+        CircuitOpenError — предохранитель разомкнут, запрос не выполнялся.
+        """
+        self.breaker.before_call()
+        params = {
+            'recipient': recipient,
+            'text': text,
+            'apiKey': self.api_key,
+        }
+        succeeded = False
+        try:
+            response = self._request(params)
+            if response.status_code >= 500:
+                raise MobizonError(f"Mobizon вернул HTTP {response.status_code}")
+            try:
+                result = response.json()
+            except ValueError as e:
+                raise MobizonError("Некорректный ответ Mobizon") from e
+            succeeded = True
+        finally:
+            # Любое исключение (в том числе непредвиденное или таймаут gevent) считается
+            # ошибкой: иначе пробный запрос half-open остался бы «в полёте» навсегда
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Общий для процесса MobizonClient (создаётся при первом обращении).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MobizonClient(
+                    MOBIZON_API_URL,
+                    MOBIZON_API_KEY,
+                    connect_timeout=MOBIZON_CONNECT_TIMEOUT,
+                    read_timeout=MOBIZON_READ_TIMEOUT,
+                    retries=MOBIZON_RETRIES,
+                    breaker=CircuitBreaker(MOBIZON_BREAKER_THRESHOLD, MOBIZON_BREAKER_RESET),
+                )
+    return _client
+
 
 def send_verification_code(phone_number, code):
     """
     Отправляет SMS с кодом подтверждения на указанный номер телефона через Mobizon API.
     """
-    payload = {
-        'recipient': phone_number,
-        'text': f'Проверочный код для регистрации на сайте iSPARK.kz: {code}',
-        'apiKey': MOBIZON_API_KEY,
-    }
-    response = requests.get(MOBIZON_API_URL, params=payload)
-    result = response.json()
+    try:
+        result = get_client().send_sms(
+            phone_number, f'Проверочный код для регистрации на сайте iSPARK.kz: {code}'
+        )
+    except MobizonError as e:
+        logger.warning(f"Error sending verification code: {e}")
+        return {'status': 'error', 'message': str(e)}
     if result.get('code') == 0:
         return {'status': 'success'}
     else:
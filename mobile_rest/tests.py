@@ -1,11 +1,60 @@
-from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from django.urls import include, path, reverse
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 from rest_framework import status
-from .models import News, MediaFiles
-from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from .models import News, MediaFiles, MediaFile, MediaFileNews
+from .serializer import MediaFilesSerializer, NewsSerializer
+from .fast_serializer import FastMediaFilesSerializer, FastNewsSerializer
+from .renderers import ORJSONRenderer
+from .parsers import ORJSONParser
+from .models import NotificationOutbox, VerificationCode
+from . import fake_messaging, fake_mp4, mp4probe, outbox, sms_service, uploads
+from .fake_mobizon import FakeMobizonServer
+from .sms_service import CircuitBreaker, CircuitOpenError, MobizonClient, MobizonError
+from .verification import CacheCodeStore, DatabaseCodeStore, get_code_store, sweep_expired
+from firebase_admin import exceptions as firebase_exceptions
+from helpers.cloudflare import clients as r2_clients, settings as r2_settings
+from helpers.cloudflare.signing import PresignedUrlSigner
+from helpers.cloudflare.storages import MediaFileStorage, ProtectedMediaStorage
+from helpers.cloudflare.uploadhandler import StreamingUploadHandler
+from helpers.storages.filesystem import storage_for_key
+from helpers.storages.middleware import MetadataCacheStatsMiddleware
+from storages.backends.s3 import S3Storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from django.core.cache import cache
+from django.core.files.storage import default_storage, storages
 from django.contrib.auth import get_user_model
 from fcm_django.models import FCMDevice
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from decimal import Decimal
+from unittest import skipIf
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import requests
+
+try:
+    # moto перехватывает запросы к endpoint R2 только если он указан явно
+    os.environ.setdefault("MOTO_S3_CUSTOM_ENDPOINTS", r2_settings.endpoint_url or "")
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
 
 User = get_user_model()
 
@@ -16,6 +65,7 @@ class BaseAPITest(APITestCase):
     """
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             phone_number='123456789',
@@ -45,6 +95,279 @@ class SendVerificationCodeViewTest(APITestCase):
         self.assertIn('error', response.data)
 
 
+class MobizonClientTest(TestCase):
+    def setUp(self):
+        self.server = FakeMobizonServer().start()
+        self.addCleanup(self.server.stop)
+        self.clock = [0.0]
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=30, clock=lambda: self.clock[0])
+        self.client = MobizonClient(self.server.url, "key", read_timeout=0.5, backoff=0, breaker=self.breaker)
+        self.addCleanup(self.client.close)
+
+    def test_send_reuses_connection(self):
+        for _ in range(3):
+            self.assertEqual(self.client.send_sms("77001234567", "Код: 1234")["code"], 0)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            self.server.requests[0], {"recipient": "77001234567", "text": "Код: 1234", "apiKey": "key"}
+        )
+
+    def test_retries_unavailable(self):
+        self.server.fail_next[:] = [503, 502]
+        self.assertEqual(self.client.send_sms("77001234567", "Код")["code"], 0)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_read_timeout_not_retried(self):
+        self.server.latency = 1.0
+        with self.assertRaises(MobizonError):
+            self.client.send_sms("77001234567", "Код")
+        # Повтор после таймаута чтения мог бы отправить SMS дважды
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_circuit_breaker(self):
+        self.server.fail_next[:] = [503] * 6
+        for _ in range(2):
+            with self.assertRaises(MobizonError):
+                self.client.send_sms("77001234567", "Код")
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        # Пока цепь разомкнута, запросы к провайдеру не выполняются
+        with self.assertRaises(CircuitOpenError):
+            self.client.send_sms("77001234567", "Код")
+        self.assertEqual(len(self.server.requests), 6)
+
+        # После паузы пропускается пробный запрос; удачный замыкает цепь
+        self.clock[0] = 31
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.client.send_sms("77001234567", "Код")["code"], 0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_releases_probe(self):
+        self.server.fail_next[:] = [503] * 6
+        for _ in range(2):
+            with self.assertRaises(MobizonError):
+                self.client.send_sms("77001234567", "Код")
+        self.clock[0] = 31
+
+        # Непредвиденное исключение в пробном запросе снова размыкает цепь
+        with patch.object(self.client.session, "get", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.client.send_sms("77001234567", "Код")
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        # и не блокирует следующий пробный запрос
+        self.clock[0] = 62
+        self.assertEqual(self.client.send_sms("77001234567", "Код")["code"], 0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_send_verification_code(self):
+        with patch("mobile_rest.sms_service._client", self.client):
+            self.assertEqual(sms_service.send_verification_code("77001234567", "123456"), {"status": "success"})
+            self.server.response = {"code": 1, "data": [], "message": "Неверный номер"}
+            self.assertEqual(
+                sms_service.send_verification_code("77001234567", "123456"),
+                {"status": "error", "message": "Неверный номер"}
+            )
+            self.breaker.opened_at = self.clock[0]
+            result = sms_service.send_verification_code("77001234567", "123456")
+        self.assertEqual(result["status"], "error")
+        self.assertIn("123456", self.server.requests[0]["text"])
+
+
+SMS_THROTTLE_SETTINGS = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {"sms_phone": "2/hour", "sms_ip": "4/hour"},
+}
+
+
+@override_settings(REST_FRAMEWORK=SMS_THROTTLE_SETTINGS)
+@patch('mobile_rest.views.send_verification_code', return_value={'status': 'success'})
+class SmsThrottleTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('send_code')
+
+    def test_phone_number_bucket(self, mock_send):
+        for _ in range(2):
+            response = self.client.post(self.url, {"phone_number": "77001234567"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Отказ — до любых запросов к БД и до отправки SMS; другой формат того же номера не помогает
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {"phone_number": "+7 700 123-45-67"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Один токен из двух в час восполняется за 30 минут
+        self.assertAlmostEqual(int(response["Retry-After"]), 1800, delta=2)
+        self.assertEqual(mock_send.call_count, 2)
+
+        # Другой номер с того же IP ещё в пределах лимита
+        response = self.client.post(self.url, {"phone_number": "77007654321"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_client_ip_bucket(self, mock_send):
+        for i in range(4):
+            response = self.client.post(self.url, {"phone_number": f"7700000000{i}"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(self.url, {"phone_number": "77000000009"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # Другой клиент ограничен отдельно
+        response = self.client.post(
+            self.url, {"phone_number": "77000000009"}, format='json', REMOTE_ADDR="10.0.0.2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_is_not_trusted(self, mock_send):
+        for i in range(5):
+            response = self.client.post(
+                self.url, {"phone_number": f"7700000000{i}"}, format='json', HTTP_X_FORWARDED_FOR=f"10.1.0.{i}"
+            )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK={**SMS_THROTTLE_SETTINGS, "NUM_PROXIES": 1})
+    def test_forwarded_for_behind_proxy(self, mock_send):
+        # За одним прокси клиент — последний адрес X-Forwarded-For, добавленный прокси
+        for i in range(5):
+            response = self.client.post(
+                self.url, {"phone_number": f"7700000000{i}"}, format='json',
+                HTTP_X_FORWARDED_FOR=f"10.1.0.{i}, 192.0.2.1"
+            )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(
+            self.url, {"phone_number": "77000000009"}, format='json', HTTP_X_FORWARDED_FOR="192.0.2.2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bucket_refills(self, mock_send):
+        for _ in range(2):
+            self.client.post(self.url, {"phone_number": "77001234567"}, format='json')
+        response = self.client.post(self.url, {"phone_number": "77001234567"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        later = time.time() + 1801
+        with patch("mobile_rest.throttling.time.time", return_value=later):
+            response = self.client.post(self.url, {"phone_number": "77001234567"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_redis_bucket(self, mock_send):
+        # С Redis ведро списывается Lua-скриптом через общий клиент redis-py
+        client = Mock()
+        client.eval.return_value = [0, "0.5"]
+        with patch("mobile_rest.throttling.get_redis", return_value=client):
+            response = self.client.post(self.url, {"phone_number": "77001234567"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Недостающие полтокена восполняются за 15 минут
+        self.assertAlmostEqual(int(response["Retry-After"]), 900, delta=2)
+        script, num_keys, key = client.eval.call_args.args[:3]
+        self.assertEqual((num_keys, key), (1, cache.make_and_validate_key("throttle:sms_phone:77001234567")))
+        mock_send.assert_not_called()
+
+    def test_password_reset_throttled(self, mock_send):
+        User.objects.create_user(phone_number="77001234567", password="pass")
+        url = reverse('request_password_reset')
+        for _ in range(2):
+            self.client.post(url, {"phone_number": "77001234567"}, format='json')
+        response = self.client.post(url, {"phone_number": "77001234567"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+
+class VerificationCodeStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _check_store(self, store):
+        store.issue("77001234567", "111111")
+        store.issue("77001234567", "222222")
+        # Новый код заменяет старый
+        self.assertFalse(store.consume("77001234567", "111111"))
+        self.assertFalse(store.consume("77009999999", "222222"))
+        self.assertTrue(store.consume("77001234567", "222222"))
+        # Код одноразовый
+        self.assertFalse(store.consume("77001234567", "222222"))
+
+    def test_database_store(self):
+        store = DatabaseCodeStore()
+        self._check_store(store)
+
+        with self.assertNumQueries(1):
+            store.issue("77001234567", "333333")
+        with self.assertNumQueries(1):
+            self.assertTrue(store.consume("77001234567", "333333"))
+        self.assertFalse(VerificationCode.objects.exists())
+
+    def test_database_store_expired(self):
+        store = DatabaseCodeStore()
+        store.issue("77001234567", "111111")
+        VerificationCode.objects.update(created_at=timezone.now() - datetime.timedelta(seconds=301))
+        self.assertFalse(store.consume("77001234567", "111111"))
+
+    def test_cache_store(self):
+        self._check_store(CacheCodeStore())
+
+    def test_cache_store_consumes_once_concurrently(self):
+        store = CacheCodeStore()
+        store.issue("77001234567", "111111")
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(store.consume("77001234567", "111111")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+
+    @override_settings(VERIFICATION_CODE_TTL=1)
+    def test_cache_store_ttl(self):
+        store = CacheCodeStore()
+        store.issue("77001234567", "111111")
+        with patch("django.core.cache.backends.locmem.time.time", return_value=time.time() + 2):
+            self.assertFalse(store.consume("77001234567", "111111"))
+
+    def test_sweep_expired_in_batches(self):
+        VerificationCode.objects.bulk_create([
+            VerificationCode(phone_number=f"7700000{i:04d}", code="111111") for i in range(25)
+        ])
+        VerificationCode.objects.filter(phone_number__lt="77000000020").update(
+            created_at=timezone.now() - datetime.timedelta(days=2)
+        )
+        # 2 пачки по 10 (SELECT id + DELETE) и пустой SELECT после полной пачки
+        with self.assertNumQueries(5):
+            self.assertEqual(sweep_expired(batch_size=10), 20)
+        self.assertEqual(VerificationCode.objects.count(), 5)
+
+        out = io.StringIO()
+        call_command("sweep_verification_codes", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "deleted=0")
+
+    def test_is_expired_counts_days(self):
+        record = VerificationCode(phone_number="77001234567", code="111111")
+        record.created_at = timezone.now() - datetime.timedelta(days=1, seconds=10)
+        self.assertTrue(record.is_expired())
+        record.created_at = timezone.now() - datetime.timedelta(seconds=10)
+        self.assertFalse(record.is_expired())
+
+    @patch('mobile_rest.views.send_verification_code', return_value={'status': 'success'})
+    def test_register_with_issued_code(self, mock_send):
+        client = APIClient()
+        response = client.post(reverse('send_code'), {"phone_number": "77001234567"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        code = mock_send.call_args[0][1]
+
+        data = {"phone_number": "77001234567", "code": code, "full_name": "Test User", "password": "testpass"}
+        response = client.post(reverse('verify_code'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(User.objects.filter(phone_number="77001234567").exists())
+
+        # Повторное использование того же кода отклоняется
+        User.objects.filter(phone_number="77001234567").delete()
+        response = client.post(reverse('verify_code'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 # ---------------------------------------------------------
 #   VERIFY CODE (REGISTER)
 # ---------------------------------------------------------
@@ -169,6 +492,745 @@ class MediaFilesUploadViewTest(BaseAPITest):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class R2ClientTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.media = MediaFiles.objects.create(
+            user=self.user,
+            city="City",
+            street="Street",
+            description="Test description",
+            was_at_date="2025-03-28",
+            was_at_time="12:00:00",
+            status="Waiting"
+        )
+
+    def test_client_is_shared(self):
+        client = r2_clients.get_client()
+        self.assertIs(r2_clients.get_client(), client)
+
+        from_threads = []
+        threads = [threading.Thread(target=lambda: from_threads.append(r2_clients.get_client())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(other is client for other in from_threads))
+        self.assertEqual(client.meta.config.max_pool_connections, r2_settings.max_pool_connections)
+
+    def test_resource_per_thread(self):
+        resource = r2_clients.get_resource()
+        self.assertIs(r2_clients.get_resource(), resource)
+
+        from_threads = []
+        with patch("boto3.session.Session.client", side_effect=AssertionError("client must be shared")):
+            thread = threading.Thread(target=lambda: from_threads.append(r2_clients.get_resource()))
+            thread.start()
+            thread.join()
+        # resource не потокобезопасен — у потока свой, но поверх общего клиента
+        self.assertIsNot(from_threads[0], resource)
+        self.assertIs(from_threads[0].meta.client, resource.meta.client)
+
+    def test_storage_uses_shared_client(self):
+        self.assertIs(default_storage.connection.meta.client, r2_clients.get_client())
+        self.assertIsNot(default_storage.unsigned_connection, default_storage.connection)
+
+    @patch("boto3.client", side_effect=AssertionError("boto3.client must not be called per request"))
+    def test_presign_view_reuses_client(self, mock_client):
+        url = reverse('mediafiles-generate-upload')
+        response = self.client.post(url, {'media_id': self.media.id, 'file_name': 'clip.mp4'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("test-bucket", response.data['upload_url'])
+        self.assertIn(response.data['file_key'], response.data['upload_url'])
+        self.assertFalse(mock_client.called)
+
+
+class UrlSigningTest(TestCase):
+    NOW = 1760000123.0
+
+    def setUp(self):
+        self.storage = ProtectedMediaStorage(**settings.STORAGES['default']['OPTIONS'])
+        self.signer = self.storage.signer
+
+    def test_matches_botocore(self):
+        key = 'protected/video/a b~(1).mp4'
+        window_start = self.signer._window_start(self.NOW)
+
+        class FrozenDateTime(datetime.datetime):
+            @classmethod
+            def utcnow(cls):
+                return datetime.datetime.fromtimestamp(window_start, datetime.timezone.utc).replace(tzinfo=None)
+
+        with patch('botocore.auth.datetime.datetime', FrozenDateTime):
+            expected = r2_clients.get_client().generate_presigned_url(
+                'get_object',
+                Params={'Bucket': r2_settings.bucket_name, 'Key': key},
+                ExpiresIn=self.storage.querystring_expire + self.storage.url_window,
+            )
+        self.assertEqual(self.signer.url(key, now=self.NOW), expected)
+
+    def test_url_is_stable_within_window(self):
+        url = self.signer.url('protected/a.mp4', now=self.NOW)
+        window_start = self.signer._window_start(self.NOW)
+        self.assertEqual(self.signer.url('protected/a.mp4', now=window_start + self.storage.url_window - 1), url)
+        self.assertNotEqual(self.signer.url('protected/a.mp4', now=window_start + self.storage.url_window), url)
+
+    def test_storage_urls_batch_and_cache(self):
+        names = ['video/a.mp4', 'video/b.mp4', 'video/c.mp4']
+        with patch.object(PresignedUrlSigner, '_prepare', wraps=self.signer._prepare) as prepare, \
+                patch.object(PresignedUrlSigner, '_key_for', wraps=self.signer._key_for) as key_for:
+            urls = self.storage.urls(names)
+            self.assertEqual(prepare.call_count, 1)
+            self.assertEqual(key_for.call_count, 1)
+            # Повторно — из кэша окна, без подписи
+            self.assertEqual([self.storage.url(name) for name in names], urls)
+            self.assertEqual(prepare.call_count, 1)
+        self.assertTrue(urls[0].startswith('https://r2.example.com/test-bucket/protected/video/a.mp4?'))
+
+    def test_custom_parameters_use_botocore(self):
+        url = self.storage.url('video/a.mp4', parameters={'ResponseContentDisposition': 'attachment'})
+        self.assertIn('response-content-disposition=attachment', url)
+        self.assertIn('X-Amz-Expires=3600', url)
+
+
+class PublicUrlTest(TestCase):
+    def test_public_storage_uses_cdn_domain(self):
+        storage = MediaFileStorage(**{**settings.STORAGES['default']['OPTIONS'], 'public_domain': 'cdn.example.com'})
+        with patch.object(S3Storage, 'url', side_effect=AssertionError('botocore must not be used')), \
+                patch.object(PresignedUrlSigner, 'urls', side_effect=AssertionError('no signing for public files')):
+            self.assertEqual(storage.url('video/a b.mp4'), 'https://cdn.example.com/media/video/a%20b.mp4')
+            self.assertEqual(
+                storage.urls(['video/1.mp4', 'video/2.mp4']),
+                ['https://cdn.example.com/media/video/1.mp4', 'https://cdn.example.com/media/video/2.mp4']
+            )
+
+    def test_private_storage_is_still_signed(self):
+        storage = ProtectedMediaStorage(public_domain='cdn.example.com', **{
+            key: value for key, value in settings.STORAGES['default']['OPTIONS'].items() if key != 'default_acl'
+        })
+        self.assertIsNone(storage.public_url_prefix)
+        self.assertIn('X-Amz-Signature=', storage.url('video/a.mp4'))
+
+    def test_list_serializers_use_cdn_domain(self):
+        user = get_user_model().objects.create_user(phone_number='70000000000', password='pass')
+        media = MediaFiles.objects.create(
+            user=user, city='City', street='Street', description='', was_at_date='2025-03-28',
+            was_at_time='12:00:00', status='Waiting'
+        )
+        MediaFile.objects.create(media=media, video_file='video/clip.mp4')
+        with patch.object(storages['default'], 'public_url_prefix', 'https://cdn.example.com/media/'):
+            expected = 'https://cdn.example.com/media/video/clip.mp4'
+            self.assertEqual(MediaFilesSerializer(media).data['videos'][0]['video_file'], expected)
+            rows = list(MediaFiles.objects.values_list(*FastMediaFilesSerializer.values_fields, named=True))
+            self.assertEqual(FastMediaFilesSerializer(rows).data[0]['videos'][0]['video_file'], expected)
+
+
+class BatchUploadTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.media = MediaFiles.objects.create(
+            user=self.user,
+            city="City",
+            street="Street",
+            description="Test description",
+            was_at_date="2025-03-28",
+            was_at_time="12:00:00",
+            status="Waiting"
+        )
+
+    def test_batch_presign(self):
+        url = reverse('mediafiles-generate-upload-batch')
+        files = [
+            {'file_name': 'front.mp4'},
+            {'file_name': 'back.mov', 'content_type': 'video/quicktime'},
+        ]
+        # Один запрос к БД на всю пачку
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'media_id': self.media.id, 'files': files}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['uploads']
+        self.assertEqual([item['file_name'] for item in result], ['front.mp4', 'back.mov'])
+        for item in result:
+            self.assertTrue(item['file_key'].startswith('video/'))
+            self.assertTrue(item['file_key'].endswith(item['file_name']))
+            self.assertIn(item['file_key'], item['upload_url'])
+        self.assertNotEqual(result[0]['file_key'], result[1]['file_key'])
+
+    def test_batch_presign_validation(self):
+        url = reverse('mediafiles-generate-upload-batch')
+        response = self.client.post(url, {'media_id': self.media.id, 'files': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            url, {'media_id': self.media.id, 'files': [{'file_name': '../x.mp4'}]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {'media_id': 999999, 'files': [{'file_name': 'a.mp4'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_batch_confirm(self):
+        url = reverse('mediafiles-confirm-upload-batch')
+        keys = [f'video/{uuid.uuid4()}_clip{i}.mp4' for i in range(3)]
+        metadata = {
+            'size': 1024, 'etag': 'abc', 'content_type': 'video/mp4', 'uploaded_at': timezone.now(),
+        }
+        # SELECT exists + INSERT + UPDATE updated_at (+ savepoint); HEAD на каждый файл
+        with self.assertNumQueries(5), patch.object(uploads, 'head_object', return_value=metadata) as head:
+            response = self.client.post(url, {'media_id': self.media.id, 'file_keys': keys}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['ids']), 3)
+        self.assertEqual([call.args[0] for call in head.call_args_list], keys)
+        self.assertEqual(
+            list(MediaFile.objects.filter(media=self.media).order_by('id').values_list('video_file', 'size')),
+            [(key, 1024) for key in keys]
+        )
+        old_updated_at = self.media.updated_at
+        self.media.refresh_from_db()
+        self.assertGreater(self.media.updated_at, old_updated_at)
+
+    def test_batch_confirm_rejects_foreign_keys(self):
+        url = reverse('mediafiles-confirm-upload-batch')
+        for file_key in ('static/admin.css', 'video/../static/admin.css'):
+            response = self.client.post(url, {'media_id': self.media.id, 'file_keys': [file_key]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MediaFile.objects.exists())
+
+
+
+@skipIf(mock_aws is None, "moto не установлен")
+class MockR2Test(BaseAPITest):
+    """
+    Бакет R2 в памяти (moto) и заявка текущего пользователя.
+    """
+
+    def setUp(self):
+        super().setUp()
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        r2_clients.reset()
+        self.addCleanup(r2_clients.reset)
+        r2_clients.get_client().create_bucket(
+            Bucket=r2_settings.bucket_name, CreateBucketConfiguration={"LocationConstraint": "auto"}
+        )
+        self.media = MediaFiles.objects.create(
+            user=self.user,
+            city="City",
+            street="Street",
+            description="Test description",
+            was_at_date="2025-03-28",
+            was_at_time="12:00:00",
+            status="Waiting"
+        )
+
+    def put(self, file_key, body, content_type="video/mp4"):
+        r2_clients.get_client().put_object(
+            Bucket=r2_settings.bucket_name, Key='media/' + file_key, Body=body, ContentType=content_type
+        )
+
+
+class ConfirmUploadVerificationTest(MockR2Test):
+    def test_confirm_saves_metadata(self):
+        file_key = f'video/{uuid.uuid4()}_clip.mp4'
+        self.put(file_key, b"0123456789", content_type="video/quicktime")
+        response = self.client.post(
+            reverse('mediafiles-confirm-upload'), {'media_id': self.media.id, 'file_key': file_key}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        media_file = MediaFile.objects.get(id=response.data['id'])
+        self.assertEqual(media_file.video_file.name, file_key)
+        self.assertEqual(media_file.size, 10)
+        self.assertEqual(media_file.content_type, "video/quicktime")
+        self.assertTrue(media_file.etag)
+        self.assertIsNotNone(media_file.uploaded_at)
+
+        # Метаданные отдаются из БД, к хранилищу сериализаторы не обращаются
+        with patch.object(r2_clients.get_client(), 'head_object', side_effect=AssertionError):
+            video = MediaFilesSerializer(self.media).data['videos'][0]
+            fast = FastMediaFilesSerializer([
+                (self.media.id, self.user.id, 'City', 'Street', '', None, None, None, 'Waiting')
+            ]).data[0]['videos'][0]
+        self.assertEqual(video['size'], 10)
+        self.assertEqual(video['content_type'], "video/quicktime")
+        self.assertEqual(fast, dict(video))
+
+    def test_confirm_rejects_missing_object(self):
+        for url, payload in (
+            ('mediafiles-confirm-upload', {'file_key': 'video/missing.mp4'}),
+            ('mediafiles-confirm-upload-batch', {'file_keys': ['video/missing.mp4']}),
+        ):
+            response = self.client.post(reverse(url), {'media_id': self.media.id, **payload}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MediaFile.objects.exists())
+
+    @override_settings(MEDIA_MAX_UPLOAD_SIZE=4)
+    def test_confirm_rejects_oversized_object(self):
+        file_key = f'video/{uuid.uuid4()}_big.mp4'
+        self.put(file_key, b"0123456789")
+        response = self.client.post(
+            reverse('mediafiles-confirm-upload'), {'media_id': self.media.id, 'file_key': file_key}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(MediaFile.objects.exists())
+        self.assertIsNone(uploads.head_object(file_key))
+
+
+class MP4ProbeTest(TestCase):
+    def probe(self, data, chunk_size=mp4probe.CHUNK_SIZE):
+        reads = []
+
+        def read(offset, length):
+            reads.append((offset, length))
+            return data[offset:offset + length]
+
+        metadata, reader = mp4probe.probe(read, len(data), chunk_size)
+        return metadata, reads
+
+    def test_moov_at_start(self):
+        data = fake_mp4.make_mp4(duration=12.5, width=1920, height=1080, mdat_size=4 * 1024 * 1024)
+        metadata, reads = self.probe(data)
+        self.assertEqual(metadata, {'duration': 12.5, 'width': 1920, 'height': 1080, 'codec': 'avc1'})
+        self.assertEqual(reads, [(0, mp4probe.CHUNK_SIZE)])
+
+    def test_moov_at_end(self):
+        data = fake_mp4.make_mp4(duration=3, width=720, height=1280, mdat_size=4 * 1024 * 1024, moov_at_end=True)
+        metadata, reads = self.probe(data)
+        self.assertEqual(metadata, {'duration': 3.0, 'width': 720, 'height': 1280, 'codec': 'avc1'})
+        # Начало файла и хвост с moov; mdat не читается
+        self.assertEqual(len(reads), 2)
+        self.assertLess(sum(length for _, length in reads), 2 * mp4probe.CHUNK_SIZE)
+
+    def test_mov_with_64bit_sizes(self):
+        data = fake_mp4.make_mp4(
+            duration=61.25, codec=b"hvc1", brand=b"qt  ", version=1, large_mdat=True, moov_at_end=True
+        )
+        metadata, _ = self.probe(data)
+        self.assertEqual(metadata, {'duration': 61.25, 'width': 1280, 'height': 720, 'codec': 'hvc1'})
+
+    def test_moov_larger_than_chunk(self):
+        data = fake_mp4.make_mp4(mdat_size=1024, moov_at_end=True)
+        metadata, reads = self.probe(data, chunk_size=64)
+        self.assertEqual(metadata['codec'], 'avc1')
+        self.assertLessEqual(len(reads), 3)
+
+    def test_invalid_files(self):
+        for data in (b"not a video at all", b"\x00\x00\x00\x10ftypisom" + bytes(64)):
+            with self.assertRaises(mp4probe.ProbeError):
+                self.probe(data)
+        truncated = fake_mp4.make_mp4(mdat_size=1024)[:200]
+        with self.assertRaises(mp4probe.ProbeError):
+            self.probe(truncated)
+
+
+class MediaFileProbeTest(MockR2Test):
+    def upload(self, **kwargs):
+        file_key = f'video/{uuid.uuid4()}_clip.mp4'
+        self.put(file_key, fake_mp4.make_mp4(**kwargs))
+        return file_key
+
+    @override_settings(MEDIA_PROBE_MODE="sync")
+    def test_confirm_probes_video(self):
+        file_key = self.upload(duration=7.5, width=1080, height=1920, moov_at_end=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('mediafiles-confirm-upload'), {'media_id': self.media.id, 'file_key': file_key}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        media_file = MediaFile.objects.get(id=response.data['id'])
+        self.assertEqual((media_file.duration, media_file.width, media_file.height), (7.5, 1080, 1920))
+        self.assertEqual(media_file.codec, 'avc1')
+        self.assertIsNotNone(media_file.probed_at)
+
+    @override_settings(MEDIA_PROBE_MODE="worker")
+    def test_command_probes_pending_files(self):
+        good = MediaFile.objects.create(media=self.media, video_file=self.upload(duration=2))
+        bad_key = f'video/{uuid.uuid4()}_broken.mp4'
+        self.put(bad_key, b"broken")
+        bad = MediaFile.objects.create(media=self.media, video_file=bad_key)
+
+        out = io.StringIO()
+        call_command('probe_media_files', stdout=out)
+        self.assertIn('probed=1 failed=1', out.getvalue())
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.duration, 2.0)
+        self.assertIsNone(bad.duration)
+        self.assertIsNotNone(bad.probed_at)
+
+        # Повторно файлы не проверяются
+        out = io.StringIO()
+        call_command('probe_media_files', stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+    @override_settings(MEDIA_PROBE_MODE="worker")
+    def test_probe_invalidates_report_etag(self):
+        MediaFile.objects.create(media=self.media, video_file=self.upload(duration=4))
+        url = reverse('mediafiles-detail')
+        etag = self.client.get(url, {'id': self.media.id})['ETag']
+        mp4probe.probe_media_files()
+        response = self.client.get(url, {'id': self.media.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['videos'][0]['duration'], 4.0)
+
+
+class StreamingUploadTest(MockR2Test):
+    def object_body(self, name):
+        return r2_clients.get_client().get_object(Bucket=r2_settings.bucket_name, Key='media/' + name)['Body'].read()
+
+    def test_post_news_streams_files(self):
+        big = bytes(range(256)) * (9 * 1024 * 4)  # 9 МиБ — две части
+        files = [
+            SimpleUploadedFile('big.mp4', big, content_type='video/mp4'),
+            SimpleUploadedFile('small.mov', b'small', content_type='video/quicktime'),
+        ]
+        # Файлы не попадают ни в память, ни во временные файлы, и не загружаются повторно
+        with patch.object(MemoryFileUploadHandler, 'receive_data_chunk', side_effect=AssertionError), \
+                patch.object(TemporaryFileUploadHandler, 'new_file', side_effect=AssertionError), \
+                patch.object(S3Storage, '_save', side_effect=AssertionError):
+            response = self.client.post(
+                reverse('news-upload'), {'title': 'Title', 'text': 'Text', 'media': files}, format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        names = list(MediaFileNews.objects.order_by('id').values_list('video_file', flat=True))
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].startswith('video/') and names[0].endswith('_big.mp4'))
+        self.assertEqual(self.object_body(names[0]), big)
+        self.assertEqual(self.object_body(names[1]), b'small')
+        head = r2_clients.get_client().head_object(Bucket=r2_settings.bucket_name, Key='media/' + names[1])
+        self.assertEqual(head['ContentType'], 'video/quicktime')
+
+    def test_update_news_media_streams_file(self):
+        news = News.objects.create(title='Title', text='Text')
+        media = MediaFileNews.objects.create(news=news, video_file='video/old.mp4')
+        response = self.client.patch(
+            f"{reverse('news-img-update')}?id={media.id}",
+            {'video_file': SimpleUploadedFile('new.mp4', b'new video', content_type='video/mp4')},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        media.refresh_from_db()
+        self.assertTrue(media.video_file.name.endswith('_new.mp4'))
+        self.assertEqual(self.object_body(media.video_file.name), b'new video')
+
+    def test_rejected_request_discards_uploaded_files(self):
+        files = [SimpleUploadedFile('clip.mp4', b'video', content_type='video/mp4')]
+        response = self.client.post(
+            reverse('news-upload'), {'title': '', 'text': 'Text', 'media': files}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(
+            f"{reverse('news-img-update')}?id=999999",
+            {'video_file': SimpleUploadedFile('new.mp4', b'new video', content_type='video/mp4')},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        objects = r2_clients.get_client().list_objects_v2(Bucket=r2_settings.bucket_name)
+        self.assertEqual(objects.get('Contents', []), [])
+
+    def test_failed_upload_is_aborted(self):
+        files = [SimpleUploadedFile('big.mp4', b'x' * (9 * 1024 * 1024), content_type='video/mp4')]
+        with patch.object(StreamingUploadHandler, 'part_size', 5 * 1024 * 1024), \
+                patch.object(StreamingUploadHandler, 'file_complete', side_effect=RuntimeError('connection reset')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    reverse('news-upload'), {'title': 'Title', 'text': 'Text', 'media': files}, format='multipart'
+                )
+        uploads_in_progress = r2_clients.get_client().list_multipart_uploads(Bucket=r2_settings.bucket_name)
+        self.assertEqual(uploads_in_progress.get('Uploads', []), [])
+        self.assertFalse(MediaFileNews.objects.exists())
+
+
+class MultipartUploadTest(MockR2Test):
+    PART = b"x" * (5 * 1024 * 1024)
+
+    def create(self):
+        response = self.client.post(
+            reverse('mediafiles-multipart-create'),
+            {'media_id': self.media.id, 'file_name': 'long.mp4'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['file_key'], response.data['upload_id']
+
+    def upload(self, file_key, upload_id, part_numbers, body):
+        response = self.client.post(
+            reverse('mediafiles-multipart-part-urls'),
+            {'file_key': file_key, 'upload_id': upload_id, 'part_numbers': part_numbers},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for part in response.data['parts']:
+            self.assertEqual(requests.put(part['upload_url'], data=body).status_code, 200)
+
+    def test_resume_and_complete(self):
+        file_key, upload_id = self.create()
+        self.upload(file_key, upload_id, [1], self.PART)
+
+        # После обрыва клиент узнаёт, какие части уже в бакете, и докачивает остальные
+        response = self.client.get(
+            reverse('mediafiles-multipart-parts'), {'file_key': file_key, 'upload_id': upload_id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([part['part_number'] for part in response.data['parts']], [1])
+        self.assertEqual(response.data['parts'][0]['size'], len(self.PART))
+        self.upload(file_key, upload_id, [2], b"tail")
+
+        response = self.client.post(
+            reverse('mediafiles-multipart-complete'),
+            {'media_id': self.media.id, 'file_key': file_key, 'upload_id': upload_id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MediaFile.objects.get(id=response.data['id']).video_file.name, file_key)
+        head = r2_clients.get_client().head_object(Bucket=r2_settings.bucket_name, Key='media/' + file_key)
+        self.assertEqual(head['ContentLength'], len(self.PART) + 4)
+
+    def test_abort(self):
+        file_key, upload_id = self.create()
+        self.upload(file_key, upload_id, [1], self.PART)
+        payload = {'file_key': file_key, 'upload_id': upload_id}
+
+        response = self.client.post(reverse('mediafiles-multipart-abort'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(reverse('mediafiles-multipart-parts'), payload)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(
+            reverse('mediafiles-multipart-complete'), {**payload, 'media_id': self.media.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(MediaFile.objects.exists())
+
+    def test_validation(self):
+        response = self.client.post(
+            reverse('mediafiles-multipart-create'), {'media_id': 999999, 'file_name': 'a.mp4'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(
+            reverse('mediafiles-multipart-part-urls'),
+            {'file_key': 'static/admin.css', 'upload_id': 'x', 'part_numbers': [1]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            reverse('mediafiles-multipart-part-urls'),
+            {'file_key': 'video/a.mp4', 'upload_id': 'x', 'part_numbers': [0]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MetadataCacheTest(MockR2Test):
+    def setUp(self):
+        super().setUp()
+        self.storage = MediaFileStorage(**{**settings.STORAGES['default']['OPTIONS'], 'file_overwrite': False})
+        client = self.storage.connection.meta.client
+        patcher = patch.object(client, 'head_object', wraps=client.head_object)
+        self.head_object = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_head_per_object(self):
+        self.put('video/a.mp4', b"0123456789")
+        self.assertTrue(self.storage.exists('video/a.mp4'))
+        self.assertEqual(self.storage.size('video/a.mp4'), 10)
+        self.assertIsNotNone(self.storage.get_modified_time('video/a.mp4'))
+        self.assertEqual(self.head_object.call_count, 1)
+        self.assertEqual(self.storage.metadata_stats, {'hits': 2, 'misses': 1})
+
+    def test_save_and_delete_update_cache(self):
+        name = self.storage.save('video/b.mp4', io.BytesIO(b"abc"))
+        # Проверка имени на коллизию перед save() — отсутствующие объекты не кэшируются
+        self.assertEqual(self.head_object.call_count, 1)
+        self.head_object.reset_mock()
+        self.assertEqual(self.storage.size(name), 3)
+        self.assertEqual(self.head_object.call_count, 0)
+        # Время изменения после save() неизвестно — один HEAD
+        self.storage.get_modified_time(name)
+        self.assertEqual(self.head_object.call_count, 1)
+
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.size(name)
+
+    def test_missing_objects_are_not_cached(self):
+        self.assertFalse(self.storage.exists('video/c.mp4'))
+        # Клиент загрузил файл напрямую по presigned URL
+        self.put('video/c.mp4', b"c")
+        self.assertTrue(self.storage.exists('video/c.mp4'))
+
+    def test_lru_and_ttl_bounds(self):
+        self.storage.metadata_cache_size = 2
+        for name in ('video/1.mp4', 'video/2.mp4', 'video/3.mp4'):
+            self.put(name, b"x")
+            self.storage.size(name)
+        self.assertEqual(list(self.storage._metadata_cache), ['video/2.mp4', 'video/3.mp4'])
+
+        self.storage.metadata_cache_ttl = 0
+        self.storage._metadata_cache.clear()
+        self.storage.size('video/1.mp4')
+        self.storage.size('video/1.mp4')
+        self.assertEqual(self.storage.metadata_stats['hits'], 0)
+
+    def test_overwriting_storage_skips_exists_check(self):
+        storage = MediaFileStorage(**settings.STORAGES['default']['OPTIONS'])
+        self.assertTrue(storage.file_overwrite)
+        self.put('video/d.mp4', b"d")
+        self.assertFalse(storage.exists('video/d.mp4'))
+        self.assertEqual(self.head_object.call_count, 0)
+
+    def test_request_counters(self):
+        self.put('video/e.mp4', b"e")
+
+        def view(request):
+            self.storage.size('video/e.mp4')
+            self.storage.size('video/e.mp4')
+            return HttpResponse()
+
+        response = MetadataCacheStatsMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(response['X-Storage-Metadata-Cache'], 'hits=1, misses=1')
+        self.assertFalse(MetadataCacheStatsMiddleware(lambda request: HttpResponse())(
+            RequestFactory().get('/')
+        ).has_header('X-Storage-Metadata-Cache'))
+
+
+LOCAL_STORAGES = {
+    "default": {"BACKEND": "helpers.storages.filesystem.MediaFileStorage"},
+    "staticfiles": {"BACKEND": "helpers.storages.filesystem.StaticFileStorage"},
+    "protected": {"BACKEND": "helpers.storages.filesystem.ProtectedMediaStorage"},
+}
+
+# URLconf для LocalStorageTest: в mobile_prj/urls.py маршрут локальных
+# хранилищ подключается только при STORAGE_BACKEND = "local"
+urlpatterns = [
+    path('api/v1/', include('mobile_rest.urls')),
+    path('local-storage/', include('helpers.storages.urls')),
+]
+
+
+class LocalStorageTest(BaseAPITest):
+    """
+    Локальные двойники хранилищ R2 (STORAGE_BACKEND = "local").
+    """
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        override = override_settings(
+            STORAGES=LOCAL_STORAGES, LOCAL_STORAGE_ROOT=root.name, ROOT_URLCONF='mobile_rest.tests'
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.media = MediaFiles.objects.create(
+            user=self.user, city="City", street="Street", description="", was_at_date="2025-03-28",
+            was_at_time="12:00:00", status="Waiting"
+        )
+
+    def upload(self, body, file_name='clip.mp4'):
+        response = self.client.post(
+            reverse('mediafiles-generate-upload'),
+            {'media_id': self.media.id, 'file_name': file_name, 'content_type': 'video/mp4'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_put = self.client.generic('PUT', response.data['upload_url'], body, content_type='video/mp4')
+        self.assertEqual(response_put.status_code, status.HTTP_200_OK)
+        return response.data['file_key']
+
+    def test_acl_matches_r2_storages(self):
+        self.assertEqual(storages['default'].default_acl, 'public-read')
+        self.assertEqual(storages['staticfiles'].default_acl, 'public-read')
+        self.assertEqual(storages['protected'].default_acl, 'private')
+
+    def test_presigned_put_and_confirm(self):
+        file_key = self.upload(b"0123456789")
+        self.assertTrue(default_storage.exists(file_key))
+        response = self.client.post(
+            reverse('mediafiles-confirm-upload'), {'media_id': self.media.id, 'file_key': file_key}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        media_file = MediaFile.objects.get(id=response.data['id'])
+        self.assertEqual((media_file.size, media_file.content_type), (10, 'video/mp4'))
+
+        url = media_file.video_file.url
+        self.assertEqual(url, f'/local-storage/media/{file_key}')
+        self.assertEqual(b''.join(self.client.get(url).streaming_content), b"0123456789")
+
+    def test_put_requires_signature(self):
+        url = default_storage.presigned_put_url('video/a.mp4')
+        for bad_url in (url.split('?')[0], url[:-1] + ('0' if url[-1] != '0' else '1')):
+            response = self.client.generic('PUT', bad_url, b"data", content_type='video/mp4')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(default_storage.exists('video/a.mp4'))
+
+    def test_private_files_need_signed_url(self):
+        storage = storages['protected']
+        storage.save('docs/a.txt', io.BytesIO(b"secret"))
+        url = storage.url('docs/a.txt')
+        self.assertIn('signature=', url)
+        self.assertEqual(b''.join(self.client.get(url).streaming_content), b"secret")
+        self.assertEqual(self.client.get(url.split('?')[0]).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url.replace('a.txt', 'b.txt')).status_code, status.HTTP_403_FORBIDDEN)
+        expired = storage.signed_url('docs/a.txt', now=time.time() - 2 * storage.querystring_expire)
+        self.assertEqual(self.client.get(expired).status_code, status.HTTP_403_FORBIDDEN)
+        # В пределах окна URL не меняется
+        self.assertEqual(storage.url('docs/a.txt'), url)
+
+    def test_range_requests(self):
+        default_storage.save('video/r.mp4', io.BytesIO(b"0123456789"))
+        url = default_storage.url('video/r.mp4')
+        for header, expected, content_range in (
+            ('bytes=2-5', b"2345", 'bytes 2-5/10'),
+            ('bytes=7-', b"789", 'bytes 7-9/10'),
+            ('bytes=-3', b"789", 'bytes 7-9/10'),
+        ):
+            response = self.client.get(url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+            self.assertEqual(b''.join(response.streaming_content), expected)
+            self.assertEqual(response['Content-Range'], content_range)
+        response = self.client.get(url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(self.client.head(url)['Content-Length'], '10')
+        self.assertEqual(uploads.read_range('video/r.mp4', 3, 4), b"3456")
+
+    def test_multipart_requires_r2(self):
+        # Вместо 500 из-за обращения к R2 — понятный отказ
+        upload = {'file_key': 'video/a.mp4', 'upload_id': 'upload-1'}
+        for method, name, data in (
+            ('post', 'mediafiles-multipart-create', {'media_id': self.media.id, 'file_name': 'a.mp4', 'content_type': 'video/mp4'}),
+            ('post', 'mediafiles-multipart-part-urls', {**upload, 'part_numbers': [1]}),
+            ('get', 'mediafiles-multipart-parts', upload),
+            ('post', 'mediafiles-multipart-complete', {**upload, 'media_id': self.media.id}),
+            ('post', 'mediafiles-multipart-abort', upload),
+        ):
+            with self.subTest(name):
+                response = getattr(self.client, method)(reverse(name), data, format='json' if method == 'post' else None)
+                self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+                self.assertIn('R2', response.data['error'])
+
+    @override_settings(MEDIA_PROBE_MODE="sync")
+    def test_probe_reads_local_files(self):
+        file_key = self.upload(fake_mp4.make_mp4(duration=3.0, width=640, height=360, moov_at_end=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('mediafiles-confirm-upload'), {'media_id': self.media.id, 'file_key': file_key}, format='json'
+            )
+        media_file = MediaFile.objects.get(id=response.data['id'])
+        self.assertEqual((media_file.duration, media_file.width, media_file.height), (3.0, 640, 360))
+
+
+class LocalStorageRouteTest(BaseAPITest):
+    def test_no_local_storage_with_r2(self):
+        # С R2 локальные хранилища недоступны: ни маршрута, ни хранилища для ключа
+        self.assertEqual(storage_for_key('protected/a.txt'), (None, None))
+        self.assertEqual(storage_for_key('media/video/a.mp4'), (None, None))
+        self.client.logout()
+        response = self.client.generic(
+            'PUT', '/local-storage/protected/a.txt?expires=9999999999&signature=x', b"data",
+            content_type='text/plain'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 # ---------------------------------------------------------
 #   MEDIA FILES DETAIL
 # ---------------------------------------------------------
@@ -230,7 +1292,9 @@ class MediaFilesListViewTest(BaseAPITest):
         """Получение записей только для пользователя."""
         response = self.client.get(self.url, {'type': 'user', 'limit': '5'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNone(response.data['prev'])
 
     def test_get_list_all_empty(self):
         """
@@ -245,6 +1309,112 @@ class MediaFilesListViewTest(BaseAPITest):
         response = self.client.get(self.url, {}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_get_list_invalid_cursor(self):
+        response = self.client.get(self.url, {'type': 'all', 'limit': '5', 'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MediaFilesCursorPaginationTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('mediafiles-list')
+        self.other_user = User.objects.create_user(phone_number='555000111', password='pass')
+        for i in range(7):
+            MediaFiles.objects.create(
+                user=self.user if i % 2 == 0 else self.other_user,
+                city=f'City{i}',
+                street='Street',
+                description='Desc',
+                was_at_date='2025-01-03',
+                was_at_time='12:00:00'
+            )
+        # Одинаковое время загрузки: порядок должен определяться id
+        MediaFiles.objects.filter(id__in=MediaFiles.objects.order_by('id').values('id')[2:5]).update(
+            uploaded_at=MediaFiles.objects.order_by('id')[2].uploaded_at
+        )
+        self.expected_all = list(MediaFiles.objects.order_by('-uploaded_at', '-id').values_list('id', flat=True))
+
+    def _ids(self, response):
+        return [item['id'] for item in response.data['results']]
+
+    def test_walk_forward_and_back(self):
+        response = self.client.get(self.url, {'type': 'all', 'limit': '3'})
+        pages = [self._ids(response)]
+        self.assertIsNone(response.data['prev'])
+        while response.data['next']:
+            response = self.client.get(self.url, {'type': 'all', 'limit': '3', 'cursor': response.data['next']})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(self._ids(response))
+        self.assertEqual([i for page in pages for i in page], self.expected_all)
+        self.assertEqual(len(pages), 3)
+
+        # Возвращаемся назад от последней страницы
+        response = self.client.get(self.url, {'type': 'all', 'limit': '3', 'cursor': response.data['prev']})
+        self.assertEqual(self._ids(response), pages[1])
+        response = self.client.get(self.url, {'type': 'all', 'limit': '3', 'cursor': response.data['prev']})
+        self.assertEqual(self._ids(response), pages[0])
+        self.assertIsNone(response.data['prev'])
+
+    def test_user_filter_with_cursor(self):
+        expected = list(
+            MediaFiles.objects.filter(user=self.user).order_by('-uploaded_at', '-id').values_list('id', flat=True)
+        )
+        response = self.client.get(self.url, {'type': 'user', 'limit': '2'})
+        ids = self._ids(response)
+        response = self.client.get(self.url, {'type': 'user', 'limit': '2', 'cursor': response.data['next']})
+        ids += self._ids(response)
+        self.assertEqual(ids, expected)
+        self.assertIsNone(response.data['next'])
+
+    def test_deep_page_query_count(self):
+        response = self.client.get(self.url, {'type': 'all', 'limit': '2'})
+        cursor = response.data['next']
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'type': 'all', 'limit': '2', 'cursor': cursor})
+
+
+class MediaFilesQueryCountTest(BaseAPITest):
+    """
+    Количество запросов к БД не должно зависеть от числа записей и видео.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse('mediafiles-list')
+        self.detail_url = reverse('mediafiles-detail')
+
+    def _create_reports(self, count, videos_per_report=2):
+        for i in range(count):
+            report = MediaFiles.objects.create(
+                user=self.user,
+                city=f'City{i}',
+                street='Street',
+                description='Desc',
+                was_at_date='2025-01-03',
+                was_at_time='12:00:00'
+            )
+            for j in range(videos_per_report):
+                MediaFile.objects.create(media=report, video_file=f'video/{i}_{j}.mp4')
+
+    def test_list_query_count_is_constant(self):
+        self._create_reports(3)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'type': 'all', 'limit': '500'})
+        self.assertEqual(len(response.data['results']), 3)
+
+        self._create_reports(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'type': 'all', 'limit': '500'})
+        self.assertEqual(len(response.data['results']), 23)
+        self.assertEqual(len(response.data['results'][0]['videos']), 2)
+
+    def test_detail_query_count(self):
+        self._create_reports(1, videos_per_report=5)
+        report = MediaFiles.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url, {'id': report.id})
+        self.assertEqual(len(response.data['videos']), 5)
+
 
 # ---------------------------------------------------------
 #   NEWS: CREATE, GET LIST, GET DETAIL
@@ -296,12 +1466,291 @@ class GetNewsListViewTest(BaseAPITest):
     def test_get_news_list_success(self):
         response = self.client.get(self.url, {'limit': '5'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
+        # Сначала свежие новости
+        self.assertEqual([n['id'] for n in response.data['results']], [self.news2.id, self.news1.id])
 
     def test_get_news_list_no_limit(self):
         response = self.client.get(self.url, {}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_get_news_list_pages(self):
+        news3 = News.objects.create(title='News3', text='Text3')
+        response = self.client.get(self.url, {'limit': '2'})
+        self.assertEqual([n['id'] for n in response.data['results']], [news3.id, self.news2.id])
+        self.assertIsNone(response.data['prev'])
+
+        response = self.client.get(self.url, {'limit': '2', 'cursor': response.data['next']})
+        self.assertEqual([n['id'] for n in response.data['results']], [self.news1.id])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(self.url, {'limit': '2', 'cursor': response.data['prev']})
+        self.assertEqual([n['id'] for n in response.data['results']], [news3.id, self.news2.id])
+
+    def test_get_news_list_since(self):
+        response = self.client.get(self.url, {'limit': '5', 'since': self.news1.created_at.isoformat()})
+        self.assertEqual([n['id'] for n in response.data['results']], [self.news2.id])
+
+        response = self.client.get(self.url, {'limit': '5', 'since': self.news2.created_at.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_get_news_list_invalid_since(self):
+        response = self.client.get(self.url, {'limit': '5', 'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NewsQueryCountTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse('news-list')
+        self.detail_url = reverse('news-detail')
+
+    def _create_news(self, count, media_per_news=2):
+        for i in range(count):
+            news = News.objects.create(title=f'News{i}', text='Text')
+            for j in range(media_per_news):
+                MediaFileNews.objects.create(news=news, video_file=f'video/news_{i}_{j}.mp4')
+
+    def test_list_query_count_is_constant(self):
+        self._create_news(3)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'limit': '100'})
+        self.assertEqual(len(response.data['results']), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_news(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'limit': '100'})
+        self.assertEqual(len(response.data['results']), 23)
+        self.assertEqual(len(response.data['results'][0]['media']), 2)
+
+    def test_detail_query_count(self):
+        self._create_news(1, media_per_news=4)
+        news = News.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url, {'id': news.id})
+        self.assertEqual(len(response.data['media']), 4)
+
+
+class NewsCacheTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.detail_url = reverse('news-detail')
+        self.list_url = reverse('news-list')
+        self.news = News.objects.create(title='Cached', text='Text')
+        MediaFileNews.objects.create(news=self.news, video_file='video/cached.mp4')
+
+    def test_detail_served_from_cache(self):
+        first = self.client.get(self.detail_url, {'id': self.news.id})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.detail_url, {'id': self.news.id})
+        self.assertEqual(first.data, second.data)
+
+    def test_list_served_from_cache(self):
+        first = self.client.get(self.list_url, {'limit': '10'})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, {'limit': '10'})
+        self.assertEqual(first.data, second.data)
+
+    def test_update_invalidates_detail_and_list(self):
+        self.client.get(self.detail_url, {'id': self.news.id})
+        self.client.get(self.list_url, {'limit': '10'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse('news-update') + f'?id={self.news.id}', {'title': 'Updated'}, format='multipart')
+
+        response = self.client.get(self.detail_url, {'id': self.news.id})
+        self.assertEqual(response.data['title'], 'Updated')
+        response = self.client.get(self.list_url, {'limit': '10'})
+        self.assertEqual(response.data['results'][0]['title'], 'Updated')
+
+    def test_delete_invalidates_detail(self):
+        self.client.get(self.detail_url, {'id': self.news.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('news-delete') + f'?id={self.news.id}')
+        response = self.client.get(self.detail_url, {'id': self.news.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_media_delete_invalidates_detail(self):
+        self.client.get(self.detail_url, {'id': self.news.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            MediaFileNews.objects.filter(news=self.news).delete()
+        response = self.client.get(self.detail_url, {'id': self.news.id})
+        self.assertEqual(response.data['media'], [])
+
+    def test_stats(self):
+        self.client.get(self.detail_url, {'id': self.news.id})
+        self.client.get(self.detail_url, {'id': self.news.id})
+        self.client.get(self.list_url, {'limit': '10'})
+
+        url = reverse('news-cache-stats')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['detail'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertEqual(response.data['list']['misses'], 1)
+
+
+class ConditionalGetTest(BaseAPITest):
+    """
+    ETag / Last-Modified для news/detail/, news/list/ и mediafiles/detail/.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.news = News.objects.create(title='Etag', text='Text')
+        MediaFileNews.objects.create(news=self.news, video_file='video/etag.mp4')
+        self.report = MediaFiles.objects.create(
+            user=self.user,
+            city='City',
+            street='Street',
+            description='Desc',
+            was_at_date='2025-01-03',
+            was_at_time='12:00:00'
+        )
+        MediaFile.objects.create(media=self.report, video_file='video/report.mp4')
+
+    def test_media_detail_not_modified(self):
+        url = reverse('mediafiles-detail')
+        response = self.client.get(url, {'id': self.report.id})
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+        # 304 без загрузки видео и сериализации — только запрос самой записи
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'id': self.report.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, {'id': self.report.id}, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_media_detail_etag_changes_with_videos(self):
+        url = reverse('mediafiles-detail')
+        etag = self.client.get(url, {'id': self.report.id})['ETag']
+        MediaFile.objects.create(media=self.report, video_file='video/report2.mp4')
+        response = self.client.get(url, {'id': self.report.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['videos']), 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_news_detail_not_modified(self):
+        url = reverse('news-detail')
+        etag = self.client.get(url, {'id': self.news.id})['ETag']
+
+        # Повтор из кэша: 304 без запросов к БД
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'id': self.news.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Без кэша: 304 после одного запроса, без загрузки медиа
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'id': self.news.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_news_detail_etag_changes_on_update(self):
+        url = reverse('news-detail')
+        etag = self.client.get(url, {'id': self.news.id})['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse('news-update') + f'?id={self.news.id}', {'title': 'New'}, format='multipart')
+        response = self.client.get(url, {'id': self.news.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'New')
+
+    def test_signed_urls_renew_validators(self):
+        # В ответах подписанные URL: в следующем периоде их действия копия клиента устаревает
+        next_period = time.time() + storages['default'].querystring_expire
+        for url, record_id in ((reverse('news-detail'), self.news.id), (reverse('mediafiles-detail'), self.report.id)):
+            response = self.client.get(url, {'id': record_id})
+            etag, last_modified = response['ETag'], response['Last-Modified']
+            with patch('mobile_rest.conditional.time') as clock:
+                clock.time.return_value = next_period
+                response = self.client.get(url, {'id': record_id}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response['ETag'], etag)
+                response = self.client.get(url, {'id': record_id}, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unsigned_urls_keep_validators(self):
+        url = reverse('news-detail')
+        with patch.object(storages['default'], 'public_url_prefix', 'https://cdn.example.com/media/'):
+            etag = self.client.get(url, {'id': self.news.id})['ETag']
+            with patch('mobile_rest.conditional.time') as clock:
+                clock.time.return_value = time.time() + storages['default'].querystring_expire
+                response = self.client.get(url, {'id': self.news.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_news_list_not_modified(self):
+        url = reverse('news-list')
+        etag = self.client.get(url, {'limit': '10'})['ETag']
+        response = self.client.get(url, {'limit': '10'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'limit': '10'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        News.objects.create(title='Another', text='Text')
+        cache.clear()
+        response = self.client.get(url, {'limit': '10'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+# Подписанные URL меняются на границе окна подписи, поэтому для сравнения фиксируем окно
+@patch('helpers.cloudflare.signing.PresignedUrlSigner._window_start', lambda self, now: 1760000000)
+class FastSerializerTest(TestCase):
+    """
+    Быстрый путь для списков должен давать тот же JSON, что и ModelSerializer.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='123456789', password='pass')
+        for i in range(5):
+            report = MediaFiles.objects.create(
+                user=self.user,
+                city=f'Город {i}',
+                street='Street "quoted"',
+                description='Описание\nв две строки',
+                was_at_date='2025-01-03',
+                was_at_time='12:00:00.250000' if i % 2 else '23:59:59',
+                status='Done' if i % 2 else 'Waiting'
+            )
+            for j in range(i % 3):
+                MediaFile.objects.create(media=report, video_file=f'video/{i}_{j}.mp4')
+            MediaFile.objects.create(media=report, video_file=None)
+
+            news = News.objects.create(title=f'Новость {i}', text={'blocks': [{'type': 'p', 'text': f'Текст {i}'}], 'n': i})
+            for j in range(i % 3):
+                MediaFileNews.objects.create(news=news, video_file=f'video/news_{i}_{j}.mp4')
+
+    def test_media_files_identical_json(self):
+        qs = MediaFiles.objects.order_by('-uploaded_at', '-id')
+        expected = JSONRenderer().render(MediaFilesSerializer(qs.with_videos(), many=True).data)
+        fast = JSONRenderer().render(
+            FastMediaFilesSerializer(list(qs.values_list(*FastMediaFilesSerializer.values_fields, named=True))).data
+        )
+        self.assertEqual(fast, expected)
+
+    def test_news_identical_json(self):
+        expected = JSONRenderer().render(NewsSerializer(News.objects.with_media(), many=True).data)
+        fast = JSONRenderer().render(
+            FastNewsSerializer(list(News.objects.values_list(*FastNewsSerializer.values_fields, named=True))).data
+        )
+        self.assertEqual(fast, expected)
+
+    def test_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(FastNewsSerializer([]).data, [])
+
 
 # ---------------------------------------------------------
 #   NEWS: UPDATE & DELETE
@@ -378,13 +1827,22 @@ class RequestPasswordResetViewTest(APITestCase):
             password='old_password'
         )
 
-    @patch('mobile_rest.views.send_verification_code', return_value={'status': 'pending'})
+    @patch('mobile_rest.views.send_verification_code', return_value={'status': 'success'})
     def test_request_reset_success(self, mock_send):
         data = {"phone_number": self.existing_user.phone_number}
         response = self.client.post(self.url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        mock_send.assert_called_once_with(self.existing_user.phone_number)
+        # Отправленный код выдан в хранилище кодов и принимается при подтверждении
+        phone_number, code = mock_send.call_args.args
+        self.assertEqual(phone_number, self.existing_user.phone_number)
+        self.assertTrue(get_code_store().consume(phone_number, code))
+
+    @patch('mobile_rest.views.send_verification_code', return_value={'status': 'error', 'message': 'Ошибка SMS'})
+    def test_request_reset_sms_error(self, mock_send):
+        response = self.client.post(self.url, {"phone_number": self.existing_user.phone_number}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data['message'], 'Ошибка SMS')
 
     def test_request_reset_no_phone(self):
         response = self.client.post(self.url, {}, format='json')
@@ -419,8 +1877,8 @@ class ConfirmPasswordResetViewTest(APITestCase):
             password='old_password'
         )
 
-    @patch('mobile_rest.views.check_verification_code', return_value=True)
-    def test_confirm_reset_success(self, mock_check):
+    def test_confirm_reset_success(self):
+        get_code_store().issue(self.existing_user.phone_number, "123456")
         data = {
             "phone_number": self.existing_user.phone_number,
             "code": "123456",
@@ -432,7 +1890,10 @@ class ConfirmPasswordResetViewTest(APITestCase):
         self.existing_user.refresh_from_db()
         self.assertTrue(self.existing_user.check_password("new_secure_password"))
 
-        mock_check.assert_called_once_with(self.existing_user.phone_number, "123456")
+        # Код одноразовый
+        data["new_password"] = "another_password"
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_confirm_reset_no_fields(self):
         response = self.client.post(self.url, {}, format='json')
@@ -449,8 +1910,8 @@ class ConfirmPasswordResetViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn('error', response.data)
 
-    @patch('mobile_rest.views.check_verification_code', return_value=False)
-    def test_confirm_reset_wrong_code(self, mock_check):
+    def test_confirm_reset_wrong_code(self):
+        get_code_store().issue(self.existing_user.phone_number, "123456")
         data = {
             "phone_number": self.existing_user.phone_number,
             "code": "wrong_code",
@@ -460,9 +1921,11 @@ class ConfirmPasswordResetViewTest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
-        mock_check.assert_called_once_with(self.existing_user.phone_number, "wrong_code")
+        self.existing_user.refresh_from_db()
+        self.assertTrue(self.existing_user.check_password("old_password"))
 
 
+@override_settings(NOTIFICATION_DISPATCH_MODE="sync")
 class MediaFilesNotificationTest(TestCase):
     def setUp(self):
         self.user = User.objects.create(phone_number="1234567890", full_name="Test User")
@@ -478,20 +1941,467 @@ class MediaFilesNotificationTest(TestCase):
             status="Waiting"
         )
 
-    @patch("firebase_admin.messaging.send_multicast")
+    @patch("firebase_admin.messaging.send_each")
     def test_status_done_notification(self, mock_send):
-        # Обновляем статус на "Done" и проверяем, что send_multicast вызывается пользователя
+        # Обновляем статус на "Done" и проверяем, что send_each вызывается для пользователя
         self.media_file.status = "Done"
-        self.media_file.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.save()
         self.assertTrue(mock_send.called)
         self.assertEqual(mock_send.call_count, 1)
 
-    @patch("firebase_admin.messaging.send_multicast")
+    @patch("firebase_admin.messaging.send_each")
     def test_status_fail_notification(self, mock_send):
         # Устанавливаем дополнительные данные для ошибки и обновляем статус на "Fail"
         self.media_file.error_code = "ERR001"
         self.media_file.error_text = "Ошибка загрузки файла"
         self.media_file.status = "Fail"
-        self.media_file.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.save()
         self.assertTrue(mock_send.called)
         self.assertEqual(mock_send.call_count, 1)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_status_change_without_extra_select(self, mock_send):
+        media_file = MediaFiles.objects.get(pk=self.media_file.pk)
+        media_file.status = "Processing"
+        # Только UPDATE: старый статус берётся из снимка, сделанного при загрузке
+        with self.assertNumQueries(1):
+            media_file.save()
+        self.assertFalse(mock_send.called)
+
+        media_file.status = "Done"
+        with self.captureOnCommitCallbacks(execute=True):
+            media_file.save()
+        self.assertEqual(mock_send.call_count, 1)
+
+        # Повторное сохранение без смены статуса уведомление не отправляет
+        with self.captureOnCommitCallbacks(execute=True):
+            media_file.save()
+        self.assertEqual(mock_send.call_count, 1)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_deferred_status_falls_back_to_db(self, mock_send):
+        media_file = MediaFiles.objects.only("id", "user_id").get(pk=self.media_file.pk)
+        media_file.status = "Done"
+        with self.captureOnCommitCallbacks(execute=True):
+            media_file.save()
+        self.assertEqual(mock_send.call_count, 1)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_refresh_from_db_keeps_unsaved_change(self, mock_send):
+        self.media_file.status = "Done"
+        self.media_file.refresh_from_db(fields=["updated_at"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.save()
+        self.assertEqual(mock_send.call_count, 1)
+
+    @patch("firebase_admin.messaging.send_each")
+    def test_bulk_update_status_triggers_hooks(self, mock_send):
+        other = MediaFiles.objects.create(
+            user=self.user,
+            city="City",
+            street="Street",
+            description="Other",
+            was_at_date="2025-03-28",
+            was_at_time="12:00:00",
+            status="Done"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = MediaFiles.objects.filter(pk__in=[self.media_file.pk, other.pk]).update_status(
+                "Fail", error_code="ERR002", error_text="Нечитаемый номер"
+            )
+        self.assertCountEqual([m.pk for m in changed], [self.media_file.pk, other.pk])
+        self.assertEqual(mock_send.call_count, 2)
+        message = mock_send.call_args[0][0][0]
+        self.assertEqual(message.data["error_code"], "ERR002")
+        self.assertEqual(set(MediaFiles.objects.values_list("status", flat=True)), {"Fail"})
+
+        # Записи уже в целевом статусе не изменяются и хуки не вызывают
+        self.assertEqual(MediaFiles.objects.all().update_status("Fail"), [])
+        self.assertEqual(mock_send.call_count, 2)
+
+
+@override_settings(NOTIFICATION_DISPATCH_MODE="sync", FCM_MESSAGING_BACKEND="mobile_rest.fake_messaging")
+class NotificationOutboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        fake_messaging.reset()
+        self.user = User.objects.create(phone_number="1234567890", full_name="Test User")
+        FCMDevice.objects.create(user=self.user, registration_id="token_a", type="android")
+        FCMDevice.objects.create(user=self.user, registration_id="token_b", type="ios")
+        self.media_file = MediaFiles.objects.create(
+            user=self.user,
+            city="City",
+            street="Street",
+            description="Test description",
+            was_at_date="2025-03-28",
+            was_at_time="12:00:00",
+            status="Waiting"
+        )
+
+    def test_sent_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.media_file.status = "Done"
+            self.media_file.save()
+            # Внутри транзакции ничего не отправлено, запись уже в outbox
+            self.assertEqual(fake_messaging.sent, [])
+            self.assertEqual(NotificationOutbox.objects.get().status, NotificationOutbox.PENDING)
+        for callback in callbacks:
+            callback()
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.SENT)
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(fake_messaging.batches, [2])
+        self.assertEqual([message.token for message in fake_messaging.sent], ["token_a", "token_b"])
+        self.assertEqual(fake_messaging.sent[0].data, {"id": str(self.media_file.id)})
+
+    def test_rolled_back_save_sends_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.media_file.status = "Done"
+                    self.media_file.save()
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertEqual(fake_messaging.sent, [])
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_retry_with_backoff_then_worker_delivers(self):
+        fake_messaging.fail_next.append(RuntimeError("FCM unavailable"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Done"
+            self.media_file.save()
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.PENDING)
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(entry.last_error, "FCM unavailable")
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+        # Пока не наступило время повтора, воркер запись не трогает
+        call_command("dispatch_notifications", "--once", stdout=io.StringIO())
+        self.assertEqual(fake_messaging.sent, [])
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        call_command("dispatch_notifications", "--once", stdout=io.StringIO())
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.SENT)
+        self.assertEqual(entry.attempts, 2)
+        self.assertEqual(fake_messaging.batches, [2])
+
+    def test_retry_skips_delivered_tokens(self):
+        # Первая пачка (token_a) ушла, вторая (token_b) — нет
+        fake_messaging.fail_next.extend([None, RuntimeError("FCM unavailable")])
+        with patch.object(outbox, 'FCM_BATCH_SIZE', 1):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.media_file.status = "Done"
+                self.media_file.save()
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.PENDING)
+        self.assertEqual(entry.delivered_tokens, ["token_a"])
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.dispatch()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.SENT)
+        self.assertEqual([message.token for message in fake_messaging.sent], ["token_a", "token_b"])
+
+    def test_transient_token_error_is_retried(self):
+        fake_messaging.failing_tokens["token_b"] = firebase_exceptions.UnavailableError("try later")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Done"
+            self.media_file.save()
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.PENDING)
+        self.assertEqual(entry.last_error, "try later")
+
+        fake_messaging.failing_tokens.clear()
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.dispatch()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.SENT)
+        self.assertEqual(fake_messaging.batches, [2, 1])
+        self.assertEqual([message.token for message in fake_messaging.sent], ["token_a", "token_b"])
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        fake_messaging.fail_next.extend([RuntimeError("down"), RuntimeError("still down")])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Done"
+            self.media_file.save()
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        outbox.dispatch()
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.FAILED)
+        self.assertEqual(entry.attempts, 2)
+
+    @override_settings(NOTIFICATION_DISPATCH_MODE="worker")
+    def test_worker_mode_leaves_dispatch_to_command(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Fail"
+            self.media_file.save()
+        self.assertEqual(fake_messaging.sent, [])
+
+        call_command("dispatch_notifications", "--once", "--batch-size", "10", stdout=io.StringIO())
+        self.assertEqual(fake_messaging.batches, [2])
+        self.assertEqual(NotificationOutbox.objects.get().status, NotificationOutbox.SENT)
+
+    def test_dead_tokens_pruned(self):
+        FCMDevice.objects.create(user=self.user, registration_id="token_c", type="android")
+        fake_messaging.unregistered("token_a")
+        fake_messaging.invalid("token_b")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Done"
+            self.media_file.save()
+
+        # Ошибки отдельных токенов не мешают доставке на остальные устройства
+        self.assertEqual(NotificationOutbox.objects.get().status, NotificationOutbox.SENT)
+        self.assertEqual([message.token for message in fake_messaging.sent], ["token_c"])
+        self.assertEqual(
+            list(FCMDevice.objects.values_list("registration_id", flat=True)), ["token_c"]
+        )
+        self.assertEqual(
+            outbox.stats(), {"pruned_tokens": {"unregistered": 1, "invalid": 1, "total": 2}}
+        )
+
+        # Следующее уведомление уходит только на живой токен
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Fail"
+            self.media_file.save()
+        self.assertEqual(fake_messaging.batches, [3, 1])
+
+    @override_settings(FCM_DJANGO_SETTINGS={"DELETE_INACTIVE_DEVICES": False})
+    def test_dead_tokens_deactivated_in_one_query(self):
+        fake_messaging.unregistered("token_a")
+        fake_messaging.unregistered("token_b")
+        with self.assertNumQueries(1):
+            pruned = outbox.prune_tokens({"token_a": "unregistered", "token_b": "unregistered"})
+        self.assertEqual(pruned, 2)
+        self.assertFalse(FCMDevice.objects.filter(active=True).exists())
+        self.assertEqual(FCMDevice.objects.count(), 2)
+
+    def test_transient_errors_keep_tokens(self):
+        fake_messaging.failing_tokens["token_a"] = firebase_exceptions.UnavailableError("Service unavailable")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_file.status = "Done"
+            self.media_file.save()
+        self.assertEqual(FCMDevice.objects.count(), 2)
+        self.assertEqual(outbox.stats()["pruned_tokens"]["total"], 0)
+
+    def test_retry_delay_grows(self):
+        self.assertLessEqual(outbox.retry_delay(1).total_seconds(), 30)
+        self.assertGreaterEqual(outbox.retry_delay(3).total_seconds(), 60)
+        self.assertLessEqual(outbox.retry_delay(50).total_seconds(), 3600)
+
+
+@override_settings(NOTIFICATION_DISPATCH_MODE="sync", FCM_MESSAGING_BACKEND="mobile_rest.fake_messaging")
+class MediaFilesBulkStatusTest(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        fake_messaging.reset()
+        self.user.is_staff = True
+        self.user.save()
+        self.url = reverse('mediafiles-bulk-status')
+        self.owner = User.objects.create(phone_number="1234567890", full_name="Owner")
+        self.other = User.objects.create(phone_number="1234567891", full_name="Other")
+        FCMDevice.objects.create(user=self.owner, registration_id="owner_token", type="android")
+        FCMDevice.objects.create(user=self.other, registration_id="other_token", type="ios")
+        self.files = [
+            MediaFiles.objects.create(
+                user=self.owner if i % 2 else self.other,
+                city="City",
+                street="Street",
+                description=f"Report {i}",
+                was_at_date="2025-03-28",
+                was_at_time="12:00:00",
+                status="Waiting"
+            )
+            for i in range(4)
+        ]
+
+    def test_bulk_done(self):
+        ids = [media_file.id for media_file in self.files]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'ids': ids, 'status': 'Done'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 4, 'ids': ids})
+        self.assertEqual(set(MediaFiles.objects.values_list('status', flat=True)), {'Done'})
+
+        # По одному уведомлению на пользователя со всеми его заявками — одним запросом к FCM
+        self.assertEqual(fake_messaging.batches, [2])
+        self.assertEqual(
+            sorted((message.token, message.data['ids'], message.data['count']) for message in fake_messaging.sent),
+            sorted(
+                (token, ",".join(str(media_file.id) for media_file in self.files if media_file.user_id == user.id), "2")
+                for user, token in ((self.owner, 'owner_token'), (self.other, 'other_token'))
+            )
+        )
+        self.assertEqual(NotificationOutbox.objects.filter(status=NotificationOutbox.SENT).count(), 2)
+
+    def test_bulk_notification_lists_limited_ids(self):
+        media_ids = list(range(1, outbox.BULK_NOTIFICATION_IDS + 6))
+        title, body, data = outbox.bulk_status_notification(media_ids, 'Fail', error_code='ERR003')
+        self.assertEqual(title, 'Заявки отклонены')
+        self.assertIn('и ещё 5', body)
+        self.assertEqual(data['ids'].split(','), [str(media_id) for media_id in media_ids[:-5]])
+        self.assertEqual(data['count'], str(len(media_ids)))
+        self.assertEqual(data['error_code'], 'ERR003')
+        self.assertIsNone(outbox.bulk_status_notification(media_ids, 'Processing'))
+
+    def test_bulk_fail_skips_unchanged(self):
+        self.files[0].status = 'Fail'
+        self.files[0].save()
+        fake_messaging.reset()
+        NotificationOutbox.objects.all().delete()
+
+        ids = [self.files[0].id, self.files[1].id]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {'ids': ids, 'status': 'Fail', 'error_code': 'ERR003', 'error_text': 'Нет видео'},
+                format='json'
+            )
+        self.assertEqual(response.data, {'updated': 1, 'ids': [self.files[1].id]})
+        self.assertEqual(len(fake_messaging.sent), 1)
+        self.assertEqual(fake_messaging.sent[0].data['error_code'], 'ERR003')
+        self.assertIn('Нет видео', fake_messaging.sent[0].notification.body)
+
+    def test_single_update_statement(self):
+        ids = [media_file.id for media_file in self.files]
+        # Только UPDATE ... RETURNING, без предварительного SELECT
+        with self.assertNumQueries(1):
+            changed = MediaFiles.objects.filter(id__in=ids).set_status_returning('Processing')
+        self.assertCountEqual(changed, [(media_file.id, media_file.user_id) for media_file in self.files])
+        self.assertEqual(set(MediaFiles.objects.values_list('status', flat=True)), {'Processing'})
+
+    def test_batches_of_500(self):
+        tokens = [f"token_{i}" for i in range(1200)]
+        FCMDevice.objects.bulk_create([
+            FCMDevice(user=self.owner, registration_id=token, type="android") for token in tokens
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {'ids': [self.files[1].id], 'status': 'Done'}, format='json')
+        self.assertEqual(fake_messaging.batches, [500, 500, 201])
+
+    def test_pruned_token_stats_endpoint(self):
+        fake_messaging.unregistered("owner_token")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {'ids': [self.files[1].id, self.files[3].id], 'status': 'Done'}, format='json')
+        response = self.client.get(reverse('notification-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pruned_tokens'], {'unregistered': 1, 'invalid': 0, 'total': 1})
+        self.assertFalse(FCMDevice.objects.filter(registration_id="owner_token").exists())
+
+    def test_requires_staff_and_valid_payload(self):
+        response = self.client.post(self.url, {'ids': [], 'status': 'Done'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post(self.url, {'ids': [self.files[0].id], 'status': 'Done'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ORJSONRendererParserTest(TestCase):
+    def _payload(self):
+        almaty = datetime.timezone(datetime.timedelta(hours=5))
+        return {
+            'utc': datetime.datetime(2025, 3, 28, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+            'local': datetime.datetime(2025, 3, 28, 17, 0, tzinfo=almaty),
+            'naive': datetime.datetime(2025, 3, 28, 17, 0, 5),
+            'date': datetime.date(2025, 3, 28),
+            'time': datetime.time(12, 30, 15, 500),
+            'decimal': Decimal('10.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': {'blocks': [{'type': 'p', 'text': 'Новость\u2028строка\u2029абзац "кавычки"'}]},
+            1: 'non-str key',
+            'nested': [None, True, False, 0, -1, 2 ** 40, 1.5, ''],
+        }
+
+    def test_render_matches_drf(self):
+        payload = self._payload()
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_render_indent_falls_back(self):
+        payload = self._payload()
+        self.assertEqual(
+            ORJSONRenderer().render(payload, 'application/json; indent=4'),
+            JSONRenderer().render(payload, 'application/json; indent=4'),
+        )
+
+    def test_render_without_orjson(self):
+        payload = self._payload()
+        with patch('mobile_rest.renderers.orjson', None):
+            self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_render_wide_integer_falls_back(self):
+        payload = {'text': {'count': 2 ** 70, 'min': -(2 ** 64)}}
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_render_floats(self):
+        payload = {'large': 1e16, 'small': 1e-7, 'plain': 0.0001}
+        rendered = ORJSONRenderer().render(payload)
+        # Экспонента записывается иначе, чем у JSONRenderer, но значения те же
+        self.assertEqual(rendered, b'{"large":1e16,"small":1e-7,"plain":0.0001}')
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(payload)))
+
+    def test_render_nan(self):
+        # JSONRenderer (allow_nan=False) отказывается кодировать NaN, orjson пишет null
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'n': float('nan')})
+        self.assertEqual(ORJSONRenderer().render({'n': float('nan'), 'inf': float('inf')}), b'{"n":null,"inf":null}')
+
+    def test_parse_matches_drf(self):
+        body = '{"title": "Новость", "text": {"a": [1, 2.5, null, true]}, "id": 7}'.encode()
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parse_wide_integers(self):
+        body = b'{"big": 1180591620717411303425, "neg": -9999999999999999999, "max": 18446744073709551615}'
+        data = ORJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(data, {'big': 2 ** 70 + 1, 'neg': -9999999999999999999, 'max': 2 ** 64 - 1})
+        self.assertIsInstance(data['big'], int)
+        self.assertIsInstance(data['neg'], int)
+
+    def test_wide_integer_round_trip(self):
+        # Тело JSON разбирается парсерами по умолчанию и сохраняется в News.text без потери точности
+        body = b'{"title": "News", "text": {"views": 1180591620717411303425}}'
+        request = Request(
+            APIRequestFactory().post('/', body, content_type='application/json'),
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+        )
+        serializer = NewsSerializer(data=request.data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        news = serializer.save()
+        news.refresh_from_db()
+        self.assertEqual(news.text, {'views': 2 ** 70 + 1})
+
+        # и отдаётся API как есть, а не ошибкой 500
+        user = User.objects.create_user(phone_number='123456789', password='pass')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get(reverse('news-detail'), {'id': news.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['text'], {'views': 2 ** 70 + 1})
+
+    def test_parse_errors(self):
+        for body in (b'{"broken": ', b'{"n": NaN}'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
+
+    def test_api_uses_orjson_renderer(self):
+        user = User.objects.create_user(phone_number='123456789', password='pass')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get(reverse('check-token'))
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.json(), {'message': 'Авторизация успешна'})
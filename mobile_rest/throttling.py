@@ -0,0 +1,145 @@
+"""
+Ограничение частоты запросов к эндпоинтам, отправляющим платные SMS.
+
+Token bucket: у каждого ключа (номер телефона, IP клиента) есть «ведро»
+ёмкостью num токенов, которое равномерно пополняется за period; каждый
+запрос забирает один токен. Скорости задаются в DEFAULT_THROTTLE_RATES
+в формате DRF ("5/hour") по scope троттла.
+
+Состояние ведра хранится в Redis (REDIS_URL), поэтому лимит один на все
+воркеры: списание выполняется атомарно одним Lua-скриптом через общий клиент
+redis-py. Без Redis ведро лежит в кэше cache_alias и обновляется чтением
+и записью (достаточно для локального кэша процесса).
+
+Троттлы не обращаются к БД; DRF возвращает 429 с заголовком Retry-After.
+"""
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Общий для процесса клиент redis-py (с пулом соединений) по REDIS_URL
+    или None, если Redis не настроен.
+    """
+    global _redis
+    url = getattr(settings, "REDIS_URL", "")
+    if not url:
+        return None
+    if _redis is None:
+        with _redis_lock:
+            if _redis is None:
+                import redis
+
+                _redis = redis.Redis.from_url(url)
+    return _redis
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    cache_alias = "default"
+    key_prefix = "throttle"
+
+    # KEYS[1] — ведро; ARGV: ёмкость, токенов в секунду, текущее время, TTL ключа.
+    # Возвращает {1|0, остаток токенов строкой} (числа Lua иначе усекаются до целых)
+    TOKEN_BUCKET = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+    redis.call("EXPIRE", KEYS[1], tonumber(ARGV[4]))
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_key(self, request, view):
+        """
+        Значение, по которому считается лимит, или None, чтобы не ограничивать запрос.
+        """
+        raise NotImplementedError(".get_ident_key() must be overridden")
+
+    def get_rate(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return None
+        num, period = rate.split("/")
+        duration = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+        return int(num), duration
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        ident = self.get_ident_key(request, view) if rate else None
+        if ident is None:
+            return True
+
+        capacity, duration = rate
+        refill = capacity / duration
+        key = f"{self.key_prefix}:{self.scope}:{ident}"
+        # Ключ живёт, пока ведро не наполнится снова; дальше его состояние не важно
+        ttl = math.ceil(duration) + 1
+        allowed, tokens = self.take(key, capacity, refill, ttl)
+        if not allowed:
+            self.wait_seconds = (1 - tokens) / refill
+        return allowed
+
+    def take(self, key, capacity, refill, ttl):
+        now = time.time()
+        cache = caches[self.cache_alias]
+        client = get_redis()
+        if client is not None:
+            # Ключ с KEY_PREFIX и версией кэша, как у остальных записей в Redis
+            redis_key = cache.make_and_validate_key(key)
+            allowed, tokens = client.eval(self.TOKEN_BUCKET, 1, redis_key, capacity, refill, now, ttl)
+            return bool(allowed), float(tokens)
+
+        tokens, timestamp = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - timestamp) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), ttl)
+        return allowed, tokens
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ClientIPThrottle(TokenBucketThrottle):
+    scope = "sms_ip"
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class PhoneNumberThrottle(TokenBucketThrottle):
+    scope = "sms_phone"
+
+    def get_ident_key(self, request, view):
+        if not hasattr(request.data, "get"):
+            return None
+        phone_number = request.data.get("phone_number")
+        if not phone_number:
+            return None
+        # "+7 700 123-45-67" и "77001234567" — один и тот же номер
+        return re.sub(r"\D", "", str(phone_number)) or None
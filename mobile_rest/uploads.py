@@ -0,0 +1,201 @@
+"""
+Прямая загрузка видео клиентом в R2 по presigned URL.
+
+Клиент получает URL на PUT, загружает файл напрямую в бакет и затем
+подтверждает загрузку ключом file_key, после чего создаётся MediaFile.
+Ключи имеют вид "video/<uuid>_<имя файла>" относительно location
+MediaFileStorage ("media/").
+
+Большие файлы загружаются через multipart upload: сервер создаёт загрузку,
+клиент запрашивает presigned URL на части по мере надобности, после обрыва
+узнаёт уже загруженные части через list_parts и докачивает остальные,
+затем загрузка завершается (complete) или отменяется (abort).
+
+При подтверждении загрузки сервер один раз делает HEAD объекта (head_object):
+отсутствующие и слишком большие объекты отклоняются, а размер, ETag, тип
+и время загрузки сохраняются в MediaFile, чтобы больше не обращаться к бакету.
+
+С локальным хранилищем (STORAGE_BACKEND = "local") presigned PUT, HEAD,
+чтение диапазонов и удаление выполняются им самим; multipart upload
+доступен только с R2.
+"""
+import uuid
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files.storage import storages
+
+from helpers.cloudflare import clients as r2_clients, settings as r2_settings
+from helpers.storages.filesystem import LocalStorage
+
+# Время действия presigned URL на загрузку (с)
+UPLOAD_URL_EXPIRES = 3600
+# Максимум файлов в одном пакетном запросе
+MAX_BATCH_FILES = 20
+# Рекомендуемый размер части multipart upload; все части, кроме последней,
+# должны быть не меньше 5 МиБ и (для R2) одного размера
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_MAX_UPLOAD_SIZE = 2 * 1024 ** 3
+KEY_PREFIX = "video/"
+STORAGE_LOCATION = "media/"
+
+
+def new_file_key(file_name):
+    # Уникальный ключ для хранения видео
+    return f"{KEY_PREFIX}{uuid.uuid4()}_{file_name}"
+
+
+def is_valid_file_key(file_key):
+    return file_key.startswith(KEY_PREFIX) and ".." not in file_key.split("/")
+
+
+def max_upload_size():
+    return getattr(settings, "MEDIA_MAX_UPLOAD_SIZE", DEFAULT_MAX_UPLOAD_SIZE)
+
+
+def _local_storage():
+    """
+    Хранилище по умолчанию, если это локальный двойник MediaFileStorage, иначе None.
+    """
+    storage = storages["default"]
+    return storage if isinstance(storage, LocalStorage) else None
+
+
+def presign_put(file_key, content_type):
+    """
+    Presigned URL на PUT объекта file_key; подпись вычисляется локально общим клиентом R2.
+    """
+    local = _local_storage()
+    if local is not None:
+        return local.presigned_put_url(file_key)
+    return r2_clients.get_client().generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": r2_settings.bucket_name,
+            "Key": STORAGE_LOCATION + file_key,
+            "ContentType": content_type,
+        },
+        ExpiresIn=UPLOAD_URL_EXPIRES,
+    )
+
+
+# ----- multipart upload -----
+
+def supports_multipart():
+    """
+    Multipart upload есть только у R2, у локального хранилища — нет.
+    """
+    return _local_storage() is None
+
+
+def _object(file_key):
+    return {"Bucket": r2_settings.bucket_name, "Key": STORAGE_LOCATION + file_key}
+
+
+def create_multipart(file_key, content_type):
+    """
+    Создаёт multipart upload для file_key и возвращает его UploadId.
+    """
+    response = r2_clients.get_client().create_multipart_upload(ContentType=content_type, **_object(file_key))
+    return response["UploadId"]
+
+
+def presign_part(file_key, upload_id, part_number):
+    return r2_clients.get_client().generate_presigned_url(
+        "upload_part",
+        Params={**_object(file_key), "UploadId": upload_id, "PartNumber": part_number},
+        ExpiresIn=UPLOAD_URL_EXPIRES,
+    )
+
+
+def list_parts(file_key, upload_id):
+    """
+    Уже загруженные части: [{"part_number", "etag", "size"}, ...] по возрастанию номера.
+    """
+    client = r2_clients.get_client()
+    parts = []
+    marker = 0
+    while True:
+        response = client.list_parts(UploadId=upload_id, PartNumberMarker=marker, **_object(file_key))
+        parts.extend(
+            {"part_number": part["PartNumber"], "etag": part["ETag"], "size": part["Size"]}
+            for part in response.get("Parts", [])
+        )
+        if not response.get("IsTruncated"):
+            return parts
+        marker = response["NextPartNumberMarker"]
+
+
+def complete_multipart(file_key, upload_id, parts=None):
+    """
+    Завершает загрузку. parts — [{"part_number", "etag"}]; если не переданы,
+    берутся все загруженные части из list_parts.
+    """
+    if parts is None:
+        parts = list_parts(file_key, upload_id)
+    r2_clients.get_client().complete_multipart_upload(
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]
+        },
+        **_object(file_key),
+    )
+
+
+def abort_multipart(file_key, upload_id):
+    r2_clients.get_client().abort_multipart_upload(UploadId=upload_id, **_object(file_key))
+
+
+def is_missing_upload(error):
+    """
+    True, если ClientError означает, что загрузки (или бакета/объекта) нет.
+    """
+    return error.response.get("Error", {}).get("Code") in ("NoSuchUpload", "NoSuchKey", "404")
+
+
+# ----- проверка загруженных объектов -----
+
+def head_object(file_key):
+    """
+    Метаданные объекта {"size", "etag", "content_type", "uploaded_at"} одним HEAD;
+    None, если объекта нет.
+    """
+    local = _local_storage()
+    if local is not None:
+        return local.head(file_key)
+    try:
+        response = r2_clients.get_client().head_object(**_object(file_key))
+    except ClientError as e:
+        if is_missing_upload(e):
+            return None
+        raise
+    return {
+        "size": response["ContentLength"],
+        "etag": response.get("ETag", "").strip('"'),
+        "content_type": response.get("ContentType", ""),
+        "uploaded_at": response.get("LastModified"),
+    }
+
+
+def read_range(file_key, offset, length):
+    """
+    Байты [offset, offset + length) объекта одним Range запросом.
+    """
+    local = _local_storage()
+    if local is not None:
+        return local.read_range(file_key, offset, length)
+    response = r2_clients.get_client().get_object(
+        Range=f"bytes={offset}-{offset + length - 1}", **_object(file_key)
+    )
+    return response["Body"].read()
+
+
+def delete_object(file_key):
+    local = _local_storage()
+    if local is not None:
+        return local.delete(file_key)
+    r2_clients.get_client().delete_object(**_object(file_key))
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import SendVerificationCodeView, VerifyCodeAndRegisterView, CustomTokenObtainPairView, RegisterDeviceView, MediaFilesListView, MediaFilesDetailView, GetNewsListView, GetNewsView, PostNewsView, CheckToken, MediaFilesCreateView, UpdateNewsView, DeleteNewsView, RequestPasswordResetView, ConfirmPasswordResetView, GeneratePresignedUrlView, ConfirmUploadView, MediaFileNewsUpdateAPIView
+from .views import SendVerificationCodeView, VerifyCodeAndRegisterView, CustomTokenObtainPairView, RegisterDeviceView, MediaFilesListView, MediaFilesDetailView, GetNewsListView, GetNewsView, PostNewsView, CheckToken, MediaFilesCreateView, UpdateNewsView, DeleteNewsView, RequestPasswordResetView, ConfirmPasswordResetView, GeneratePresignedUrlView, ConfirmUploadView, MediaFileNewsUpdateAPIView, NewsCacheStatsView, MediaFilesBulkStatusView, NotificationStatsView, GeneratePresignedUrlBatchView, ConfirmUploadBatchView, MultipartCreateView, MultipartPartUrlsView, MultipartPartsView, MultipartCompleteView, MultipartAbortView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -35,15 +35,25 @@ urlpatterns = [
     path('mediafiles/upload/', MediaFilesCreateView.as_view(), name='mediafiles-create'),
     path('mediafiles/generate-upload/', GeneratePresignedUrlView.as_view(), name='mediafiles-generate-upload'),
     path('mediafiles/confirm-upload/', ConfirmUploadView.as_view(), name='mediafiles-confirm-upload'),
+    path('mediafiles/generate-upload-batch/', GeneratePresignedUrlBatchView.as_view(), name='mediafiles-generate-upload-batch'),
+    path('mediafiles/confirm-upload-batch/', ConfirmUploadBatchView.as_view(), name='mediafiles-confirm-upload-batch'),
+    path('mediafiles/multipart/create/', MultipartCreateView.as_view(), name='mediafiles-multipart-create'),
+    path('mediafiles/multipart/part-urls/', MultipartPartUrlsView.as_view(), name='mediafiles-multipart-part-urls'),
+    path('mediafiles/multipart/parts/', MultipartPartsView.as_view(), name='mediafiles-multipart-parts'),
+    path('mediafiles/multipart/complete/', MultipartCompleteView.as_view(), name='mediafiles-multipart-complete'),
+    path('mediafiles/multipart/abort/', MultipartAbortView.as_view(), name='mediafiles-multipart-abort'),
 
     path('mediafiles/detail/', MediaFilesDetailView.as_view(), name='mediafiles-detail'),
     path('mediafiles/list/', MediaFilesListView.as_view(), name='mediafiles-list'),
+    path('mediafiles/bulk-status/', MediaFilesBulkStatusView.as_view(), name='mediafiles-bulk-status'),
+    path('notifications/stats/', NotificationStatsView.as_view(), name='notification-stats'),
     path('news/upload/', PostNewsView.as_view(), name='news-upload'),
     path('news/detail/', GetNewsView.as_view(), name='news-detail'),
     path('news/list/', GetNewsListView.as_view(), name='news-list'),
     path('news/update/', UpdateNewsView.as_view(), name='news-update'),
     path('news/delete/', DeleteNewsView.as_view(), name='news-delete'),
     path('news/update-img/', MediaFileNewsUpdateAPIView.as_view(), name='news-img-update'),
+    path('news/cache-stats/', NewsCacheStatsView.as_view(), name='news-cache-stats'),
 
     path('auth/request_password_reset/', RequestPasswordResetView.as_view(), name='request_password_reset'),
     path('auth/confirm_password_reset/', ConfirmPasswordResetView.as_view(), name='confirm_password_reset'),
@@ -0,0 +1,145 @@
+"""
+Хранилище одноразовых кодов подтверждения из SMS.
+
+issue() сохраняет код для номера (заменяя предыдущий), consume() атомарно
+проверяет и удаляет его: из двух одновременных проверок одного кода успешной
+будет только одна.
+
+Реализация выбирается настройкой VERIFICATION_CODE_STORE (путь к классу):
+    DatabaseCodeStore — таблица VerificationCode; issue — один
+        INSERT ... ON CONFLICT DO UPDATE, consume — один DELETE с условием
+        на код и срок действия;
+    CacheCodeStore — кэш Django (Redis) с TTL самого кэша; consume — удаление
+        ключа кода, атомарное на стороне кэша (DEL в Redis).
+
+Коды, которые так и не были использованы, удаляет sweep_expired(): командой
+manage.py sweep_verification_codes или фоновым потоком в каждом процессе,
+если задан VERIFICATION_CODE_SWEEP_INTERVAL (см. MobileRestConfig.ready).
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from .models import VerificationCode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+
+
+def _ttl():
+    return getattr(settings, "VERIFICATION_CODE_TTL", DEFAULT_TTL)
+
+
+class DatabaseCodeStore:
+    def issue(self, phone_number, code):
+        VerificationCode.objects.bulk_create(
+            [VerificationCode(phone_number=phone_number, code=code)],
+            update_conflicts=True,
+            unique_fields=["phone_number"],
+            update_fields=["code", "created_at"],
+        )
+
+    def consume(self, phone_number, code):
+        # Без сигналов и каскадов delete() выполняется одним DELETE,
+        # число удалённых строк играет роль RETURNING
+        deleted, _ = VerificationCode.objects.filter(
+            phone_number=phone_number,
+            code=code,
+            created_at__gt=now() - timedelta(seconds=_ttl()),
+        ).delete()
+        return deleted > 0
+
+
+class CacheCodeStore:
+    """
+    Код хранится под ключом с самим кодом, а ключ номера указывает на текущий
+    код. consume() принимает код, только если он текущий, и засчитывает его
+    тому, чей cache.delete() действительно удалил ключ, — из одновременных
+    проверок успешна одна. Используется только публичный API кэша Django.
+    """
+
+    KEY_PREFIX = "verification:code"
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def _key(self, phone_number):
+        return f"{self.KEY_PREFIX}:{phone_number}"
+
+    def _code_key(self, phone_number, code):
+        return f"{self.KEY_PREFIX}:{phone_number}:{code}"
+
+    def issue(self, phone_number, code):
+        code = str(code)
+        self.cache.set_many(
+            {self._code_key(phone_number, code): 1, self._key(phone_number): code}, timeout=_ttl()
+        )
+
+    def consume(self, phone_number, code):
+        code = str(code)
+        # Код, заменённый новым, больше не принимается; ключ номера истечёт по TTL
+        return self.cache.get(self._key(phone_number)) == code and bool(
+            self.cache.delete(self._code_key(phone_number, code))
+        )
+
+
+def get_code_store():
+    path = getattr(settings, "VERIFICATION_CODE_STORE", "mobile_rest.verification.DatabaseCodeStore")
+    return import_string(path)()
+
+
+# ----- очистка просроченных кодов -----
+
+def sweep_expired(batch_size=1000, pause=0.0):
+    """
+    Удаляет просроченные коды из VerificationCode пачками по batch_size строк.
+    Каждая пачка — отдельный короткий DELETE по индексу created_at,
+    поэтому блокировки держатся недолго. Возвращает число удалённых строк.
+    """
+    cutoff = now() - timedelta(seconds=_ttl())
+    expired = VerificationCode.objects.filter(created_at__lt=cutoff)
+    total = 0
+    while True:
+        ids = list(expired.order_by("created_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        # Условие на created_at повторяется: код мог быть выдан заново между запросами
+        deleted, _ = expired.filter(id__in=ids).delete()
+        total += deleted
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def _sweep_forever(interval, batch_size):
+    while True:
+        time.sleep(interval)
+        try:
+            deleted = sweep_expired(batch_size=batch_size)
+            if deleted:
+                logger.info(f"Deleted {deleted} expired verification codes")
+        except Exception as e:
+            logger.exception(f"Error sweeping verification codes: {e}")
+        finally:
+            connections.close_all()
+
+
+def start_sweeper(interval, batch_size=1000):
+    """
+    Запускает фоновый поток, раз в interval секунд вызывающий sweep_expired().
+    """
+    thread = threading.Thread(
+        target=_sweep_forever, args=(interval, batch_size), name="verification-sweeper", daemon=True
+    )
+    thread.start()
+    return thread
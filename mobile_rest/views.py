@@ -1,7 +1,7 @@
 from rest_framework_simplejwt.views import TokenObtainPairView
 from fcm_django.models import FCMDevice
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
@@ -11,18 +11,43 @@ from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ObjectDoesNotExist
 from sentry_sdk import capture_exception
 from django.shortcuts import get_object_or_404
+from botocore.exceptions import ClientError
+from helpers.cloudflare.uploadhandler import StreamingUploadHandler
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_yasg import openapi
-import uuid
-import boto3
 import json
 import time
 import random
-from decouple import config
+from collections import defaultdict
 from .sms_service import send_verification_code
-from .models import CustomUser, MediaFiles, MediaFile, MediaFileNews, News, VerificationCode
+from .verification import get_code_store
+from .throttling import ClientIPThrottle, PhoneNumberThrottle
+from .pagination import KeysetPaginator, InvalidCursor
+from . import mp4probe, news_cache, outbox, uploads
+from .models import (
+    CustomUser,
+    MediaFiles,
+    MediaFile,
+    MediaFileNews,
+    News,
+    videos_prefetch,
+    news_media_prefetch,
+)
+from .conditional import not_modified, set_validators, validators
+from .fast_serializer import FastMediaFilesSerializer, FastNewsSerializer
 from .serializer import (
     CustomTokenObtainPairSerializer,
     MediaFilesSerializer,
+    MediaFilesBulkStatusSerializer,
+    BatchPresignSerializer,
+    BatchConfirmUploadSerializer,
+    MultipartCreateSerializer,
+    MultipartUploadSerializer,
+    MultipartPartUrlsSerializer,
+    MultipartCompleteSerializer,
     NewsSerializer,
     MediaFileNewsSerializer
 )
@@ -39,6 +64,9 @@ class RequestPasswordResetView(APIView):
     если пользователь с таким номером существует, отправляем код.
     """
     permission_classes = [AllowAny]
+    # Аутентификация не нужна и могла бы обратиться к БД раньше проверки лимитов
+    authentication_classes = []
+    throttle_classes = [ClientIPThrottle, PhoneNumberThrottle]
 
     @swagger_auto_schema(
         operation_description="Отправка кода для сброса пароля по номеру телефона",
@@ -56,6 +84,7 @@ class RequestPasswordResetView(APIView):
             200: 'Код отправлен успешно',
             400: 'Номер телефона не указан',
             404: 'Пользователь с таким номером не найден',
+            429: 'Слишком много запросов (см. Retry-After)',
             500: 'Ошибка при отправке кода'
         }
     )
@@ -73,8 +102,12 @@ class RequestPasswordResetView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        result = send_verification_code(phone_number)
-        if 'status' in result:
+        verification_code = str(random.randint(100000, 999999))
+        # Код проверяет ConfirmPasswordResetView через то же хранилище; новый код заменяет старый
+        get_code_store().issue(phone_number, verification_code)
+
+        result = send_verification_code(phone_number, verification_code)
+        if result.get('status') == 'success':
             return Response(
                 {"message": "Код для сброса пароля успешно отправлен."},
                 status=status.HTTP_200_OK
@@ -140,14 +173,10 @@ class ConfirmPasswordResetView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        verification_record = VerificationCode.objects.filter(phone_number=phone_number).first()
-
-        if not verification_record or verification_record.code != code or verification_record.is_expired():
+        # Проверка и удаление кода — одна атомарная операция
+        if not get_code_store().consume(phone_number, code):
             return Response({"error": "Неверный или просроченный код"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Удаляем использованный код
-        verification_record.delete()
-
         try:
             user.password = make_password(new_password)
             user.save()
@@ -168,6 +197,9 @@ class ConfirmPasswordResetView(APIView):
 # ===================================
 
 class SendVerificationCodeView(APIView):
+    # Аутентификация не нужна и могла бы обратиться к БД раньше проверки лимитов
+    authentication_classes = []
+    throttle_classes = [ClientIPThrottle, PhoneNumberThrottle]
 
     @swagger_auto_schema(
         operation_description="Отправка кода подтверждения на номер телефона",
@@ -185,6 +217,7 @@ class SendVerificationCodeView(APIView):
             200: 'Код отправлен успешно',
             400: 'Номер телефона обязателен',
             409: 'Пользователь уже существует',
+            429: 'Слишком много запросов (см. Retry-After)',
             500: 'Ошибка при отправке кода'
         }
     )
@@ -200,9 +233,8 @@ class SendVerificationCodeView(APIView):
         # Генерируем 4-значный код
         verification_code = str(random.randint(100000, 999999))
 
-        # Удаляем старый код (если есть) и создаем новый
-        VerificationCode.objects.filter(phone_number=phone_number).delete()
-        VerificationCode.objects.create(phone_number=phone_number, code=verification_code)
+        # Новый код заменяет старый (если есть)
+        get_code_store().issue(phone_number, verification_code)
 
         result = send_verification_code(phone_number, verification_code)
 
@@ -242,14 +274,10 @@ class VerifyCodeAndRegisterView(APIView):
             return Response({"error": "Обязательные поля отсутствуют"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            verification_record = VerificationCode.objects.filter(phone_number=phone_number).first()
-
-            if not verification_record or verification_record.code != code or verification_record.is_expired():
+            # Проверка и удаление кода — одна атомарная операция
+            if not get_code_store().consume(phone_number, code):
                 return Response({"error": "Неверный или просроченный код"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Удаляем использованный код
-            verification_record.delete()
-
             user = CustomUser.objects.create(
                 phone_number=phone_number,
                 full_name=full_name,
@@ -372,27 +400,12 @@ class GeneratePresignedUrlView(APIView):
         except ObjectDoesNotExist:
             return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
 
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=config("CLOUDFLARE_R2_ACCESS_KEY"),
-            aws_secret_access_key=config("CLOUDFLARE_R2_SECRET_KEY"),
-            endpoint_url=config("CLOUDFLARE_R2_BUCKET_ENDPOINT"),
-            region_name="auto",  # Укажи auto, если используешь Cloudflare R
-        )
-
         # Уникальный ключ для хранения видео
-        s3_key = f"video/{uuid.uuid4()}_{file_name}"
+        s3_key = uploads.new_file_key(file_name)
 
         try:
-            presigned_url = s3_client.generate_presigned_url(
-                "put_object",
-                Params={
-                    "Bucket": config("CLOUDFLARE_R2_BUCKET"),
-                    "Key": "media/" + s3_key,
-                    "ContentType": content_type,
-                },
-                ExpiresIn=3600,  # URL действует 1 час
-            )
+            # Подпись вычисляется общим для процесса клиентом R2 (см. helpers/cloudflare/clients.py)
+            presigned_url = uploads.presign_put(s3_key, content_type)
 
             return Response(
                 {"upload_url": presigned_url, "file_key": s3_key},
@@ -405,9 +418,53 @@ class GeneratePresignedUrlView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+def _r2_error_response(error):
+    if uploads.is_missing_upload(error):
+        return Response({"error": "Загрузка не найдена"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"error": f"Ошибка R2: {str(error)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _multipart_unavailable():
+    """
+    Ответ 501, если multipart-загрузка недоступна: у локального хранилища
+    (STORAGE_BACKEND = "local") её нет, только у R2. Иначе None.
+    """
+    if uploads.supports_multipart():
+        return None
+    return Response(
+        {"error": "Multipart-загрузка доступна только с хранилищем R2, используйте mediafiles/generate-upload/"},
+        status=status.HTTP_501_NOT_IMPLEMENTED
+    )
+
+
+def _verify_uploads(file_keys):
+    """
+    HEAD каждого загруженного объекта. Возвращает (метаданные по file_key, None)
+    или (None, Response с ошибкой), если объекта нет или он больше допустимого размера.
+    """
+    max_size = uploads.max_upload_size()
+    metadata = {}
+    for file_key in file_keys:
+        info = uploads.head_object(file_key)
+        if info is None:
+            return None, Response(
+                {"error": f"Файл не найден в хранилище: {file_key}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if info["size"] > max_size:
+            # Такой файл уже не может быть подтверждён, поэтому не храним его
+            uploads.delete_object(file_key)
+            return None, Response(
+                {"error": f"Размер файла превышает {max_size} байт: {file_key}"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        metadata[file_key] = info
+    return metadata, None
+
+
 class ConfirmUploadView(APIView):
     """
-    Этот эндпоинт вызывается клиентом после успешной загрузки файла
+    Этот эндпоинт вызывается клиентом после успешной загрузки файла.
+    Объект проверяется одним HEAD, его метаданные сохраняются в MediaFile.
     """
     permission_classes = [IsAuthenticated]
 
@@ -417,18 +474,314 @@ class ConfirmUploadView(APIView):
 
         if not media_id or not file_key:
             return Response({"error": "media_id и file_key обязательны"}, status=status.HTTP_400_BAD_REQUEST)
+        if not uploads.is_valid_file_key(file_key):
+            return Response({"error": f"Некорректный ключ файла: {file_key}"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             media_instance = MediaFiles.objects.get(id=int(media_id))
         except ObjectDoesNotExist:
             return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Сохраняем путь в базе
-        media_file = MediaFile.objects.create(media=media_instance)
-        media_file.video_file.name = file_key
-        media_file.save()
+        try:
+            metadata, error = _verify_uploads([file_key])
+        except ClientError as e:
+            return _r2_error_response(e)
+        if error:
+            return error
+
+        # Сохраняем путь и метаданные в базе
+        media_file = MediaFile.objects.create(media=media_instance, video_file=file_key, **metadata[file_key])
+        mp4probe.schedule_probe([media_file.id])
+
+        return Response({"message": "Файл успешно загружен", "id": media_file.id}, status=status.HTTP_200_OK)
+
+class GeneratePresignedUrlBatchView(APIView):
+    """
+    Presigned URL на загрузку сразу нескольких видео одной заявки — один запрос вместо N.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Presigned PUT URL для нескольких файлов заявки",
+        request_body=BatchPresignSerializer,
+        responses={
+            200: 'Список {file_name, upload_url, file_key}',
+            400: 'Некорректные данные',
+            404: 'MediaFiles не найден'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = BatchPresignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if not MediaFiles.objects.filter(id=data['media_id']).exists():
+            return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
+
+        result = []
+        try:
+            for file in data['files']:
+                file_key = uploads.new_file_key(file['file_name'])
+                result.append({
+                    "file_name": file['file_name'],
+                    "upload_url": uploads.presign_put(file_key, file['content_type']),
+                    "file_key": file_key,
+                })
+        except Exception as e:
+            return Response(
+                {"error": f"Ошибка генерации URL: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response({"uploads": result}, status=status.HTTP_200_OK)
+
+
+class ConfirmUploadBatchView(APIView):
+    """
+    Подтверждение загрузки нескольких файлов заявки: все MediaFile создаются одним INSERT.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Подтверждение загрузки нескольких файлов заявки",
+        request_body=BatchConfirmUploadSerializer,
+        responses={
+            201: 'Файлы сохранены',
+            400: 'Некорректные данные или файл не найден в хранилище',
+            404: 'MediaFiles не найден',
+            413: 'Файл больше допустимого размера'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = BatchConfirmUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        media_id = data['media_id']
+
+        if not MediaFiles.objects.filter(id=media_id).exists():
+            return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            metadata, error = _verify_uploads(data['file_keys'])
+        except ClientError as e:
+            return _r2_error_response(e)
+        if error:
+            return error
+
+        with transaction.atomic():
+            files = MediaFile.objects.bulk_create([
+                MediaFile(media_id=media_id, video_file=file_key, **metadata[file_key])
+                for file_key in data['file_keys']
+            ])
+            # bulk_create не вызывает сигналы, поэтому ETag заявки обновляем явно
+            MediaFiles.objects.filter(id=media_id).update(updated_at=timezone.now())
+            mp4probe.schedule_probe([file.id for file in files])
+
+        return Response(
+            {"message": "Файлы успешно загружены", "ids": [file.id for file in files]},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class MultipartCreateView(APIView):
+    """
+    Начало multipart-загрузки большого видео. Части загружаются клиентом по presigned URL
+    (mediafiles/multipart/part-urls/), после обрыва — докачиваются (mediafiles/multipart/parts/).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Создание multipart-загрузки",
+        request_body=MultipartCreateSerializer,
+        responses={
+            201: '{upload_id, file_key, part_size, max_parts}',
+            400: 'Некорректные данные',
+            404: 'MediaFiles не найден',
+            501: 'Multipart-загрузка недоступна (локальное хранилище)'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        unavailable = _multipart_unavailable()
+        if unavailable:
+            return unavailable
+
+        serializer = MultipartCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if not MediaFiles.objects.filter(id=data['media_id']).exists():
+            return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
+
+        file_key = uploads.new_file_key(data['file_name'])
+        try:
+            upload_id = uploads.create_multipart(file_key, data['content_type'])
+        except ClientError as e:
+            return _r2_error_response(e)
+
+        return Response(
+            {
+                "upload_id": upload_id,
+                "file_key": file_key,
+                "part_size": uploads.MULTIPART_PART_SIZE,
+                "max_parts": uploads.MAX_PARTS,
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class MultipartPartUrlsView(APIView):
+    """
+    Presigned URL на загрузку частей (до 100 за запрос). URL выдаются по мере
+    надобности, поэтому срок их действия не ограничивает длительность всей загрузки.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Presigned URL для частей multipart-загрузки",
+        request_body=MultipartPartUrlsSerializer,
+        responses={
+            200: 'Список {part_number, upload_url}',
+            400: 'Некорректные данные',
+            501: 'Multipart-загрузка недоступна (локальное хранилище)'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        unavailable = _multipart_unavailable()
+        if unavailable:
+            return unavailable
+
+        serializer = MultipartPartUrlsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        parts = [
+            {
+                "part_number": part_number,
+                "upload_url": uploads.presign_part(data['file_key'], data['upload_id'], part_number),
+            }
+            for part_number in data['part_numbers']
+        ]
+        return Response({"parts": parts}, status=status.HTTP_200_OK)
+
+
+class MultipartPartsView(APIView):
+    """
+    Уже загруженные части — для продолжения загрузки после обрыва соединения.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Список загруженных частей multipart-загрузки",
+        manual_parameters=[
+            openapi.Parameter('file_key', openapi.IN_QUERY, description="Ключ файла", type=openapi.TYPE_STRING),
+            openapi.Parameter('upload_id', openapi.IN_QUERY, description="ID загрузки", type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: 'Список {part_number, etag, size}',
+            400: 'Некорректные данные',
+            404: 'Загрузка не найдена',
+            501: 'Multipart-загрузка недоступна (локальное хранилище)'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        unavailable = _multipart_unavailable()
+        if unavailable:
+            return unavailable
+
+        serializer = MultipartUploadSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        try:
+            parts = uploads.list_parts(data['file_key'], data['upload_id'])
+        except ClientError as e:
+            return _r2_error_response(e)
+        return Response({"parts": parts}, status=status.HTTP_200_OK)
+
+
+class MultipartCompleteView(APIView):
+    """
+    Завершение multipart-загрузки и сохранение файла в заявке (как ConfirmUploadView).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Завершение multipart-загрузки",
+        request_body=MultipartCompleteSerializer,
+        responses={
+            201: 'Файл успешно загружен',
+            400: 'Некорректные данные',
+            404: 'MediaFiles или загрузка не найдены',
+            413: 'Файл больше допустимого размера',
+            501: 'Multipart-загрузка недоступна (локальное хранилище)'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        unavailable = _multipart_unavailable()
+        if unavailable:
+            return unavailable
+
+        serializer = MultipartCompleteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if not MediaFiles.objects.filter(id=data['media_id']).exists():
+            return Response({"error": "MediaFiles не найден"}, status=status.HTTP_404_NOT_FOUND)
+
+        file_key = data['file_key']
+        try:
+            uploads.complete_multipart(file_key, data['upload_id'], data.get('parts'))
+            metadata, error = _verify_uploads([file_key])
+        except ClientError as e:
+            return _r2_error_response(e)
+        if error:
+            return error
+
+        media_file = MediaFile.objects.create(media_id=data['media_id'], video_file=file_key, **metadata[file_key])
+        mp4probe.schedule_probe([media_file.id])
+        return Response(
+            {"message": "Файл успешно загружен", "id": media_file.id},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class MultipartAbortView(APIView):
+    """
+    Отмена multipart-загрузки: R2 удаляет уже загруженные части.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Отмена multipart-загрузки",
+        request_body=MultipartUploadSerializer,
+        responses={
+            204: 'Загрузка отменена',
+            400: 'Некорректные данные',
+            404: 'Загрузка не найдена',
+            501: 'Multipart-загрузка недоступна (локальное хранилище)'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        unavailable = _multipart_unavailable()
+        if unavailable:
+            return unavailable
+
+        serializer = MultipartUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        try:
+            uploads.abort_multipart(data['file_key'], data['upload_id'])
+        except ClientError as e:
+            return _r2_error_response(e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-        return Response({"message": "Файл успешно загружен"}, status=status.HTTP_200_OK)
 
 class MediaFilesDetailView(APIView):
     """
@@ -462,20 +815,33 @@ class MediaFilesDetailView(APIView):
 
         try:
             media_instance = MediaFiles.objects.get(id=record_id)
-            serializer = MediaFilesSerializer(media_instance)
-            return Response(serializer.data, status=status.HTTP_200_OK)
         except MediaFiles.DoesNotExist:
             return Response({"error": "Запись не найдена"}, status=status.HTTP_404_NOT_FOUND)
 
+        # Проверяем ETag / Last-Modified до загрузки видео и сериализации
+        etag, last_modified = validators(
+            media_instance.pk, media_instance.updated_at, last_modified=media_instance.updated_at
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        prefetch_related_objects([media_instance], videos_prefetch())
+        serializer = MediaFilesSerializer(media_instance)
+        return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
+
 
 class MediaFilesListView(APIView):
     """
-    Получение списка записей MediaFiles (по пользователю или всех).
+    Получение списка записей MediaFiles (по пользователю или всех)
+    с cursor-пагинацией по (uploaded_at, id).
     """
     permission_classes = [IsAuthenticated]
+    paginator = KeysetPaginator('uploaded_at')
 
     @swagger_auto_schema(
-        operation_description="Получение списка записей (по пользователю или всех)",
+        operation_description="Получение списка записей (по пользователю или всех). "
+                              "Следующая/предыдущая страница запрашивается по токенам next/prev из ответа.",
         manual_parameters=[
             openapi.Parameter(
                 'type',
@@ -489,9 +855,22 @@ class MediaFilesListView(APIView):
                 description="Количество записей в выборке",
                 type=openapi.TYPE_STRING
             ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Токен страницы (next или prev из предыдущего ответа)",
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
-            200: MediaFilesSerializer(many=True),
+            200: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'next': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                    'prev': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                }
+            ),
             400: "Некорректные параметры запроса",
             404: "Записи не найдены"
         }
@@ -499,6 +878,7 @@ class MediaFilesListView(APIView):
     def get(self, request, *args, **kwargs):
         query_type = request.query_params.get("type")
         limit_str = request.query_params.get("limit")
+        cursor = request.query_params.get("cursor")
 
         if not query_type or not limit_str:
             return Response(
@@ -515,27 +895,142 @@ class MediaFilesListView(APIView):
             )
 
         if query_type == "user":
-            media_qs = MediaFiles.objects.filter(user=request.user).order_by('-uploaded_at')[:limit_value]
+            media_qs = MediaFiles.objects.filter(user=request.user)
         elif query_type == "all":
-            media_qs = MediaFiles.objects.all().order_by('-uploaded_at')[:limit_value]
+            media_qs = MediaFiles.objects.all()
         else:
             return Response(
                 {"error": 'Допустимые значения "type": "user" или "all"'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if not media_qs.exists():
+        # Список только читается: берём кортежи .values_list() и сериализуем без ModelSerializer
+        media_qs = media_qs.values_list(*FastMediaFilesSerializer.values_fields, named=True)
+        try:
+            rows, next_cursor, prev_cursor = self.paginator.paginate(media_qs, limit_value, cursor)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not rows and not cursor:
             return Response({"error": "Записи не найдены"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = MediaFilesSerializer(media_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = FastMediaFilesSerializer(rows)
+        return Response(
+            {"results": serializer.data, "next": next_cursor, "prev": prev_cursor},
+            status=status.HTTP_200_OK
+        )
+
+
+class MediaFilesBulkStatusView(APIView):
+    """
+    Массовая смена статуса заявок (для операторов).
+    Статус меняется одним UPDATE ... RETURNING, уведомления (одно на пользователя)
+    ставятся в outbox одним INSERT и уходят в FCM пачками после коммита.
+    """
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Массовая смена статуса заявок с отправкой уведомлений пользователям",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description="ID заявок"
+                ),
+                'status': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description="Новый статус (например, Done или Fail)"
+                ),
+                'error_code': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description="Код ошибки (для статуса Fail)"
+                ),
+                'error_text': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description="Описание ошибки (для статуса Fail)"
+                ),
+            },
+            required=['ids', 'status']
+        ),
+        responses={
+            200: 'Статусы обновлены',
+            400: 'Некорректные данные'
+        }
+    )
+    def post(self, request):
+        serializer = MediaFilesBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        new_status = data['status']
+
+        with transaction.atomic():
+            changed = MediaFiles.objects.filter(id__in=data['ids']).set_status_returning(new_status)
+            # Одно уведомление на пользователя, а не на каждую его заявку
+            media_ids_by_user = defaultdict(list)
+            for media_id, user_id in sorted(changed):
+                media_ids_by_user[user_id].append(media_id)
+            notifications = []
+            for user_id, media_ids in media_ids_by_user.items():
+                notification = outbox.bulk_status_notification(
+                    media_ids,
+                    new_status,
+                    error_code=data.get('error_code', "Не указан"),
+                    error_text=data.get('error_text', "Не указана"),
+                )
+                if notification is not None:
+                    notifications.append((user_id, *notification))
+            outbox.enqueue_many(notifications)
+
+        return Response(
+            {"updated": len(changed), "ids": sorted(media_id for media_id, _ in changed)},
+            status=status.HTTP_200_OK
+        )
+
+
+class NotificationStatsView(APIView):
+    """
+    Счётчики удалённых мёртвых FCM-токенов (только для администраторов).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(outbox.stats(), status=status.HTTP_200_OK)
 
 
 # ===================================
 #   NEWS VIEWS
 # ===================================
 
-class PostNewsView(APIView):
+class StreamingUploadMixin:
+    """
+    Файлы multipart-запроса загружаются в R2 по мере получения (StreamingUploadHandler),
+    без буферизации в памяти или во временном файле.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.upload_handler = StreamingUploadHandler(request._request)
+        request._request.upload_handlers = [self.upload_handler, *request._request.upload_handlers]
+        super().initial(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = None
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            return response
+        finally:
+            # Загрузка, прерванная ошибкой или обрывом соединения, не остаётся незавершённой в бакете
+            upload_handler = getattr(self, 'upload_handler', None)
+            if upload_handler is not None:
+                upload_handler.upload_interrupted()
+                # Файлы уже в бакете, но при ошибке на них не ссылается ни одна запись
+                if response is None or not status.is_success(response.status_code):
+                    upload_handler.discard_completed()
+
+
+class PostNewsView(StreamingUploadMixin, APIView):
     """
     Создание новости с загрузкой медиафайлов (video_file).
     """
@@ -558,10 +1053,16 @@ class PostNewsView(APIView):
                 news=news_instance,
                 video_file=media_item
             )
-        return Response(
-            NewsSerializer(news_instance).data,
-            status=status.HTTP_201_CREATED
+        if media_files:
+            # updated_at новости сдвигается при добавлении медиа (см. signals.py)
+            news_instance.refresh_from_db(fields=['updated_at'])
+        data = NewsSerializer(news_instance).data
+        # Новость уже сериализована для ответа — сразу кладём её в кэш
+        etag, last_modified = validators(
+            news_instance.pk, news_instance.updated_at, last_modified=news_instance.updated_at
         )
+        news_cache.set_detail(news_instance.id, data, etag, last_modified)
+        return set_validators(Response(data, status=status.HTTP_201_CREATED), etag, last_modified)
 
 
 class GetNewsView(APIView):
@@ -594,21 +1095,49 @@ class GetNewsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            news_obj = News.objects.get(id=news_id)
-            serializer = NewsSerializer(news_obj)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except News.DoesNotExist:
-            return Response({'error': 'Новость не найдена'}, status=status.HTTP_404_NOT_FOUND)
+            news_id = int(news_id)
+        except ValueError:
+            return Response(
+                {"error": "Параметр 'id' должен быть числом"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entry = news_cache.get_detail(news_id)
+        if entry is None:
+            try:
+                news_obj = News.objects.get(id=news_id)
+            except News.DoesNotExist:
+                return Response({'error': 'Новость не найдена'}, status=status.HTTP_404_NOT_FOUND)
+
+            # Проверяем ETag / Last-Modified до загрузки медиа и сериализации
+            etag, last_modified = validators(news_obj.pk, news_obj.updated_at, last_modified=news_obj.updated_at)
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+            prefetch_related_objects([news_obj], news_media_prefetch())
+            entry = news_cache.set_detail(news_id, NewsSerializer(news_obj).data, etag, last_modified)
+        else:
+            response = not_modified(request, entry['etag'], entry['last_modified'])
+            if response is not None:
+                return response
+
+        return set_validators(
+            Response(entry['data'], status=status.HTTP_200_OK), entry['etag'], entry['last_modified']
+        )
 
 
 class GetNewsListView(APIView):
     """
-    Получение списка новостей, ограниченного параметром limit.
+    Получение ленты новостей (от новых к старым) с cursor-пагинацией по (created_at, id).
+    Параметр since позволяет получить только новости, появившиеся после уже загруженных.
     """
     permission_classes = [IsAuthenticated]
+    paginator = KeysetPaginator('created_at')
 
     @swagger_auto_schema(
-        operation_description="Получение списка новостей с ограничением по количеству (limit)",
+        operation_description="Получение ленты новостей с ограничением по количеству (limit). "
+                              "Следующая/предыдущая страница запрашивается по токенам next/prev из ответа.",
         manual_parameters=[
             openapi.Parameter(
                 'limit',
@@ -616,14 +1145,36 @@ class GetNewsListView(APIView):
                 description="Сколько новостей нужно получить",
                 type=openapi.TYPE_INTEGER
             ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Токен страницы (next или prev из предыдущего ответа)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'since',
+                openapi.IN_QUERY,
+                description="created_at самой свежей новости, уже имеющейся у клиента (ISO 8601). "
+                            "Вернутся только более новые новости",
+                type=openapi.TYPE_STRING
+            ),
         ],
         responses={
-            200: NewsSerializer(many=True),
-            400: "Некорректный параметр limit"
+            200: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'next': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                    'prev': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                }
+            ),
+            400: "Некорректный параметр limit, cursor или since"
         }
     )
     def get(self, request, *args, **kwargs):
         limit_str = request.query_params.get('limit')
+        cursor = request.query_params.get('cursor')
+        since_str = request.query_params.get('since')
         if not limit_str:
             return Response(
                 {"error": "Параметр 'limit' обязателен"},
@@ -638,9 +1189,56 @@ class GetNewsListView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        news_qs = News.objects.all()[:limit_value]
-        serializer = NewsSerializer(news_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        news_qs = News.objects.values_list(*FastNewsSerializer.values_fields, named=True)
+        if since_str:
+            since = parse_datetime(since_str)
+            if since is None:
+                return Response(
+                    {"error": "Параметр 'since' должен быть датой и временем в формате ISO 8601"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            news_qs = news_qs.filter(created_at__gt=since)
+
+        cache_key = news_cache.list_key({'limit': limit_value, 'cursor': cursor, 'since': since_str})
+        entry = news_cache.get_list(cache_key)
+        if entry is None:
+            try:
+                rows, next_cursor, prev_cursor = self.paginator.paginate(news_qs, limit_value, cursor)
+            except InvalidCursor as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            # ETag окна зависит от состава страницы и версий её новостей
+            etag, last_modified = validators(
+                next_cursor, prev_cursor, *[part for row in rows for part in (row.id, row.updated_at)],
+                last_modified=max((row.updated_at for row in rows), default=None),
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+            serializer = FastNewsSerializer(rows)
+            data = {"results": serializer.data, "next": next_cursor, "prev": prev_cursor}
+            entry = news_cache.set_list(cache_key, data, etag, last_modified)
+        else:
+            response = not_modified(request, entry['etag'], entry['last_modified'])
+            if response is not None:
+                return response
+
+        return set_validators(
+            Response(entry['data'], status=status.HTTP_200_OK), entry['etag'], entry['last_modified']
+        )
+
+
+class NewsCacheStatsView(APIView):
+    """
+    Счётчики попаданий/промахов кэша новостей (только для администраторов).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(news_cache.stats(), status=status.HTTP_200_OK)
 
 
 # ===================================
@@ -722,7 +1320,7 @@ class DeleteNewsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class MediaFileNewsUpdateAPIView(APIView):
+class MediaFileNewsUpdateAPIView(StreamingUploadMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [FormParser, MultiPartParser]
 